@@ -50,13 +50,15 @@ from .io import (export_to_csv_folder, import_from_csv_folder,
                  import_from_pypower_ppc, import_components_from_dataframe,
                  import_series_from_dataframe, import_from_pandapower_net)
 
-from .pf import (network_lpf, sub_network_lpf, network_pf,
+from .pf import (network_lpf, network_batch_lpf, sub_network_lpf, network_pf,
                  sub_network_pf, find_bus_controls, find_slack_bus, find_cycles,
                  calculate_Y, calculate_PTDF, calculate_B_H,
-                 calculate_dependent_values)
+                 calculate_B_fdlf, calculate_lazy_PTDF, update_PTDF,
+                 calculate_dependent_values, MatrixCache)
 
-from .contingency import (calculate_BODF, network_lpf_contingency,
-                          network_sclopf)
+from .contingency import (calculate_BODF, calculate_partial_BODF, calculate_multi_BODF,
+                          network_lpf_contingency, network_lpf_contingency_screening,
+                          network_lpf_contingency_n2, network_pf_contingency, network_sclopf)
 
 
 from .opf import network_lopf, network_opf
@@ -68,7 +70,8 @@ from .graph import graph, incidence_matrix, adjacency_matrix
 import sys
 
 if sys.version_info.major >= 3:
-    from .linopf import network_lopf as network_lopf_lowmem
+    from .linopf import (network_lopf as network_lopf_lowmem,
+                         network_sclopf as network_sclopf_lowmem)
 
 import logging
 logger = logging.getLogger(__name__)
@@ -191,6 +194,8 @@ class Network(Basic):
 
     lpf = network_lpf
 
+    batch_lpf = network_batch_lpf
+
     pf = network_pf
 
 #    lopf = network_lopf
@@ -205,7 +210,46 @@ class Network(Basic):
 
     lpf_contingency = network_lpf_contingency
 
-    sclopf = network_sclopf
+    lpf_contingency_screening = network_lpf_contingency_screening
+
+    lpf_contingency_n2 = network_lpf_contingency_n2
+
+    pf_contingency = network_pf_contingency
+
+    def sclopf(self, snapshots=None, branch_outages=None, pyomo=True, **kwargs):
+        """
+        Computes Security-Constrained Linear Optimal Power Flow (SCLOPF).
+
+        This ensures that no branch is overloaded even given the branch
+        outages.
+
+        Parameters
+        ----------
+        snapshots : list or index slice
+            A list of snapshots to optimise, must be a subset of
+            network.snapshots, defaults to network.snapshots
+        branch_outages : list-like
+            A list of passive branches which are to be tested for outages.
+            If None, it's take as all network.passive_branches_i()
+        pyomo : bool, default True
+            Whether to use pyomo for building and solving the model, see
+            :func:`pypsa.contingency.network_sclopf`. Otherwise the
+            contingency constraints are written block-wise with the
+            pyomo-free :func:`pypsa.linopf.network_sclopf`, which saves a
+            lot of memory and time.
+        **kwargs
+            Keyword arguments of the respective sclopf function, e.g.
+            solver_name, extra_functionality or, for pyomo=True,
+            iterative.
+
+        Examples
+        --------
+        >>> network.sclopf(network.snapshots, branch_outages, pyomo=False)
+        """
+        if pyomo:
+            return network_sclopf(self, snapshots, branch_outages, **kwargs)
+        else:
+            return network_sclopf_lowmem(self, snapshots, branch_outages, **kwargs)
 
     graph = graph
 
@@ -237,6 +281,9 @@ class Network(Basic):
         #corresponds to number of hours represented by each snapshot
         self.snapshot_weightings = pd.Series(index=self.snapshots,data=1.)
 
+        #network matrices of the sub-networks, reused while their inputs are unchanged
+        self.matrix_cache = MatrixCache()
+
         if override_components is None:
             self.components = components
         else:
@@ -897,6 +944,18 @@ class Network(Basic):
         adjacency_matrix = self.adjacency_matrix(self.passive_branch_components)
         n_components, labels = csgraph.connected_components(adjacency_matrix, directed=False)
 
+        # keep the factorizations of old sub_networks, which are reused
+        # by new sub_networks with the same buses if still valid
+        old_caches = {}
+        old_buses = self.buses.index.groupby(self.buses.sub_network)
+        for sub_network in self.sub_networks.get("obj", ()):
+            caches = {attr: getattr(sub_network, attr)
+                      for attr in ["_B_lu", "_jacobian", "_jacobian_solver", "_fdlf_lu",
+                                   "lazy_PTDF", "_PTDF_update"]
+                      if hasattr(sub_network, attr)}
+            if caches and sub_network.name in old_buses:
+                old_caches[tuple(old_buses[sub_network.name])] = caches
+
         # remove all old sub_networks
         for sub_network in self.sub_networks.index:
             obj = self.sub_networks.at[sub_network,"obj"]
@@ -923,6 +982,13 @@ class Network(Basic):
 
         self.buses.loc[:, "sub_network"] = labels.astype(str)
 
+        if old_caches:
+            new_buses = self.buses.index.groupby(self.buses.sub_network)
+            for sub_network in self.sub_networks.obj:
+                buses_i = tuple(new_buses.get(sub_network.name, ()))
+                for attr, value in iteritems(old_caches.get(buses_i, {})):
+                    setattr(sub_network, attr, value)
+
         for c in self.iterate_components(self.passive_branch_components):
             c.df["sub_network"] = c.df.bus0.map(self.buses["sub_network"])
 
@@ -1115,10 +1181,20 @@ class SubNetwork(Common):
 
     calculate_PTDF = calculate_PTDF
 
+    calculate_lazy_PTDF = calculate_lazy_PTDF
+
+    update_PTDF = update_PTDF
+
     calculate_B_H = calculate_B_H
 
+    calculate_B_fdlf = calculate_B_fdlf
+
     calculate_BODF = calculate_BODF
 
+    calculate_partial_BODF = calculate_partial_BODF
+
+    calculate_multi_BODF = calculate_multi_BODF
+
     graph = graph
 
     incidence_matrix = incidence_matrix
@@ -26,6 +26,7 @@ __copyright__ = "Copyright 2016-2017 Tom Brown (FIAS), GNU GPL 3"
 
 
 from scipy.sparse import issparse, csr_matrix, csc_matrix, hstack as shstack, vstack as svstack
+from scipy.sparse.csgraph import connected_components
 
 from numpy import r_, ones, zeros, newaxis
 
@@ -36,11 +37,25 @@ import numpy as np
 import pandas as pd
 
 import collections
+import os
+import tempfile
+import six
+from six.moves.collections_abc import Sequence
 
-from .pf import calculate_PTDF, _as_snapshots
+from .pf import (calculate_PTDF, calculate_B_H, calculate_dependent_values, find_bus_controls,
+                 _as_snapshots, _lpf_factorization,
+                 _branch_outage_distribution_factors, _pf_executor, _snapshot_chunks, _solve_pf, _pf_voltages,
+                 PowerFlowJacobian, JacobianSolver)
+
+from .descriptors import Dict
 
 from .opt import l_constraint
 
+from .opf import (network_lopf_build_model, network_lopf_prepare_solver, network_lopf_solve,
+                  PersistentSolver)
+
+from pyomo.environ import ConstraintList
+
 
 def calculate_BODF(sub_network, skip_pre=False):
     """
@@ -72,97 +87,1146 @@ def calculate_BODF(sub_network, skip_pre=False):
     if not skip_pre:
         calculate_PTDF(sub_network)
 
-    num_branches = sub_network.PTDF.shape[0]
+    sub_network.BODF = _branch_outage_distribution_factors(sub_network.PTDF, sub_network.K)
+
 
-    #build LxL version of PTDF
-    branch_PTDF = sub_network.PTDF*sub_network.K
+def calculate_partial_BODF(sub_network, branch_outages=None, monitored_branches=None,
+                           tolerance=None, chunksize=256, skip_pre=False):
+    """
+    Calculate the Branch Outage Distribution Factors (BODF) of
+    sub_network for a selection of outaged and monitored branches only.
 
-    denominator = csr_matrix((1/(1-np.diag(branch_PTDF)),(r_[:num_branches],r_[:num_branches])))
+    Sets sub_network.partial_BODF as a DataFrame with the monitored
+    branches as index and the outaged branches as columns.
 
-    sub_network.BODF = branch_PTDF*denominator
+    Only the columns of the branch PTDF of the outaged branches are
+    computed from the LU factorization of B, in chunks of `chunksize`
+    outages, so neither the PTDF nor the full num_branch x num_branch
+    BODF are formed.
 
-    #make sure the flow on the branch itself is zero
-    np.fill_diagonal(sub_network.BODF,-1)
+    Parameters
+    ----------
+    sub_network : pypsa.SubNetwork
+    branch_outages : list-like, default None
+        Passive branches of sub_network as (type, name) tuples whose
+        outage is considered; defaults to all branches.
+    monitored_branches : list-like, default None
+        Passive branches of sub_network as (type, name) tuples whose
+        flows after the outages are of interest; defaults to all
+        branches.
+    tolerance : float, default None
+        If given, factors with smaller absolute values are dropped and
+        a sparse DataFrame is returned.
+    chunksize : int, default 256
+        Number of outages whose factors are computed at once.
+    skip_pre : bool, default False
+        Skip the preliminary step of computing B and H.
 
+    Returns
+    -------
+    pandas.DataFrame
 
-def network_lpf_contingency(network, snapshots=None, branch_outages=None):
+    Examples
+    --------
+    >>> sub_network.calculate_partial_BODF(branch_outages=[("Line", "1")])
+    """
+
+    if not skip_pre:
+        calculate_B_H(sub_network)
+
+    branches_i = sub_network.branches_i()
+
+    def as_index(branches):
+        if branches is None:
+            return branches_i
+        branches = list(branches)
+        if len(branches) == 0:
+            return branches_i[:0]
+        return pd.MultiIndex.from_tuples(branches, names=branches_i.names)
+
+    outages_i = as_index(branch_outages)
+    monitored_i = as_index(monitored_branches)
+
+    outage_positions = branches_i.get_indexer(outages_i)
+    monitored_positions = branches_i.get_indexer(monitored_i)
+    assert (outage_positions >= 0).all() and (monitored_positions >= 0).all(), \
+        "Outaged and monitored branches must be in the sub-network {}".format(sub_network.name)
+
+    lu = _lpf_factorization(sub_network)
+    K = sub_network.K.tocsc()
+    H = sub_network.H.tocsr()
+    H_monitored = H[monitored_positions][:,1:]
+
+    blocks = []
+    for start in range(0, len(outage_positions), chunksize):
+        chunk = outage_positions[start:start+chunksize]
+
+        #voltage angles for unit transfers across the outaged branches
+        theta = lu.solve(K[1:,chunk].toarray()) if lu is not None else np.zeros((0, len(chunk)))
+
+        branch_PTDF = H_monitored*theta
+        diagonal = np.asarray(H[chunk][:,1:].multiply(theta.T).sum(axis=1)).ravel()
+
+        splitting = np.isclose(diagonal, 1)
+        if splitting.any():
+            logger.warning("The outages of the branches {} split the sub-network {}, their BODF are singular."
+                           .format(", ".join(map(str, branches_i[chunk[splitting]])), sub_network.name))
+
+        #as for the full BODF, zero factors stay zero for outages which split the sub-network
+        with np.errstate(divide='ignore', invalid='ignore'):
+            block = np.where(branch_PTDF == 0, 0., branch_PTDF/(1-diagonal))
+
+        #make sure the flow on the branch itself is zero
+        block[monitored_positions[:,newaxis] == chunk] = -1
+
+        if tolerance is not None:
+            block[abs(block) < tolerance] = 0.
+            block = csc_matrix(block)
+        blocks.append(block)
+
+    if tolerance is None:
+        BODF = pd.DataFrame(np.hstack(blocks) if blocks else np.zeros((len(monitored_i), 0)),
+                            monitored_i, outages_i)
+    else:
+        BODF = pd.DataFrame.sparse.from_spmatrix(shstack(blocks, format='csc') if blocks
+                                                 else csc_matrix((len(monitored_i), 0)),
+                                                 monitored_i, outages_i)
+
+    sub_network.partial_BODF = BODF
+
+    return BODF
+
+
+def calculate_multi_BODF(sub_network, outage_sets, monitored_branches=None, skip_pre=False):
+    """
+    Calculate the generalised Branch Outage Distribution Factors of
+    sub_network for the simultaneous outage of sets of branches.
+
+    For the outage of the set of branches M, the new flows are given in
+    terms of the flows before the outage by
+
+    f^after = f^before + F_M f_M^before,  F_M = - BODF_{:,M} BODF_{MM}^{-1}
+
+    where the small k x k system is solved for all outage sets of the
+    same size k at once. For k = 1 this reduces to the BODF.
+
+    Sets sub_network.multi_BODF as a DataFrame with the monitored
+    branches as index and the outage set number and the outaged branches
+    as column levels. The factors of outage sets which split the
+    sub-network are NaN.
+
+    Parameters
+    ----------
+    sub_network : pypsa.SubNetwork
+    outage_sets : list-like of list-likes
+        Sets of passive branches of sub_network as (type, name) tuples
+        which are outaged simultaneously.
+    monitored_branches : list-like, default None
+        Passive branches of sub_network as (type, name) tuples whose
+        flows after the outages are of interest; defaults to all
+        branches.
+    skip_pre : bool, default False
+        Skip the preliminary step of computing B and H.
+
+    Returns
+    -------
+    pandas.DataFrame
+
+    Examples
+    --------
+    >>> sub_network.calculate_multi_BODF([[("Line", "1"), ("Line", "2")]])
+    """
+
+    outage_sets = [list(outage_set) for outage_set in outage_sets]
+    outages = list(collections.OrderedDict.fromkeys(b for outage_set in outage_sets for b in outage_set))
+
+    branches_i = sub_network.branches_i()
+    monitored_i = (branches_i if monitored_branches is None else
+                   pd.MultiIndex.from_tuples(list(monitored_branches), names=branches_i.names)
+                   if len(monitored_branches) > 0 else branches_i[:0])
+    outages_i = (pd.MultiIndex.from_tuples(outages, names=branches_i.names) if outages
+                 else branches_i[:0])
+
+    #the rows of the outaged branches are needed for the k x k systems
+    rows_i = monitored_i.append(outages_i.difference(monitored_i))
+    BODF = calculate_partial_BODF(sub_network, branch_outages=outages, monitored_branches=rows_i,
+                                  skip_pre=skip_pre).values
+    outage_rows = rows_i.get_indexer(outages_i)
+
+    outages_pos = {branch: i for i, branch in enumerate(outages)}
+    sizes = np.array([len(outage_set) for outage_set in outage_sets], dtype=int)
+
+    factors = [None]*len(outage_sets)
+    for k in np.unique(sizes):
+        sets = np.flatnonzero(sizes == k)
+        M = np.array([[outages_pos[b] for b in outage_sets[i]] for i in sets], dtype=int).reshape(len(sets), k)
+
+        #num_sets x k x k blocks BODF_{MM} and num_monitored x num_sets x k columns BODF_{:,M}
+        B_MM = BODF[outage_rows[M][:,:,newaxis], M[:,newaxis,:]]
+        B_M = BODF[:len(monitored_i)][:,M]
+
+        with np.errstate(invalid='ignore'):
+            singular = ~np.isfinite(B_MM).all(axis=(1,2)) | np.isclose(np.linalg.det(B_MM), 0)
+        if singular.any():
+            logger.warning("The outages of {} sets of branches split the sub-network {}, their factors are singular."
+                           .format(singular.sum(), sub_network.name))
+
+        F = np.full((len(sets), len(monitored_i), k), np.nan)
+        ok = ~singular
+        #F_M^T = - BODF_{MM}^{-T} BODF_{:,M}^T
+        F[ok] = -np.linalg.solve(B_MM[ok].transpose(0,2,1),
+                                 B_M[:,ok,:].transpose(1,2,0)).transpose(0,2,1)
+        for j, i in enumerate(sets):
+            factors[i] = F[j]
+
+    columns = pd.MultiIndex.from_arrays([[i for i, outage_set in enumerate(outage_sets) for b in outage_set],
+                                         [b[0] for outage_set in outage_sets for b in outage_set],
+                                         [b[1] for outage_set in outage_sets for b in outage_set]],
+                                        names=["outage_set"] + list(branches_i.names))
+
+    multi_BODF = pd.DataFrame(np.hstack(factors) if factors else np.zeros((len(monitored_i), 0)),
+                              monitored_i, columns)
+
+    sub_network.multi_BODF = multi_BODF
+
+    return multi_BODF
+
+
+def _branch_outages_by_sub_network(network, branch_outages):
+    """Group the branch outages as (type, name) tuples by sub-network."""
+
+    passive_branches = network.passive_branches()
+
+    if branch_outages is None:
+        branch_outages = passive_branches.index
+
+    outages = collections.OrderedDict()
+    for branch in branch_outages:
+        if type(branch) is not tuple:
+            logger.warning("No type given for {}, assuming it is a line".format(branch))
+            branch = ("Line",branch)
+        outages[branch] = None
+    outages = list(outages)
+
+    by_sub_network = collections.OrderedDict()
+    for branch in outages:
+        by_sub_network.setdefault(passive_branches.at[branch, "sub_network"], []).append(branch)
+
+    return outages, by_sub_network
+
+
+def _base_flows(network, snapshots):
+    """The flows p0 on all passive branches as a num_snapshots x
+    num_passive_branches array in the order of network.passive_branches()."""
+
+    passive_branches_i = network.passive_branches().index
+
+    p0 = pd.concat({c: network.pnl(c).p0.loc[snapshots] for c in network.passive_branch_components},
+                   axis=1)
+
+    return p0.reindex(columns=passive_branches_i).values
+
+
+def _lpf_contingency_blocks(network, p0_base, outages_by_sub_network, chunksize=None):
+    """
+    Yield the flows after the branch outages in blocks of at most
+    `chunksize` outages of one sub-network.
+
+    Yields tuples (outages, branches_pos, p0) of the list of outaged
+    branches, the positions of the branches of the sub-network among
+    the passive branches and the num_snapshots x len(branches_pos) x
+    len(outages) array of their flows after each of the outages.
+    """
+
+    passive_branches_i = network.passive_branches().index
+
+    for sub_network, outages in outages_by_sub_network.items():
+        sn = network.sub_networks.at[sub_network, "obj"]
+        branches_pos = passive_branches_i.get_indexer(sn.branches_i())
+
+        size = len(outages) if chunksize is None else chunksize
+        assert size > 0, "The chunksize must be positive. Is {}.".format(chunksize)
+
+        for start in range(0, len(outages), size):
+            chunk = outages[start:start+size]
+            BODF = sn.calculate_partial_BODF(branch_outages=chunk, skip_pre=True).values
+            outages_pos = passive_branches_i.get_indexer(pd.MultiIndex.from_tuples(chunk))
+
+            #f_b^(c) = f_b + BODF_bc f_c for all snapshots, branches and outages at once
+            p0 = (p0_base[:,branches_pos,newaxis] +
+                  BODF[newaxis,:,:]*p0_base[:,newaxis,outages_pos])
+
+            yield chunk, branches_pos, p0
+
+
+def _share_array(array, directory, name):
+    """Write array to a .npy file in directory, which the workers of a
+    parallel contingency analysis open read-only as a memory map instead
+    of receiving a pickled copy. Returns the file name."""
+
+    fn = os.path.join(directory, name + ".npy")
+    np.save(fn, np.ascontiguousarray(array))
+    return fn
+
+
+def _shared_partial_BODF(sub_network, outages, directory, chunksize=256):
+    """Write the partial BODF of the outages of sub_network (all branches
+    x outages) block by block into a shared memory-mapped .npy file in
+    directory. Returns the file name."""
+
+    fn = os.path.join(directory, "BODF-{}.npy".format(sub_network.name))
+    BODF = np.lib.format.open_memmap(fn, mode='w+', dtype=float,
+                                     shape=(len(sub_network.branches_i()), len(outages)))
+    for start in range(0, len(outages), chunksize):
+        chunk = outages[start:start+chunksize]
+        BODF[:,start:start+len(chunk)] = sub_network.calculate_partial_BODF(branch_outages=chunk,
+                                                                            skip_pre=True).values
+    BODF.flush()
+    del BODF
+
+    return fn
+
+
+def _lpf_contingency_block(p0_fn, BODF_fn, branches_pos, outages_pos, columns, screening=None):
+    """
+    Worker for the parallel contingency analysis: flows after the
+    outages in the `columns` of the shared BODF of a sub-network from
+    the shared base flows.
+
+    If `screening` is a tuple (s_nom, top_k, threshold), only the
+    selected loadings are returned as computed by _screen_loadings.
+    """
+
+    p0_base = np.load(p0_fn, mmap_mode='r')
+    BODF = np.load(BODF_fn, mmap_mode='r')[:,columns]
+
+    p0 = (p0_base[:,branches_pos,newaxis] +
+          BODF[newaxis,:,:]*p0_base[:,newaxis,outages_pos])
+
+    if screening is None:
+        return p0
+
+    return _screen_loadings(p0, *screening)
+
+
+def _parallel_lpf_contingency_blocks(network, p0_base, outages_by_sub_network, executor,
+                                     chunksize=None, screening=None):
+    """
+    Parallel version of _lpf_contingency_blocks, which distributes the
+    blocks of outages over the workers of executor.
+
+    The base flows and the partial BODF of each sub-network are written
+    once to memory-mapped files in a temporary directory, which the
+    workers read instead of receiving pickled copies. If `screening` is
+    a tuple (s_nom, top_k, threshold) of the s_nom of all passive
+    branches, the workers only send back the selected loadings.
+
+    Yields tuples (outages, branches_pos, result) in the order of the
+    outages.
+    """
+
+    passive_branches_i = network.passive_branches().index
+
+    with tempfile.TemporaryDirectory(prefix="pypsa-contingency-") as directory:
+        p0_fn = _share_array(p0_base, directory, "p0")
+
+        futures = []
+        for sub_network, outages in outages_by_sub_network.items():
+            sn = network.sub_networks.at[sub_network, "obj"]
+            branches_pos = passive_branches_i.get_indexer(sn.branches_i())
+            BODF_fn = _shared_partial_BODF(sn, outages, directory)
+
+            sn_screening = (None if screening is None else
+                            (screening[0][branches_pos],) + tuple(screening[1:]))
+
+            if chunksize is None:
+                blocks = _snapshot_chunks(len(outages), executor=executor)
+            else:
+                assert chunksize > 0, "The chunksize must be positive. Is {}.".format(chunksize)
+                blocks = [np.arange(start, min(start+chunksize, len(outages)))
+                          for start in range(0, len(outages), chunksize)]
+
+            for block in blocks:
+                chunk = [outages[i] for i in block]
+                outages_pos = passive_branches_i.get_indexer(pd.MultiIndex.from_tuples(chunk))
+                columns = slice(block[0], block[-1]+1)
+                futures.append((chunk, branches_pos,
+                                executor.submit(_lpf_contingency_block, p0_fn, BODF_fn, branches_pos,
+                                                outages_pos, columns, sn_screening)))
+
+        logger.info("Distributed %d blocks of outages over the workers", len(futures))
+
+        for chunk, branches_pos, future in futures:
+            yield chunk, branches_pos, future.result()
+
+
+def network_lpf_contingency(network, snapshots=None, branch_outages=None, chunksize=None,
+                            n_jobs=1, executor=None):
     """
     Computes linear power flow for a selection of branch outages.
 
+    The flows after the outages are computed for all snapshots and
+    outages at once from the flows of the base case and the Branch
+    Outage Distribution Factors (BODF) of the outaged branches.
+
     Parameters
     ----------
     snapshots : list-like|single snapshot
         A subset or an elements of network.snapshots on which to run
         the power flow, defaults to network.snapshots
-        NB: currently this only works for a single snapshot
     branch_outages : list-like
         A list of passive branches which are to be tested for outages.
         If None, it's take as all network.passive_branches_i()
+    chunksize : int, default None
+        Number of outages whose flows are computed at once, which
+        bounds the memory of the intermediate arrays; by default all
+        outages of a sub-network are computed at once.
+    n_jobs : int, default 1
+        Number of worker processes. If larger than 1, the blocks of
+        outages are computed in parallel in a process pool; -1 uses all
+        cores. The base flows and the BODF are shared with the workers
+        through memory-mapped files. Without a chunksize, the outages of
+        each sub-network are split into one block per worker.
+    executor : concurrent.futures.Executor, default None
+        Executor to compute the blocks of outages on instead of starting
+        a new process pool.
 
     Returns
     -------
     p0 : pandas.DataFrame
-        num_passive_branch x num_branch_outages DataFrame of new power flows
+        For a single snapshot, a num_passive_branch x
+        (1 + num_branch_outages) DataFrame of new power flows, with the
+        flows of the base case in the column "base". For a list-like of
+        snapshots, the DataFrames of all snapshots are stacked, i.e. the
+        index is a MultiIndex of the snapshots and the passive branches.
+        Flows on branches in other sub-networks than the outaged branch
+        are NaN.
 
     Examples
     --------
     >>> network.lpf_contingency(snapshot, branch_outages)
+    >>> network.lpf_contingency(network.snapshots, branch_outages, chunksize=100)
+    """
+
+    single_snapshot = (snapshots is not None and
+                       (isinstance(snapshots, six.string_types) or
+                        not isinstance(snapshots, (Sequence, pd.Index))))
+    snapshots = _as_snapshots(network, snapshots)
+
+    network.lpf(snapshots)
+
+    # Store the flows from the base case
+
+    passive_branches_i = network.passive_branches().index
+
+    branch_outages, outages_by_sub_network = _branch_outages_by_sub_network(network, branch_outages)
+
+    p0_base = _base_flows(network, snapshots)
+
+    p0 = np.full((len(snapshots), len(passive_branches_i), 1 + len(branch_outages)), np.nan)
+    p0[:,:,0] = p0_base
+
+    columns = pd.Index(["base"] + branch_outages, tupleize_cols=False)
+
+    with _pf_executor(n_jobs, executor) as executor:
+        if executor is None:
+            blocks = _lpf_contingency_blocks(network, p0_base, outages_by_sub_network, chunksize)
+        else:
+            blocks = _parallel_lpf_contingency_blocks(network, p0_base, outages_by_sub_network,
+                                                      executor, chunksize)
+
+        for outages, branches_pos, p0_outages in blocks:
+            outages_pos = columns.get_indexer(pd.Index(outages, tupleize_cols=False))
+            p0[:,branches_pos[:,newaxis],outages_pos] = p0_outages
+
+    if single_snapshot:
+        return pd.DataFrame(p0[0], passive_branches_i, columns)
+
+    index = pd.MultiIndex.from_arrays([snapshots.repeat(len(passive_branches_i))] +
+                                      [np.tile(passive_branches_i.get_level_values(i), len(snapshots))
+                                       for i in range(passive_branches_i.nlevels)],
+                                      names=["snapshot"] + list(passive_branches_i.names))
+
+    return pd.DataFrame(p0.reshape(-1, p0.shape[2]), index, columns)
+
+
+
+
+def _screen_loadings(p0, s_nom, top_k=None, threshold=None):
+    """
+    Select the top_k loadings |p0|/s_nom for each snapshot and outage
+    and/or those above threshold from the num_snapshots x num_branches x
+    num_outages flows p0 after the outages.
+
+    Returns the positions t, m, c of the selected snapshots, branches
+    and outages and the arrays of their flows and loadings.
     """
 
-    if snapshots is None:
-        snapshots = network.snapshots
+    with np.errstate(divide='ignore', invalid='ignore'):
+        loading = abs(p0)/s_nom[newaxis,:,newaxis]
+    #flows after outages which split the sub-network are undefined
+    loading[~np.isfinite(p0)] = -np.inf
 
-    if isinstance(snapshots, collections.Iterable):
-        logger.warning("Apologies LPF contingency, this only works for single snapshots at the moment, taking the first snapshot.")
-        snapshot = snapshots[0]
+    if top_k is not None and top_k < p0.shape[1]:
+        #partial sort of the branches for each snapshot and outage
+        rows = np.argpartition(-loading, top_k-1, axis=1)[:,:top_k,:]
+        loading = np.take_along_axis(loading, rows, axis=1)
     else:
-        snapshot = snapshots
+        rows = np.broadcast_to(np.arange(p0.shape[1])[newaxis,:,newaxis], loading.shape)
 
-    network.lpf(snapshot)
+    keep = loading > -np.inf if threshold is None else loading >= threshold
+    t, k, c = keep.nonzero()
+    m = rows[t,k,c]
 
-    # Store the flows from the base case
+    return t, m, c, p0[t,m,c], loading[t,k,c]
+
+
+def network_lpf_contingency_screening(network, snapshots=None, branch_outages=None, top_k=1,
+                                     threshold=None, chunksize=100, n_jobs=1, executor=None):
+    """
+    Screens the linear power flow for overloads after branch outages.
+
+    Rather than returning the flows on all branches after all outages,
+    the outages are processed in blocks of `chunksize` and for each
+    snapshot and outage only the highest loadings |p0|/s_nom of the
+    branches are kept, so the memory is bounded by the size of a block.
+
+    Parameters
+    ----------
+    snapshots : list-like|single snapshot
+        A subset or an elements of network.snapshots on which to run
+        the power flow, defaults to network.snapshots
+    branch_outages : list-like
+        A list of passive branches which are to be tested for outages.
+        If None, it's take as all network.passive_branches_i()
+    top_k : int, default 1
+        Number of the highest loaded branches which are kept for each
+        snapshot and outage; if None, all branches above `threshold`
+        are kept.
+    threshold : float, default None
+        Only loadings of at least `threshold` are kept, e.g. 1. to
+        report overloads only.
+    chunksize : int, default 100
+        Number of outages which are screened at once.
+    n_jobs : int, default 1
+        Number of worker processes. If larger than 1, the blocks of
+        outages are screened in parallel in a process pool; -1 uses all
+        cores. The workers read the base flows and the BODF from shared
+        memory-mapped files and only send back the selected loadings.
+    executor : concurrent.futures.Executor, default None
+        Executor to screen the blocks of outages on instead of starting
+        a new process pool.
+
+    Returns
+    -------
+    loadings : pandas.DataFrame
+        One row per kept loading with the columns "snapshot",
+        "outage_type", "outage", "branch_type", "branch", "p0" and
+        "loading", sorted by snapshot, outage and decreasing loading.
+
+    Examples
+    --------
+    >>> network.lpf_contingency_screening(network.snapshots, top_k=3, threshold=1.)
+    """
+
+    assert top_k is not None or threshold is not None, "Either top_k or threshold must be given."
+    assert top_k is None or top_k > 0, "top_k must be positive. Is {}.".format(top_k)
+
+    snapshots = _as_snapshots(network, snapshots)
+
+    network.lpf(snapshots)
 
     passive_branches = network.passive_branches()
 
-    if branch_outages is None:
-        branch_outages = passive_branches.index
+    branch_outages, outages_by_sub_network = _branch_outages_by_sub_network(network, branch_outages)
+    outages_pos = {branch: i for i, branch in enumerate(branch_outages)}
 
+    p0_base = _base_flows(network, snapshots)
+    s_nom = passive_branches.s_nom.values
 
-    p0_base = pd.Series(index=passive_branches.index)
+    selected = []
+    with _pf_executor(n_jobs, executor) as executor:
+        if executor is None:
+            blocks = ((outages, branches_pos, _screen_loadings(p0, s_nom[branches_pos], top_k, threshold))
+                      for outages, branches_pos, p0 in _lpf_contingency_blocks(network, p0_base,
+                                                                               outages_by_sub_network,
+                                                                               chunksize))
+        else:
+            blocks = _parallel_lpf_contingency_blocks(network, p0_base, outages_by_sub_network, executor,
+                                                      chunksize, screening=(s_nom, top_k, threshold))
 
-    for c in network.passive_branch_components:
-        pnl = network.pnl(c)
-        p0_base[c] = pnl.p0.loc[snapshot]
+        for outages, branches_pos, (t, m, c, p0, loading) in blocks:
+            selected.append((t, branches_pos[m], np.array([outages_pos[outages[i]] for i in c], dtype=int),
+                             p0, loading))
 
-    for sn in network.sub_networks.obj:
-        sn._branches = sn.branches()
-        sn.calculate_BODF()
+    t, b, o, p0, loading = (np.concatenate(arrays) for arrays in zip(*selected)) if selected \
+                           else (np.array([], dtype=int),)*3 + (np.array([]),)*2
 
-    p0 = pd.DataFrame(index=passive_branches.index)
+    order = np.lexsort((-loading, o, t))
+    t, b, o, p0, loading = t[order], b[order], o[order], p0[order], loading[order]
 
-    p0["base"] = p0_base
+    outages_i = pd.MultiIndex.from_tuples(branch_outages) if branch_outages else pd.MultiIndex.from_arrays([[],[]])
 
-    for branch in branch_outages:
-        if type(branch) is not tuple:
-            logger.warning("No type given for {}, assuming it is a line".format(branch))
-            branch = ("Line",branch)
+    return pd.DataFrame({"snapshot" : snapshots[t],
+                         "outage_type" : outages_i.get_level_values(0)[o],
+                         "outage" : outages_i.get_level_values(1)[o],
+                         "branch_type" : passive_branches.index.get_level_values(0)[b],
+                         "branch" : passive_branches.index.get_level_values(1)[b],
+                         "p0" : p0,
+                         "loading" : loading},
+                        columns=["snapshot", "outage_type", "outage", "branch_type", "branch",
+                                 "p0", "loading"])
 
-        sn = network.sub_networks.obj[passive_branches.sub_network[branch]]
 
-        branch_i = sn._branches.index.get_loc(branch)
+def network_lpf_contingency_n2(network, snapshots=None, branch_outages=None, top_k=1,
+                               threshold=1., prune=True, chunksize=1000):
+    """
+    Screens the linear power flow for overloads after the simultaneous
+    outage of pairs of branches (N-2).
+
+    All pairs of the branch outages within a sub-network are enumerated
+    at once. For the pair (a, b) the flows after the outages follow from
+    the N-1 BODF by solving the 2 x 2 system of the generalised BODF,
+    see calculate_multi_BODF,
+
+    f^(ab) = f + BODF_{:,a} x_a + BODF_{:,b} x_b,
+    x_a = (f_a + BODF_{ab} f_b)/(1 - BODF_{ab} BODF_{ba})
+
+    and analogously for x_b, i.e. x_a is the flow on a after the outage
+    of b amplified by the coupling of both outages. Pairs in different
+    sub-networks do not interact and are covered by the N-1 analysis.
+
+    With `prune`, pairs are discarded before their flows are computed
+    if the upper bound of their loadings
+
+    max_k |f_k|/s_k + |x_a| max_k |BODF_{ka}|/s_k + |x_b| max_k |BODF_{kb}|/s_k
+
+    from the base flows and the N-1 factors stays below `threshold` in
+    all snapshots. Since it is an upper bound, no overloads are missed.
+
+    Parameters
+    ----------
+    snapshots : list-like|single snapshot
+        A subset or an elements of network.snapshots on which to run
+        the power flow, defaults to network.snapshots
+    branch_outages : list-like
+        A list of passive branches whose pairs are to be tested for
+        outages. If None, it's take as all network.passive_branches_i()
+    top_k : int, default 1
+        Number of the highest loaded branches which are kept for each
+        snapshot and pair of outages; if None, all branches above
+        `threshold` are kept.
+    threshold : float, default 1.
+        Only loadings |p0|/s_nom of at least `threshold` are kept; if
+        None, the top_k loadings are kept for all pairs.
+    prune : bool, default True
+        Discard pairs whose loadings are bounded below `threshold`.
+    chunksize : int, default 1000
+        Number of pairs of outages which are screened at once.
+
+    Returns
+    -------
+    loadings : pandas.DataFrame
+        One row per kept loading with the columns "snapshot",
+        "outage_type_0", "outage_0", "outage_type_1", "outage_1",
+        "branch_type", "branch", "p0" and "loading", sorted by snapshot,
+        pair of outages and decreasing loading. Pairs which split the
+        sub-network are left out.
+
+    Examples
+    --------
+    >>> network.lpf_contingency_n2(network.snapshots, branch_outages, threshold=1.)
+    """
+
+    assert top_k is not None or threshold is not None, "Either top_k or threshold must be given."
+    assert top_k is None or top_k > 0, "top_k must be positive. Is {}.".format(top_k)
+    assert chunksize > 0, "The chunksize must be positive. Is {}.".format(chunksize)
+
+    snapshots = _as_snapshots(network, snapshots)
+
+    network.lpf(snapshots)
+
+    passive_branches = network.passive_branches()
+    passive_branches_i = passive_branches.index
+
+    branch_outages, outages_by_sub_network = _branch_outages_by_sub_network(network, branch_outages)
+    outages_pos = {branch: i for i, branch in enumerate(branch_outages)}
+
+    p0_base = _base_flows(network, snapshots)
+    s_nom = passive_branches.s_nom.values
+
+    num_pairs = 0
+    num_screened = 0
+    selected = []
+    for sub_network, outages in outages_by_sub_network.items():
+        sn = network.sub_networks.at[sub_network, "obj"]
+        branches_i = sn.branches_i()
+        branches_pos = passive_branches_i.get_indexer(branches_i)
+        outages_i = pd.MultiIndex.from_tuples(outages)
+        local = branches_i.get_indexer(outages_i)
+
+        BODF = sn.calculate_partial_BODF(branch_outages=outages, skip_pre=True).values
+        f = p0_base[:,branches_pos]
+        f_outages = p0_base[:,passive_branches_i.get_indexer(outages_i)]
+        s_nom_sn = s_nom[branches_pos]
+
+        #all pairs of outages, leaving out single outages which already
+        #split the sub-network
+        a, b = np.triu_indices(len(outages), 1)
+        splitting = ~np.isfinite(BODF).all(axis=0)
+        valid = ~(splitting[a] | splitting[b])
+        B_ab = BODF[local[a],b]
+        B_ba = BODF[local[b],a]
+        det = 1 - B_ab*B_ba
+        islanding = valid & np.isclose(det, 0)
+        if islanding.any():
+            logger.warning("The outages of {} pairs of branches split the sub-network {} and are skipped."
+                           .format(islanding.sum(), sub_network))
+        valid &= ~islanding
+        a, b, B_ab, B_ba, det = a[valid], b[valid], B_ab[valid], B_ba[valid], det[valid]
+        num_pairs += len(a)
+
+        if prune and threshold is not None:
+            #largest loading change per unit flow on the outaged branch
+            #from the N-1 factors, not counting the outaged branch itself
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = abs(BODF)/s_nom_sn[:,newaxis]
+                ratio[local, np.arange(len(outages))] = 0.
+                ratio = np.nan_to_num(ratio, nan=0.).max(axis=0)
+                base = np.nan_to_num(abs(f)/s_nom_sn, nan=0.).max(axis=1)
+
+        for start in range(0, len(a), chunksize):
+            c_a, c_b = a[start:start+chunksize], b[start:start+chunksize]
+            c_ab, c_ba, c_det = B_ab[start:start+chunksize], B_ba[start:start+chunksize], det[start:start+chunksize]
+
+            #compensating flows on the outaged branches (snapshots x pairs)
+            x_a = (f_outages[:,c_a] + c_ab*f_outages[:,c_b])/c_det
+            x_b = (c_ba*f_outages[:,c_a] + f_outages[:,c_b])/c_det
+
+            if prune and threshold is not None:
+                bound = base[:,newaxis] + abs(x_a)*ratio[c_a] + abs(x_b)*ratio[c_b]
+                keep = (bound >= threshold).any(axis=0)
+                c_a, c_b, x_a, x_b = c_a[keep], c_b[keep], x_a[:,keep], x_b[:,keep]
+                if len(c_a) == 0:
+                    continue
+            num_screened += len(c_a)
+
+            p0 = (f[:,:,newaxis] + BODF[newaxis,:,c_a]*x_a[:,newaxis,:] +
+                  BODF[newaxis,:,c_b]*x_b[:,newaxis,:])
+            #make sure the flows on the outaged branches are zero
+            pairs = np.arange(len(c_a))
+            p0[:,local[c_a],pairs] = 0.
+            p0[:,local[c_b],pairs] = 0.
+
+            t, m, c, p0, loading = _screen_loadings(p0, s_nom_sn, top_k, threshold)
+            selected.append((t, branches_pos[m],
+                             np.array([outages_pos[outages[i]] for i in c_a[c]], dtype=int),
+                             np.array([outages_pos[outages[i]] for i in c_b[c]], dtype=int),
+                             p0, loading))
+
+    if prune and threshold is not None:
+        logger.info("Screened %d of %d pairs of outages, the others were pruned by their loading bound",
+                    num_screened, num_pairs)
+
+    t, m, o0, o1, p0, loading = (np.concatenate(arrays) for arrays in zip(*selected)) if selected \
+                                else (np.array([], dtype=int),)*4 + (np.array([]),)*2
+
+    order = np.lexsort((-loading, o1, o0, t))
+    t, m, o0, o1, p0, loading = (x[order] for x in (t, m, o0, o1, p0, loading))
+
+    outages_i = pd.MultiIndex.from_tuples(branch_outages) if branch_outages else pd.MultiIndex.from_arrays([[],[]])
+
+    return pd.DataFrame({"snapshot" : snapshots[t],
+                         "outage_type_0" : outages_i.get_level_values(0)[o0],
+                         "outage_0" : outages_i.get_level_values(1)[o0],
+                         "outage_type_1" : outages_i.get_level_values(0)[o1],
+                         "outage_1" : outages_i.get_level_values(1)[o1],
+                         "branch_type" : passive_branches_i.get_level_values(0)[m],
+                         "branch" : passive_branches_i.get_level_values(1)[m],
+                         "p0" : p0,
+                         "loading" : loading},
+                        columns=["snapshot", "outage_type_0", "outage_0", "outage_type_1", "outage_1",
+                                 "branch_type", "branch", "p0", "loading"])
+
+
+def _pf_contingency_block(Y, Y0, Y1, bus0, bus1, num_pvs, ss, v_mag_pu, v_ang, outages,
+                          s_nom, v_mag_pu_min, v_mag_pu_max, x_tol=1e-6, jacobian=None):
+    """
+    Non-linear power flow of a sub-network after each of the outages of
+    the branches with the positions `outages`, for all snapshots given by
+    the rows of the nodal injections ss and the base case voltages
+    v_mag_pu and v_ang, all in the order of buses_o. Only arrays and
+    matrices are needed, so that it can be run in a separate process.
+
+    For each outage the bus admittance matrix is updated by removing the
+    two rows of the branch, the Jacobian structure is shared with the
+    base case and Newton-Raphson starts from the base case voltages. If
+    the outage splits the sub-network, only the island with the slack
+    bus is solved and the other buses are de-energised.
+
+    Returns the num_snapshots x num_outages arrays of the number of
+    iterations, the error, the convergence status and the largest branch
+    loading, the islanding status of the outages and the positions and
+    values of the branch loadings above 1 and of the voltage magnitudes
+    outside their limits.
+    """
+
+    num_buses = Y.shape[0]
+    num_branches = len(bus0)
+    num_snapshots = len(ss)
+    buses = np.arange(num_buses)
+
+    C0 = csr_matrix((ones(num_branches), (r_[:num_branches], bus0)), (num_branches, num_buses))
+    C1 = csr_matrix((ones(num_branches), (r_[:num_branches], bus1)), (num_branches, num_buses))
+
+    if jacobian is None:
+        jacobian = PowerFlowJacobian(Y, num_pvs)
+    jacobian_solver = JacobianSolver()
+
+    n_iter = np.zeros((num_snapshots, len(outages)), dtype=int)
+    error = np.full((num_snapshots, len(outages)), np.nan)
+    converged = np.zeros((num_snapshots, len(outages)), dtype=bool)
+    max_loading = np.full((num_snapshots, len(outages)), np.nan)
+    islanded = np.zeros(len(outages), dtype=bool)
+    overloads = []
+    voltage_violations = []
+
+    for k, j in enumerate(outages):
+        #rank update of Y for the removal of branch j
+        Y_outage = (Y - C0[j].T*Y0[j] - C1[j].T*Y1[j]).tocsr()
+
+        #buses which stay connected to the slack bus
+        remaining = np.flatnonzero(r_[:num_branches] != j)
+        adjacency = csr_matrix((ones(len(remaining)), (bus0[remaining], bus1[remaining])),
+                               (num_buses, num_buses))
+        labels = connected_components(adjacency, directed=False)[1]
+        energised = labels == labels[0]
+        islanded[k] = not energised.all()
+
+        if islanded[k]:
+            Y_island = Y_outage[energised][:,energised]
+            num_pvs_island = int(energised[1:1+num_pvs].sum())
+            jacobian_island = PowerFlowJacobian(Y_island, num_pvs_island)
+            solver = JacobianSolver()
+        else:
+            Y_island, num_pvs_island = Y_outage, num_pvs
+            jacobian_island = jacobian.updated(Y_outage)
+            #the ordering of the base case Jacobian stays valid
+            jacobian_solver.reset()
+            solver = jacobian_solver
+
+        v_mag_pu_island = v_mag_pu[:,energised]
+        v_ang_island = v_ang[:,energised]
+        guesses = np.hstack((v_ang_island[:,1:], v_mag_pu_island[:,1+num_pvs_island:]))
+
+        if energised.sum() > 1:
+            roots, n_iter[:,k], error[:,k], converged[:,k], _ = _solve_pf(Y_island, num_pvs_island, ss[:,energised],
+                                                                          v_mag_pu_island, v_ang_island, guesses,
+                                                                          x_tol=x_tol, batch=True,
+                                                                          jacobian=jacobian_island,
+                                                                          jacobian_solver=solver)
+        else:
+            #only the slack bus is left
+            roots, error[:,k], converged[:,k] = guesses, 0., True
+
+        V = np.zeros((num_snapshots, num_buses), dtype=complex)
+        V[:,energised] = _pf_voltages(roots, v_mag_pu_island, v_ang_island, num_pvs_island)
+
+        s0 = V[:,bus0]*np.conj(Y0.dot(V.T)).T
+        s1 = V[:,bus1]*np.conj(Y1.dot(V.T)).T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            loading = np.maximum(abs(s0), abs(s1))/s_nom
+        loading[:,j] = 0.
+        loading[~converged[:,k]] = np.nan
+        max_loading[:,k] = loading.max(axis=1)
+
+        t, b = np.nonzero(loading > 1)
+        overloads.append((t, np.full(len(t), k), b, loading[t,b]))
+
+        v = abs(V)
+        v[~converged[:,k]] = np.nan
+        outside = energised & ((v < v_mag_pu_min) | (v > v_mag_pu_max))
+        t, b = np.nonzero(outside)
+        voltage_violations.append((t, np.full(len(t), k), b, v[t,b]))
+
+    def stack(violations):
+        return tuple(np.concatenate(arrays) for arrays in zip(*violations)) if violations \
+               else (np.array([], dtype=int),)*3 + (np.array([]),)
+
+    return n_iter, error, converged, max_loading, islanded, stack(overloads), stack(voltage_violations)
+
+
+def network_pf_contingency(network, snapshots=None, branch_outages=None, x_tol=1e-6,
+                           n_jobs=1, executor=None):
+    """
+    Computes the full non-linear power flow for a selection of branch
+    outages (AC contingency analysis).
+
+    After a base case power flow, the outage of each branch is solved
+    without rebuilding the network topology: the bus admittance matrix
+    of the sub-network is updated by removing the branch, the structure
+    and ordering of the base case Jacobian are reused and Newton-Raphson
+    is warm-started from the base case voltages for all snapshots at
+    once. If an outage splits the sub-network, the island with the slack
+    bus is solved and the buses of the other islands are de-energised.
+
+    Only sub-networks with AC carrier and the slack generator taking up
+    the slack are supported; the results of the network are those of the
+    base case.
+
+    Parameters
+    ----------
+    snapshots : list-like|single snapshot
+        A subset or an elements of network.snapshots on which to run
+        the power flow, defaults to network.snapshots
+    branch_outages : list-like
+        A list of passive branches which are to be tested for outages.
+        If None, it's take as all network.passive_branches_i()
+    x_tol: float
+        Tolerance for Newton-Raphson power flow.
+    n_jobs : int, default 1
+        Number of worker processes. If larger than 1, the outages of
+        each sub-network are split into blocks which are solved in
+        parallel in a process pool; -1 uses all cores.
+    executor : concurrent.futures.Executor, default None
+        Executor to solve the blocks of outages on instead of starting a
+        new process pool.
+
+    Returns
+    -------
+    dict
+        Dictionary with the keys 'n_iter', 'error', 'converged' and
+        'max_loading' of DataFrames with the snapshots as index and the
+        outages as columns, indicating the number of iterations, the
+        remaining error, the convergence status and the largest loading
+        max(|s0|,|s1|)/s_nom of the branches after each outage, the key
+        'islanded' of a Series whether an outage splits its sub-network,
+        and the key 'violations' of a DataFrame with one row per branch
+        loading above 1 ("kind" "loading") and per voltage magnitude
+        outside [v_mag_pu_min, v_mag_pu_max] ("kind" "v_mag_pu") with
+        the columns "snapshot", "outage_type", "outage", "kind",
+        "component", "name" and "value".
 
-        p0_new = p0_base + pd.Series(sn.BODF[:,branch_i]*p0_base[branch],sn._branches.index)
+    Examples
+    --------
+    >>> network.pf_contingency(network.snapshots, branch_outages)
+    """
 
-        p0[branch] = p0_new
+    snapshots = _as_snapshots(network, snapshots)
 
-    return p0
+    network.pf(snapshots, x_tol=x_tol)
+
+    branch_outages, outages_by_sub_network = _branch_outages_by_sub_network(network, branch_outages)
+    outages_i = pd.MultiIndex.from_tuples(branch_outages) if branch_outages else pd.MultiIndex.from_arrays([[],[]])
+    outages_pos = {branch: i for i, branch in enumerate(branch_outages)}
+
+    shape = (len(snapshots), len(branch_outages))
+    n_iter = np.zeros(shape, dtype=int)
+    error = np.full(shape, np.nan)
+    converged = np.zeros(shape, dtype=bool)
+    max_loading = np.full(shape, np.nan)
+    islanded = np.zeros(len(branch_outages), dtype=bool)
+    violations = []
+
+    with _pf_executor(n_jobs, executor) as executor:
+        results = []
+        for sub_network, outages in outages_by_sub_network.items():
+            sn = network.sub_networks.at[sub_network, "obj"]
+            if network.sub_networks.at[sub_network, "carrier"] != "AC":
+                logger.warning("Non-AC sub-network {} is not supported for the AC contingency analysis, "
+                               "skipping its outages.".format(sub_network))
+                continue
+
+            buses_o = sn.buses_o
+            branches = sn.branches()
+            branches_i = sn.branches_i()
+
+            ss = (network.buses_t.p.loc[snapshots,buses_o].values
+                  + 1j*network.buses_t.q.loc[snapshots,buses_o].values)
+            v_mag_pu = network.buses_t.v_mag_pu.loc[snapshots,buses_o].values.astype(float)
+            v_ang = network.buses_t.v_ang.loc[snapshots,buses_o].values.astype(float)
+
+            args = (sn.Y, sn.Y0, sn.Y1, buses_o.get_indexer(branches.bus0),
+                    buses_o.get_indexer(branches.bus1), len(sn.pvs), ss, v_mag_pu, v_ang)
+            limits = (branches.s_nom.reindex(branches_i).values,
+                      network.buses.v_mag_pu_min.reindex(buses_o).values,
+                      network.buses.v_mag_pu_max.reindex(buses_o).values)
+
+            positions = branches_i.get_indexer(pd.MultiIndex.from_tuples(outages))
+            if executor is None:
+                blocks = [np.arange(len(outages))]
+            else:
+                blocks = _snapshot_chunks(len(outages), executor=executor)
+
+            for block in blocks:
+                if executor is None:
+                    #the Jacobian structure is shared with the base case power flow
+                    jacobian = getattr(sn, '_jacobian', None)
+                    if (jacobian is None or jacobian.Y is not sn.Y or jacobian.num_pvs != len(sn.pvs)
+                        or jacobian.distribute_slack):
+                        jacobian = None
+                    result = _pf_contingency_block(*(args + (positions[block],) + limits),
+                                                   x_tol=x_tol, jacobian=jacobian)
+                else:
+                    result = executor.submit(_pf_contingency_block, *(args + (positions[block],) + limits),
+                                             x_tol=x_tol)
+                results.append((sn, branches_i, buses_o, [outages_pos[outages[i]] for i in block], result))
+
+        for sn, branches_i, buses_o, columns, result in results:
+            if executor is not None:
+                result = result.result()
+            (n_iter[:,columns], error[:,columns], converged[:,columns], max_loading[:,columns],
+             islanded[columns], overloads, voltage_violations) = result
+
+            for kind, (t, k, m, value), index in [("loading", overloads, branches_i),
+                                                  ("v_mag_pu", voltage_violations,
+                                                   pd.MultiIndex.from_arrays([["Bus"]*len(buses_o), buses_o]))]:
+                o = np.asarray(columns, dtype=int)[k]
+                violations.append(pd.DataFrame({"snapshot" : snapshots[t],
+                                                "outage_type" : outages_i.get_level_values(0)[o],
+                                                "outage" : outages_i.get_level_values(1)[o],
+                                                "kind" : kind,
+                                                "component" : index.get_level_values(0)[m],
+                                                "name" : index.get_level_values(1)[m],
+                                                "value" : value},
+                                               columns=["snapshot", "outage_type", "outage", "kind",
+                                                        "component", "name", "value"]))
+
+    if islanded.any():
+        logger.info("The outages of %d branches split their sub-networks", islanded.sum())
+    if not converged.all():
+        logger.warning("The power flow did not converge for %d of %d outages and snapshots",
+                       (~converged).sum(), converged.size)
+
+    columns = pd.Index(branch_outages, tupleize_cols=False)
+    violations = (pd.concat(violations, ignore_index=True) if violations else
+                  pd.DataFrame(columns=["snapshot", "outage_type", "outage", "kind",
+                                        "component", "name", "value"]))
+
+    return Dict({'n_iter': pd.DataFrame(n_iter, snapshots, columns),
+                 'error': pd.DataFrame(error, snapshots, columns),
+                 'converged': pd.DataFrame(converged, snapshots, columns),
+                 'max_loading': pd.DataFrame(max_loading, snapshots, columns),
+                 'islanded': pd.Series(islanded, columns),
+                 'violations': violations})
+
+
+def _iterative_sclopf(network, snapshots, branch_outages, outages_by_sub_network, solver_name="glpk",
+                      extra_functionality=None, solver_options={}, keep_files=False, formulation="angles",
+                      ptdf_tolerance=0., max_iterations=10, violation_tolerance=1e-4, chunksize=100):
+    """
+    SCLOPF by lazy constraint generation, see network_sclopf.
 
+    The LOPF is solved without contingency constraints; then the flows
+    after the branch outages are screened with the BODF and only the
+    constraints which are violated are added to the model, which is
+    solved again, until no constraint is violated.
+    """
 
+    passive_branches = network.passive_branches()
+    passive_branches_i = passive_branches.index
+    extendable = passive_branches.s_nom_extendable.values
+
+    #the topology is determined by network_sclopf, the model and the BODF
+    #need the dependent values and B and H of all sub-networks
+    calculate_dependent_values(network)
+    for sn in network.sub_networks.obj:
+        find_bus_controls(sn)
+        calculate_B_H(sn, skip_pre=True)
+
+    network_lopf_build_model(network, snapshots, skip_pre=True, formulation=formulation,
+                             ptdf_tolerance=ptdf_tolerance)
+
+    if extra_functionality is not None:
+        extra_functionality(network, snapshots)
+
+    model = network.model
+    model.contingency_flow = ConstraintList()
+
+    network_lopf_prepare_solver(network, solver_name=solver_name)
+    persistent = isinstance(network.opt, PersistentSolver)
+
+    #BODF of the outages of each sub-network (all branches x outages)
+    BODFs = collections.OrderedDict((sub_network, network.sub_networks.at[sub_network, "obj"]
+                                     .calculate_partial_BODF(branch_outages=outages, skip_pre=True).values)
+                                    for sub_network, outages in outages_by_sub_network.items())
+
+    added = set()
+    rounds = []
+    for iteration in range(max_iterations + 1):
+
+        status, termination_condition = network_lopf_solve(network, snapshots, formulation=formulation,
+                                                           solver_options=solver_options,
+                                                           keep_files=keep_files, free_memory={},
+                                                           warmstart=iteration > 0)
+        if status != "ok":
+            logger.error("SCLOPF stopped in iteration %d since the optimisation failed", iteration)
+            return pd.DataFrame(rounds, columns=["objective", "violations", "max_violation", "constraints"])
+
+        p0_base = _base_flows(network, snapshots)
+        s_nom = network.passive_branches().s_nom_opt.values
+
+        #(snapshot, branch, outage, sign) of the violated contingency constraints
+        violated = []
+        max_violation = 0.
+        for sub_network, outages in outages_by_sub_network.items():
+            sn = network.sub_networks.at[sub_network, "obj"]
+            branches_pos = passive_branches_i.get_indexer(sn.branches_i())
+            outages_pos = passive_branches_i.get_indexer(pd.MultiIndex.from_tuples(outages))
+            BODF = BODFs[sub_network]
+
+            for start in range(0, len(outages), chunksize):
+                block = slice(start, start+chunksize)
+                p0 = (p0_base[:,branches_pos,newaxis] +
+                      BODF[newaxis,:,block]*p0_base[:,newaxis,outages_pos[block]])
+                with np.errstate(invalid='ignore'):
+                    violation = abs(p0) - s_nom[branches_pos][newaxis,:,newaxis]
+                t, b, c = np.nonzero(violation > violation_tolerance)
+                if len(t):
+                    max_violation = max(max_violation, violation[t,b,c].max())
+                violated.extend(zip(t, branches_pos[b], outages_pos[block][c], np.sign(p0[t,b,c]),
+                                    BODF[:,block][b,c]))
+
+        new = [v for v in violated if v[:4] not in added]
+
+        rounds.append((network.objective, len(violated), max_violation, len(new)))
+        logger.info("SCLOPF iteration %d: %d violated contingency constraints (max. %f), adding %d",
+                    iteration, len(violated), max_violation, len(new))
+
+        if not violated or iteration == max_iterations:
+            break
+        if not new:
+            logger.warning("The violated contingency constraints are already part of the model, "
+                           "stopping the iteration; try a smaller violation_tolerance.")
+            break
+
+        for t, b, c, sign, factor in new:
+            added.add((t, b, c, sign))
+            snapshot = snapshots[t]
+            branch, outage = passive_branches_i[b], passive_branches_i[c]
+            flow = sign*(model.passive_branch_p[branch + (snapshot,)] +
+                         factor*model.passive_branch_p[outage + (snapshot,)])
+            if extendable[b]:
+                constraint = model.contingency_flow.add(flow - model.passive_branch_s_nom[branch] <= 0)
+            else:
+                constraint = model.contingency_flow.add(flow <= passive_branches.s_nom.iat[b])
+            if persistent:
+                network.opt.add_constraint(constraint)
+
+    if rounds and rounds[-1][1] > 0:
+        logger.warning("SCLOPF did not converge in %d iterations, %d contingency constraints are still violated",
+                       max_iterations, rounds[-1][1])
+    else:
+        logger.info("SCLOPF converged after %d iterations with %d contingency constraints",
+                    iteration, len(added))
+
+    return pd.DataFrame(rounds, columns=["objective", "violations", "max_violation", "constraints"])
 
 
 def network_sclopf(network, snapshots=None, branch_outages=None, solver_name="glpk",
                    skip_pre=False, extra_functionality=None, solver_options={},
-                   keep_files=False, formulation="angles", ptdf_tolerance=0.):
+                   keep_files=False, formulation="angles", ptdf_tolerance=0.,
+                   iterative=False, max_iterations=10, violation_tolerance=1e-4):
     """
     Computes Security-Constrained Linear Optimal Power Flow (SCLOPF).
 
@@ -198,14 +1262,28 @@ def network_sclopf(network, snapshots=None, branch_outages=None, solver_name="gl
         Formulation of the linear power flow equations to use; must be
         one of ["angles","cycles","kirchoff","ptdf"]
     ptdf_tolerance : float
+    iterative : bool, default False
+        Generate the contingency constraints lazily: solve without
+        them, screen the flows after the outages with the BODF, add only
+        the violated constraints and solve again (warm-started if the
+        solver supports it) until no constraint is violated.
+    max_iterations : int, default 10
+        Maximum number of rounds of adding constraints if `iterative`.
+    violation_tolerance : float, default 1e-4
+        Overloads in MW up to which a contingency constraint is not
+        considered violated if `iterative`.
 
     Returns
     -------
-    None
+    None, or if `iterative` a pandas.DataFrame with one row per solve
+    and the columns "objective", "violations" (number of violated
+    contingency constraints), "max_violation" and "constraints" (number
+    of constraints added after the solve).
 
     Examples
     --------
     >>> network.sclopf(network, branch_outages)
+    >>> network.sclopf(network, branch_outages, iterative=True)
     """
 
     if not skip_pre:
@@ -215,14 +1293,21 @@ def network_sclopf(network, snapshots=None, branch_outages=None, solver_name="gl
 
     passive_branches = network.passive_branches()
 
-    if branch_outages is None:
-        branch_outages = passive_branches.index
+    branch_outages, outages_by_sub_network = _branch_outages_by_sub_network(network, branch_outages)
+
+    if iterative:
+        return _iterative_sclopf(network, snapshots, branch_outages, outages_by_sub_network,
+                                 solver_name=solver_name, extra_functionality=extra_functionality,
+                                 solver_options=solver_options, keep_files=keep_files,
+                                 formulation=formulation, ptdf_tolerance=ptdf_tolerance,
+                                 max_iterations=max_iterations, violation_tolerance=violation_tolerance)
 
-    #prepare the sub networks by calculating BODF and preparing helper DataFrames
+    #prepare the sub networks by calculating the BODF of the outages and
+    #preparing helper DataFrames
 
     for sn in network.sub_networks.obj:
 
-        sn.calculate_BODF()
+        sn.calculate_partial_BODF(branch_outages=outages_by_sub_network.get(sn.name, []))
 
         sn._branches = sn.branches()
         sn._branches["_i"] = range(sn._branches.shape[0])
@@ -239,24 +1324,20 @@ def network_sclopf(network, snapshots=None, branch_outages=None, solver_name="gl
         flow_lower = {}
 
         for branch in branch_outages:
-            if type(branch) is not tuple:
-                logger.warning("No type given for {}, assuming it is a line".format(branch))
-                branch = ("Line",branch)
-
             sub = network.sub_networks.at[passive_branches.at[branch,"sub_network"],"obj"]
 
-            branch_i = sub._branches.at[branch,"_i"]
+            BODF = sub.partial_BODF[branch].values
 
             branch_outage_keys.extend([(branch[0],branch[1],b[0],b[1]) for b in sub._branches.index])
 
-            flow_upper.update({(branch[0],branch[1],b[0],b[1],sn) : [[(1,network.model.passive_branch_p[b[0],b[1],sn]),(sub.BODF[sub._branches.at[b,"_i"],branch_i],network.model.passive_branch_p[branch[0],branch[1],sn])],"<=",sub._fixed_branches.at[b,"s_nom"]] for b in sub._fixed_branches.index for sn in snapshots})
+            flow_upper.update({(branch[0],branch[1],b[0],b[1],sn) : [[(1,network.model.passive_branch_p[b[0],b[1],sn]),(BODF[sub._branches.at[b,"_i"]],network.model.passive_branch_p[branch[0],branch[1],sn])],"<=",sub._fixed_branches.at[b,"s_nom"]] for b in sub._fixed_branches.index for sn in snapshots})
 
-            flow_upper.update({(branch[0],branch[1],b[0],b[1],sn) : [[(1,network.model.passive_branch_p[b[0],b[1],sn]),(sub.BODF[sub._branches.at[b,"_i"],branch_i],network.model.passive_branch_p[branch[0],branch[1],sn]),(-1,network.model.passive_branch_s_nom[b[0],b[1]])],"<=",0] for b in sub._extendable_branches.index for sn in snapshots})
+            flow_upper.update({(branch[0],branch[1],b[0],b[1],sn) : [[(1,network.model.passive_branch_p[b[0],b[1],sn]),(BODF[sub._branches.at[b,"_i"]],network.model.passive_branch_p[branch[0],branch[1],sn]),(-1,network.model.passive_branch_s_nom[b[0],b[1]])],"<=",0] for b in sub._extendable_branches.index for sn in snapshots})
 
 
-            flow_lower.update({(branch[0],branch[1],b[0],b[1],sn) : [[(1,network.model.passive_branch_p[b[0],b[1],sn]),(sub.BODF[sub._branches.at[b,"_i"],branch_i],network.model.passive_branch_p[branch[0],branch[1],sn])],">=",-sub._fixed_branches.at[b,"s_nom"]] for b in sub._fixed_branches.index for sn in snapshots})
+            flow_lower.update({(branch[0],branch[1],b[0],b[1],sn) : [[(1,network.model.passive_branch_p[b[0],b[1],sn]),(BODF[sub._branches.at[b,"_i"]],network.model.passive_branch_p[branch[0],branch[1],sn])],">=",-sub._fixed_branches.at[b,"s_nom"]] for b in sub._fixed_branches.index for sn in snapshots})
 
-            flow_lower.update({(branch[0],branch[1],b[0],b[1],sn) : [[(1,network.model.passive_branch_p[b[0],b[1],sn]),(sub.BODF[sub._branches.at[b,"_i"],branch_i],network.model.passive_branch_p[branch[0],branch[1],sn]),(1,network.model.passive_branch_s_nom[b[0],b[1]])],">=",0] for b in sub._extendable_branches.index for sn in snapshots})
+            flow_lower.update({(branch[0],branch[1],b[0],b[1],sn) : [[(1,network.model.passive_branch_p[b[0],b[1],sn]),(BODF[sub._branches.at[b,"_i"]],network.model.passive_branch_p[branch[0],branch[1],sn]),(1,network.model.passive_branch_s_nom[b[0],b[1]])],">=",0] for b in sub._extendable_branches.index for sn in snapshots})
 
 
         l_constraint(network.model,"contingency_flow_upper",flow_upper,branch_outage_keys,snapshots)
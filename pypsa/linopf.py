@@ -23,10 +23,13 @@ from .pf import (_as_snapshots, get_switchable_as_dense as get_as_dense)
 from .descriptors import (get_bounds_pu, get_extendable_i, get_non_extendable_i,
                           expand_series, nominal_attrs, additional_linkports, Dict)
 
-from .linopt import (linexpr, write_bound, write_constraint, set_conref,
-                     set_varref, get_con, get_var, join_exprs, run_and_read_cbc,
-                     run_and_read_gurobi, run_and_read_glpk, define_constraints,
-                     define_variables, align_with_static_component, define_binaries)
+from .linopt import (linexpr, linterms, LinearTerms, write_bound,
+                     write_constraint, write_objective, write_problem_file,
+                     set_conref, set_varref, get_con, get_var, join_exprs,
+                     run_and_read_cbc, run_and_read_gurobi, run_and_read_glpk,
+                     run_and_read_highs,
+                     define_constraints, define_variables,
+                     align_with_static_component, define_binaries)
 
 
 import pandas as pd
@@ -130,13 +133,11 @@ def define_dispatch_for_extendable_constraints(n, sns, c, attr):
     nominal_v = get_var(n, c, nominal_attrs[c])[ext_i]
     rhs = 0
 
-    lhs, *axes = linexpr((max_pu, nominal_v), (-1, operational_ext_v),
-                         return_axes=True)
-    define_constraints(n, lhs, '>=', rhs, c, 'mu_upper', axes=axes, spec=attr)
+    lhs = linterms((max_pu, nominal_v), (-1, operational_ext_v))
+    define_constraints(n, lhs, '>=', rhs, c, 'mu_upper', spec=attr)
 
-    lhs, *axes = linexpr((min_pu, nominal_v), (-1, operational_ext_v),
-                         return_axes=True)
-    define_constraints(n, lhs, '<=', rhs, c, 'mu_lower', axes=axes, spec=attr)
+    lhs = linterms((min_pu, nominal_v), (-1, operational_ext_v))
+    define_constraints(n, lhs, '<=', rhs, c, 'mu_lower', spec=attr)
 
 
 def define_fixed_variable_constraints(n, sns, c, attr, pnl=True):
@@ -197,10 +198,10 @@ def define_committable_generator_constraints(n, snapshots):
     status = get_var(n, c, attr)
     p = get_var(n, c, 'p')[com_i]
 
-    lhs = linexpr((lower, status), (-1, p))
+    lhs = linterms((lower, status), (-1, p))
     define_constraints(n, lhs, '<=', 0, 'Generators', 'committable_lb')
 
-    lhs = linexpr((upper, status), (-1, p))
+    lhs = linterms((upper, status), (-1, p))
     define_constraints(n, lhs, '>=', 0, 'Generators', 'committable_ub')
 
 
@@ -279,11 +280,16 @@ def define_nodal_balance_constraints(n, sns):
         # additional sign only necessary for branches in reverse direction
         if 'sign' in n.df(c):
             sign = sign * n.df(c).sign
-        expr = linexpr((sign, get_var(n, c, attr))).rename(columns=n.df(c)[groupcol])
-        # drop empty bus2, bus3 if multiline link
-        if c == 'Link':
-            expr.drop(columns='', errors='ignore', inplace=True)
-        return expr
+        terms = linterms((sign, get_var(n, c, attr)))
+        # move the terms to the positions of their buses, which drops the
+        # empty bus2, bus3 of multiline links
+        buses = n.buses.index.get_indexer(n.df(c)[groupcol]
+                                          .reindex(terms.axes[1]))
+        snapshot, component = np.divmod(terms.row, terms.shape[1])
+        bus = buses[component]
+        keep = bus >= 0
+        return (snapshot[keep] * len(n.buses) + bus[keep], terms.coeff[keep],
+                terms.var[keep])
 
     # one might reduce this a bit by using n.branches and lookup
     args = [['Generator', 'p'], ['Store', 'p'], ['StorageUnit', 'p_dispatch'],
@@ -297,10 +303,9 @@ def define_nodal_balance_constraints(n, sns):
         eff = get_as_dense(n, 'Link', f'efficiency{i}', sns)
         args.append(['Link', 'p', f'bus{i}', eff])
 
-    lhs = (pd.concat([bus_injection(*arg) for arg in args], axis=1)
-           .groupby(axis=1, level=0)
-           .agg(lambda x: ''.join(x.values))
-           .reindex(columns=n.buses.index, fill_value=''))
+    row, coeff, var = map(np.concatenate, zip(*[bus_injection(*arg) for arg in args]))
+    lhs = LinearTerms(row, coeff, var, (len(sns), len(n.buses)),
+                      axes=[sns, n.buses.index])
     sense = '='
     rhs = ((- get_as_dense(n, 'Load', 'p_set', sns) * n.loads.sign)
            .groupby(n.loads.bus, axis=1).sum()
@@ -317,11 +322,6 @@ def define_kirchhoff_constraints(n, sns):
     if len(comps) == 0: return
     branch_vars = pd.concat({c:get_var(n, c, 's') for c in comps}, axis=1)
 
-    def cycle_flow(ds):
-        ds = ds[lambda ds: ds!=0.].dropna()
-        vals = linexpr((ds, branch_vars[ds.index]), as_pandas=False)
-        return vals.sum(1)
-
     constraints = []
     for sub in n.sub_networks.obj:
         branches = sub.branches()
@@ -330,15 +330,102 @@ def define_kirchhoff_constraints(n, sns):
             continue
         carrier = n.sub_networks.carrier[sub.name]
         weightings = branches.x_pu_eff if carrier == 'AC' else branches.r_pu_eff
-        C_weighted = 1e5 * C.mul(weightings, axis=0)
-        cycle_sum = C_weighted.apply(cycle_flow)
-        cycle_sum.index = sns
+        C_weighted = (1e5 * C.mul(weightings, axis=0)).values
+        # terms of the cycles in the order of the branches
+        cycle, branch = np.nonzero(((C_weighted != 0) &
+                                    ~np.isnan(C_weighted)).T)
+        num_cycles = C.shape[1]
+        flows = branch_vars[branches.index].values
+        row = (np.arange(len(sns))[:, np.newaxis] * num_cycles + cycle).ravel()
+        cycle_sum = LinearTerms(row, np.tile(C_weighted[branch, cycle], len(sns)),
+                                flows[:, branch], (len(sns), num_cycles),
+                                axes=[sns, C.columns])
         con = write_constraint(n, cycle_sum, '=', 0)
         constraints.append(con)
     constraints = pd.concat(constraints, axis=1, ignore_index=True)
     set_conref(n, constraints, 'SubNetwork', 'mu_kirchhoff_voltage_law')
 
 
+def define_contingency_constraints(n, sns, branch_outages=None, chunksize=100):
+    """
+    Defines the security constraints that the flows on the passive branches
+    stay within their nominal capacity after the outage of each of the
+    branch outages, i.e. for all snapshots t, branches b and outages c
+
+        -s_nom_b <= s_b,t + BODF_bc s_c,t <= s_nom_b
+
+    where s_nom_b is a variable for extendable branches. The constraints are
+    written from the BODF of the outages for all snapshots and branches of a
+    block of `chunksize` outages at once; constraints with a zero factor,
+    which coincide with the ordinary flow limits, are skipped. They are
+    stored under n.cons.Contingency.pnl with the attributes 'mu_upper' and
+    'mu_lower' and columns (outage_type, outage, branch_type, branch).
+
+    """
+    comps = n.passive_branch_components & set(n.variables.index.levels[0])
+    if len(comps) == 0: return
+    passive_branches = n.passive_branches()
+    if branch_outages is None:
+        branch_outages = passive_branches.index
+    branch_outages = [b if isinstance(b, tuple) else ('Line', b)
+                      for b in branch_outages]
+
+    flows = (pd.concat({c: get_var(n, c, 's') for c in comps}, axis=1)
+             .reindex(columns=passive_branches.index).loc[sns])
+
+    # capacity terms, constants for fixed and variables for extendable branches
+    ext_b = passive_branches.s_nom_extendable
+    s_nom = passive_branches.s_nom.where(~ext_b, 0.)
+    s_nom_v = pd.Series(-1, passive_branches.index)
+    ext_comps = [c for c in comps if not get_extendable_i(n, c).empty]
+    if ext_comps:
+        ext_v = pd.concat({c: get_var(n, c, 's_nom')[get_extendable_i(n, c)]
+                           for c in ext_comps})
+        s_nom_v.loc[ext_v.index] = ext_v.values
+
+    sub_network_of = passive_branches.sub_network
+    upper, lower = [], []
+    for sub in n.sub_networks.obj:
+        outages = [b for b in branch_outages if sub_network_of[b] == sub.name]
+        if not outages: continue
+        branches_i = sub.branches_i()
+        BODF = sub.calculate_partial_BODF(branch_outages=outages).values
+        f = flows[branches_i].values
+
+        for start in range(0, len(outages), chunksize):
+            chunk = outages[start:start+chunksize]
+            coeff = BODF[:, start:start+chunksize]
+            # outages which split the sub-network have no finite factors
+            keep = ((coeff.T != 0) & np.isfinite(coeff.T) &
+                    (pd.MultiIndex.from_tuples(chunk).values[:, np.newaxis]
+                     != branches_i.values[np.newaxis, :])).ravel()
+            if not keep.any(): continue
+            cols = pd.Index([c + b for c in chunk for b in branches_i],
+                            tupleize_cols=False)[keep]
+            tile = lambda ds: np.tile(ds.reindex(branches_i).values, len(chunk))[keep]
+            axes = (sns, cols)
+
+            # block of outages x branches flattened into the columns
+            f_b = np.tile(f, len(chunk))[:, keep]
+            f_c = np.repeat(flows[pd.MultiIndex.from_tuples(chunk)].values,
+                            len(branches_i), axis=1)[:, keep]
+            lhs = linterms((1, f_b), (coeff.T.ravel()[keep], f_c))
+
+            v = tile(s_nom_v)
+            ext = np.flatnonzero(v >= 0)
+            capacity = lambda sign: LinearTerms(ext, np.full(len(ext), sign),
+                                                v[ext], (len(v),))
+
+            upper.append(write_constraint(n, lhs + capacity(-1.), '<=',
+                                          tile(s_nom), axes))
+            lower.append(write_constraint(n, lhs + capacity(1.), '>=',
+                                          -tile(s_nom), axes))
+
+    if upper:
+        set_conref(n, pd.concat(upper, axis=1), 'Contingency', 'mu_upper')
+        set_conref(n, pd.concat(lower, axis=1), 'Contingency', 'mu_lower')
+
+
 def define_storage_unit_constraints(n, sns):
     """
     Defines state of charge (soc) constraints for storage units. In principal
@@ -537,36 +624,48 @@ def define_objective(n, sns):
         ext_i = get_extendable_i(n, c)
         constant += n.df(c)[attr][ext_i] @ n.df(c).capital_cost[ext_i]
     object_const = write_bound(n, constant, constant)
-    n.objective_f.write(linexpr((-1, object_const), as_pandas=False)[0])
+    write_objective(n, linterms((-1, object_const)))
 
     for c, attr in lookup.query('marginal_cost').index:
         cost = (get_as_dense(n, c, 'marginal_cost', sns)
                 .loc[:, lambda ds: (ds != 0).all()]
                 .mul(n.snapshot_weightings[sns], axis=0))
         if cost.empty: continue
-        terms = linexpr((cost, get_var(n, c, attr).loc[sns, cost.columns]))
-        n.objective_f.write(join_exprs(terms))
+        terms = linterms((cost, get_var(n, c, attr).loc[sns, cost.columns]))
+        write_objective(n, terms)
     # investment
     for c, attr in nominal_attrs.items():
         cost = n.df(c)['capital_cost'][get_extendable_i(n, c)]
         if cost.empty: continue
-        terms = linexpr((cost, get_var(n, c, attr)[cost.index]))
-        n.objective_f.write(join_exprs(terms))
+        terms = linterms((cost, get_var(n, c, attr)[cost.index]))
+        write_objective(n, terms)
 
 
 def prepare_lopf(n, snapshots=None, keep_files=False,
-                 extra_functionality=None, solver_dir=None):
+                 extra_functionality=None, solver_dir=None, backend='text',
+                 problem_file=True):
     """
     Sets up the linear problem and writes it out to a lp file
 
+    With the 'text' backend the variables, constraints and the objective are
+    written out as text while they are defined. With the 'matrix' backend they
+    are collected as arrays in n._problem, see
+    :func:`pypsa.linopt.problem_matrices`, and the lp file is rendered at the
+    end, unless problem_file is False.
+
     Returns
     -------
     Tuple (fdp, problem_fn) indicating the file descriptor and the file name of
-    the lp file
+    the lp file, which are None if no file was written
 
     """
+    if backend not in ['text', 'matrix']:
+        raise NotImplementedError(f"Backend {backend} not in supported "
+                                  "backends: ['text', 'matrix']")
     n._xCounter, n._cCounter = 1, 1
     n.vars, n.cons = Dict(), Dict()
+    n._problem = (Dict(variables=[], binaries=[], constraints=[], objective=[])
+                  if backend == 'matrix' else None)
 
     cols = ['component', 'name', 'pnl', 'specification']
     n.variables = pd.DataFrame(columns=cols).set_index(cols[:2])
@@ -577,21 +676,24 @@ def prepare_lopf(n, snapshots=None, keep_files=False,
 
     tmpkwargs = dict(text=True, dir=solver_dir)
     # mkstemp(suffix, prefix, **tmpkwargs)
-    fdo, objective_fn = mkstemp('.txt', 'pypsa-objectve-', **tmpkwargs)
-    fdc, constraints_fn = mkstemp('.txt', 'pypsa-constraints-', **tmpkwargs)
-    fdb, bounds_fn = mkstemp('.txt', 'pypsa-bounds-', **tmpkwargs)
-    fdi, binaries_fn = mkstemp('.txt', 'pypsa-binaries-', **tmpkwargs)
-    fdp, problem_fn = mkstemp('.lp', 'pypsa-problem-', **tmpkwargs)
-
-    n.objective_f = open(objective_fn, mode='w')
-    n.constraints_f = open(constraints_fn, mode='w')
-    n.bounds_f = open(bounds_fn, mode='w')
-    n.binaries_f = open(binaries_fn, mode='w')
-
-    n.objective_f.write('\* LOPF *\n\nmin\nobj:\n')
-    n.constraints_f.write("\n\ns.t.\n\n")
-    n.bounds_f.write("\nbounds\n")
-    n.binaries_f.write("\nbinary\n")
+    fdp, problem_fn = None, None
+    if backend == 'text' or problem_file:
+        fdp, problem_fn = mkstemp('.lp', 'pypsa-problem-', **tmpkwargs)
+    if backend == 'text':
+        fdo, objective_fn = mkstemp('.txt', 'pypsa-objectve-', **tmpkwargs)
+        fdc, constraints_fn = mkstemp('.txt', 'pypsa-constraints-', **tmpkwargs)
+        fdb, bounds_fn = mkstemp('.txt', 'pypsa-bounds-', **tmpkwargs)
+        fdi, binaries_fn = mkstemp('.txt', 'pypsa-binaries-', **tmpkwargs)
+
+        n.objective_f = open(objective_fn, mode='w')
+        n.constraints_f = open(constraints_fn, mode='w')
+        n.bounds_f = open(bounds_fn, mode='w')
+        n.binaries_f = open(binaries_fn, mode='w')
+
+        n.objective_f.write('\* LOPF *\n\nmin\nobj:\n')
+        n.constraints_f.write("\n\ns.t.\n\n")
+        n.bounds_f.write("\nbounds\n")
+        n.binaries_f.write("\nbinary\n")
 
     for c, attr in lookup.query('nominal and not handle_separately').index:
         define_nominal_for_extendable_variables(n, c, attr)
@@ -620,6 +722,12 @@ def prepare_lopf(n, snapshots=None, keep_files=False,
     if extra_functionality is not None:
         extra_functionality(n, snapshots)
 
+    if backend == 'matrix':
+        if problem_file:
+            write_problem_file(n, problem_fn)
+        logger.info(f'Total preparation time: {round(time.time()-start, 2)}s')
+        return fdp, problem_fn
+
     n.binaries_f.write("end\n")
 
     # explicit closing with file descriptor is necessary for windows machines
@@ -646,6 +754,16 @@ def assign_solution(n, sns, variables_sol, constraints_dual,
     network.
 
     """
+    # solutions are dense arrays indexed by the variable and constraint
+    # references, which are gathered by fancy indexing
+    variables_sol = np.asarray(variables_sol, dtype=float)
+    constraints_dual = np.asarray(constraints_dual, dtype=float)
+
+    def gather(solution, references):
+        values = solution[references.values.astype(int, copy=False)]
+        if isinstance(references, pd.DataFrame):
+            return pd.DataFrame(values, references.index, references.columns)
+        return pd.Series(values, references.index)
 
     def set_from_frame(pnl, attr, df):
         if attr not in pnl: #use this for subnetworks_t
@@ -667,7 +785,7 @@ def assign_solution(n, sns, variables_sol, constraints_dual,
             # case that variables are timedependent
             n.solutions.at[(c, attr), 'pnl'] = True
             pnl = n.pnl(c) if predefined else n.sols[c].pnl
-            values = variables.stack().map(variables_sol).unstack()
+            values = gather(variables_sol, variables)
             if c in n.passive_branch_components:
                 set_from_frame(pnl, 'p0', values)
                 set_from_frame(pnl, 'p1', - values)
@@ -682,7 +800,7 @@ def assign_solution(n, sns, variables_sol, constraints_dual,
         else:
             # case that variables are static
             n.solutions.at[(c, attr), 'pnl'] = False
-            sol = variables.map(variables_sol)
+            sol = gather(variables_sol, variables)
             if predefined:
                 non_ext = n.df(c)[attr]
                 n.df(c)[attr + '_opt'] = sol.reindex(non_ext.index).fillna(non_ext)
@@ -724,14 +842,14 @@ def assign_solution(n, sns, variables_sol, constraints_dual,
         to_component = c in n.all_components
         if is_pnl:
             n.dualvalues.at[(c, attr), 'in_comp'] = to_component
-            duals = constraints.stack().map(sign * constraints_dual).unstack()
+            duals = sign * gather(constraints_dual, constraints)
             if c not in n.duals and not to_component:
                 n.duals[c] = Dict(df=pd.DataFrame(), pnl={})
             pnl = n.pnl(c) if to_component else n.duals[c].pnl
             set_from_frame(pnl, attr, duals)
         else:
             # here to_component can change
-            duals = constraints.map(sign * constraints_dual)
+            duals = sign * gather(constraints_dual, constraints)
             if to_component:
                 to_component = (duals.index.isin(n.df(c).index).all())
             n.dualvalues.at[(c, attr), 'in_comp'] = to_component
@@ -793,7 +911,7 @@ def network_lopf(n, snapshots=None, solver_name="cbc",
          keep_references=False, keep_files=False,
          keep_shadowprices=['Bus', 'Line', 'GlobalConstraint'],
          solver_options=None, warmstart=False, store_basis=False,
-         solver_dir=None):
+         solver_dir=None, backend='text'):
     """
     Linear optimal power flow for a group of snapshots.
 
@@ -804,7 +922,9 @@ def network_lopf(n, snapshots=None, solver_name="cbc",
         network.snapshots, defaults to network.snapshots
     solver_name : string
         Must be a solver name that pyomo recognises and that is
-        installed, e.g. "glpk", "gurobi"
+        installed, e.g. "glpk", "gurobi". "highs" passes the problem, which
+        is then built with the 'matrix' backend, in memory to the HiGHS
+        solver of scipy without writing any files.
     pyomo : bool, default True
         Whether to use pyomo for building and solving the model, setting
         this to False saves a lot of memory and time.
@@ -852,9 +972,17 @@ def network_lopf(n, snapshots=None, solver_name="cbc",
         names. Defaults to ['Bus', 'Line', 'GlobalConstraint'].
         After solving, the shadow prices can be retrieved using
         :func:`pypsa.linopt.get_dual` with corresponding name
+    backend : str, default 'text'
+        How the linear problem is built. 'text' writes out the variables,
+        constraints and objective as lp file text while they are defined.
+        'matrix' collects them as arrays of references, coefficients, senses
+        and bounds and renders the lp file only for the solver, which saves
+        the string building of the larger constraints. In this case
+        `extra_functionality` must add objective terms with
+        :func:`pypsa.linopt.write_objective` instead of n.objective_f.
 
     """
-    supported_solvers = ["cbc", "gurobi", 'glpk', 'scs']
+    supported_solvers = ["cbc", "gurobi", 'glpk', 'scs', 'highs']
     if solver_name not in supported_solvers:
         raise NotImplementedError(f"Solver {solver_name} not in "
                                   f"supported solvers: {supported_solvers}")
@@ -872,10 +1000,18 @@ def network_lopf(n, snapshots=None, solver_name="cbc",
     n.calculate_dependent_values()
     n.determine_network_topology()
 
+    # in-process solvers take the problem matrices instead of files
+    in_memory = solver_name == 'highs'
+    if in_memory:
+        backend = 'matrix'
+
     logger.info("Prepare linear problem")
     fdp, problem_fn = prepare_lopf(n, snapshots, keep_files,
-                                   extra_functionality, solver_dir)
-    fds, solution_fn = mkstemp(prefix='pypsa-solve', suffix='.sol', dir=solver_dir)
+                                   extra_functionality, solver_dir, backend,
+                                   problem_file=keep_files or not in_memory)
+    fds, solution_fn = None, None
+    if not in_memory:
+        fds, solution_fn = mkstemp(prefix='pypsa-solve', suffix='.sol', dir=solver_dir)
 
     if warmstart == True:
         warmstart = n.basis_fn
@@ -887,8 +1023,9 @@ def network_lopf(n, snapshots=None, solver_name="cbc",
     res = solve(n, problem_fn, solution_fn, solver_logfile,
                 solver_options, keep_files, warmstart, store_basis)
     status, termination_condition, variables_sol, constraints_dual, obj = res
+    n._problem = None
 
-    if not keep_files:
+    if not keep_files and not in_memory:
         os.close(fdp); os.remove(problem_fn)
         os.close(fds); os.remove(solution_fn)
 
@@ -907,6 +1044,46 @@ def network_lopf(n, snapshots=None, solver_name="cbc",
     return status,termination_condition
 
 
+def network_sclopf(n, snapshots=None, branch_outages=None, solver_name="cbc",
+                   extra_functionality=None, chunksize=100, **kwargs):
+    """
+    Computes Security-Constrained Linear Optimal Power Flow (SCLOPF) without
+    pyomo.
+
+    This ensures that no branch is overloaded even given the branch outages,
+    see :func:`define_contingency_constraints`.
+
+    Parameters
+    ----------
+    snapshots : list or index slice
+        A list of snapshots to optimise, must be a subset of
+        network.snapshots, defaults to network.snapshots
+    branch_outages : list-like
+        A list of passive branches which are to be tested for outages.
+        If None, it's take as all network.passive_branches_i()
+    solver_name : string
+        Must be a solver name that is supported by network_lopf,
+        e.g. "cbc", "gurobi"
+    extra_functionality : callable function
+        This function must take two arguments
+        `extra_functionality(network,snapshots)` and is called after
+        the contingency constraints are written.
+    chunksize : int, default 100
+        Number of outages whose constraints are written at once.
+    **kwargs
+        Keyword arguments of the lopf function.
+
+    """
+    def extra_functionality_with_contingencies(n, sns):
+        define_contingency_constraints(n, sns, branch_outages, chunksize)
+        if extra_functionality is not None:
+            extra_functionality(n, sns)
+
+    return network_lopf(n, snapshots, solver_name=solver_name,
+                        extra_functionality=extra_functionality_with_contingencies,
+                        **kwargs)
+
+
 def ilopf(n, snapshots=None, msq_threshold=0.05, min_iterations=1,
           max_iterations=100, **kwargs):
     '''
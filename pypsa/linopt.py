@@ -7,7 +7,12 @@ Tools for fast Linear Problem file writing. This module contains
   into a lp file.
 - functions to create lp format based linear expression
 - solver functions which read the lp file, run the problem and return the
-  solution
+  solution, or pass the problem matrices to an in-process solver
+
+With the 'matrix' backend, variables, constraints and the objective are not
+written out as text while the problem is built, but collected as arrays of
+references, coefficients, senses and bounds. The lp file is then only rendered
+for the solvers which read it.
 
 This module supports the linear optimal power flow calculation whithout using
 pyomo (see module linopt.py)
@@ -15,7 +20,8 @@ pyomo (see module linopt.py)
 
 from .descriptors import Dict
 import pandas as pd
-import os, logging, re, io, subprocess
+from scipy.sparse import coo_matrix, diags
+import os, logging, re, subprocess
 import numpy as np
 from pandas import IndexSlice as idx
 
@@ -122,9 +128,9 @@ def define_constraints(n, lhs, sense, rhs, name, attr='', axes=None, spec=''):
     Parameters
     ----------
     n: pypsa.Network
-    lhs: pd.Series/pd.DataFrame/np.array/str/float
+    lhs: pd.Series/pd.DataFrame/np.array/str/float/LinearTerms
         left hand side of the constraint(s), created with
-        :func:`pypsa.linot.linexpr`.
+        :func:`pypsa.linot.linexpr` or :func:`pypsa.linopt.linterms`.
     sense: pd.Series/pd.DataFrame/np.array/str/float
         sense(s) of the constraint(s)
     rhs: pd.Series/pd.DataFrame/np.array/str/float
@@ -187,6 +193,21 @@ def _get_handlers(axes, *maybearrays):
     return axes, shape, length
 
 
+def _matrix_backend(n):
+    return getattr(n, '_problem', None) is not None
+
+def _bounds_text(variables, lower, upper):
+    return join_exprs(_str_array(lower) + ' <= x' + _str_array(variables, True)
+                      + ' <= '+ _str_array(upper) + '\n')
+
+def _constraints_text(cons, lhs, sense, rhs):
+    lhs, sense, rhs = _str_array(lhs), _str_array(sense), _str_array(rhs)
+    return join_exprs('c' + _str_array(cons, True) + ':\n' +
+                      lhs + sense + ' ' + rhs + '\n\n')
+
+def _broadcast(array, shape, dtype=None):
+    return np.broadcast_to(np.asarray(array, dtype=dtype), shape).ravel()
+
 def write_bound(n, lower, upper, axes=None):
     """
     Writer function for writing out mutliple variables at a time. If lower and
@@ -198,16 +219,21 @@ def write_bound(n, lower, upper, axes=None):
     if not length: return pd.Series()
     n._xCounter += length
     variables = np.arange(n._xCounter - length, n._xCounter).reshape(shape)
-    lower, upper = _str_array(lower), _str_array(upper)
-    n.bounds_f.write(join_exprs(lower + ' <= x' + _str_array(variables, True)
-                                + ' <= '+ upper + '\n'))
+    if _matrix_backend(n):
+        n._problem.variables.append(Dict(var=variables.ravel(),
+                                         lower=_broadcast(lower, shape, float),
+                                         upper=_broadcast(upper, shape, float)))
+    else:
+        n.bounds_f.write(_bounds_text(variables, lower, upper))
     return to_pandas(variables, *axes)
 
 def write_constraint(n, lhs, sense, rhs, axes=None):
     """
     Writer function for writing out mutliple constraints to the corresponding
     constraints file. If lower and upper are numpy.ndarrays it axes must not be
-    None but a tuple of (index, columns) or (index).
+    None but a tuple of (index, columns) or (index). The lhs is either given
+    as strings created with :func:`linexpr` or as :class:`LinearTerms`
+    created with :func:`linterms`.
     Return a series or frame with constraint references.
     """
     axes, shape, length = _get_handlers(axes, lhs, sense, rhs)
@@ -216,9 +242,23 @@ def write_constraint(n, lhs, sense, rhs, axes=None):
     cons = np.arange(n._cCounter - length, n._cCounter).reshape(shape)
     if isinstance(sense, str):
         sense = '=' if sense == '==' else sense
-    lhs, sense, rhs = _str_array(lhs), _str_array(sense), _str_array(rhs)
-    n.constraints_f.write(join_exprs('c' + _str_array(cons, True) + ':\n' +
-                                     lhs + sense + ' ' + rhs + '\n\n'))
+    if isinstance(lhs, LinearTerms):
+        lhs = lhs.broadcast_to(shape)
+    if _matrix_backend(n):
+        if isinstance(lhs, LinearTerms):
+            row, coeff, var = lhs.row, lhs.coeff, lhs.var
+        else:
+            row, coeff, var = _parse_exprs(_broadcast(lhs, shape, object))
+        sense = _broadcast(sense, shape, object)
+        n._problem.constraints.append(Dict(cons=cons.ravel(),
+                                           sense=np.where(sense == '==', '=', sense),
+                                           rhs=_broadcast(rhs, shape, float),
+                                           row=cons.ravel()[row], col=var,
+                                           coeff=coeff))
+    else:
+        if isinstance(lhs, LinearTerms):
+            lhs = lhs.to_strings()
+        n.constraints_f.write(_constraints_text(cons, lhs, sense, rhs))
     return to_pandas(cons, *axes)
 
 def write_binary(n, axes):
@@ -231,13 +271,107 @@ def write_binary(n, axes):
     axes, shape, length = _get_handlers(axes)
     n._xCounter += length
     variables = np.arange(n._xCounter - length, n._xCounter).reshape(shape)
-    n.binaries_f.write(join_exprs('x' + _str_array(variables, True) + '\n'))
+    if _matrix_backend(n):
+        n._problem.binaries.append(variables.ravel())
+    else:
+        n.binaries_f.write(join_exprs('x' + _str_array(variables, True) + '\n'))
     return to_pandas(variables, *axes)
 
+def write_objective(n, terms):
+    """
+    Writer function for writing out one or mutliple objective terms, given
+    as strings created with :func:`linexpr` or as :class:`LinearTerms`
+    created with :func:`linterms`.
+    """
+    if _matrix_backend(n):
+        if isinstance(terms, LinearTerms):
+            coeff, var = terms.coeff, terms.var
+        else:
+            _, coeff, var = _parse_exprs(terms)
+        n._problem.objective.append(Dict(var=var, coeff=coeff))
+    else:
+        if isinstance(terms, LinearTerms):
+            terms = terms.to_strings()
+        n.objective_f.write(join_exprs(terms))
+
+def write_problem_file(n, problem_fn):
+    """
+    Renders the linear problem which was built with the 'matrix' backend
+    into the lp file `problem_fn`, in the same format as the 'text' backend.
+    """
+    p = n._problem
+    with open(problem_fn, 'w') as f:
+        f.write('\\* LOPF *\n\nmin\nobj:\n')
+        for o in p.objective:
+            if not len(o.var): continue
+            f.write(join_exprs(_str_array(o.coeff) + ' x' +
+                               _str_array(o.var, True) + '\n'))
+        f.write("\n\ns.t.\n\n")
+        for c in p.constraints:
+            lhs = LinearTerms(c.row - c.cons[0], c.coeff, c.col,
+                              c.cons.shape).to_strings()
+            f.write(_constraints_text(c.cons, lhs, c.sense, c.rhs))
+        f.write("\nbounds\n")
+        for v in p.variables:
+            f.write(_bounds_text(v.var, v.lower, v.upper))
+        f.write("\nbinary\n")
+        for binaries in p.binaries:
+            f.write(join_exprs('x' + _str_array(binaries, True) + '\n'))
+        f.write("end\n")
+
+def problem_matrices(n):
+    """
+    Returns the linear problem built with the 'matrix' backend in matrix form
+    as a Dict with
+
+    * A : scipy.sparse.csr_matrix, the constraint matrix
+    * sense : array of the senses '<=', '>=' or '=' of the constraints
+    * b : array of the right hand sides of the constraints
+    * lb, ub : arrays of the lower and upper bounds of the variables
+    * c : array of the objective coefficients of the variables
+    * binaries : array of the references of binary variables
+
+    Rows and columns are indexed by the constraint and variable references as
+    stored in n.cons and n.vars, the unused row and column 0 is empty.
+    """
+    p = n._problem
+    num_vars, num_cons = n._xCounter, n._cCounter
+    concat = lambda arrays, dtype: (np.concatenate(arrays) if len(arrays)
+                                    else np.array([], dtype=dtype))
+
+    lb, ub = np.zeros(num_vars), np.zeros(num_vars)
+    for v in p.variables:
+        lb[v.var], ub[v.var] = v.lower, v.upper
+    binaries = concat(p.binaries, int)
+    ub[binaries] = 1.
+
+    sense, b = np.full(num_cons, '=', dtype=object), np.zeros(num_cons)
+    for c in p.constraints:
+        sense[c.cons], b[c.cons] = c.sense, c.rhs
+    # duplicate variables in one constraint are summed up
+    A = coo_matrix((concat([c.coeff for c in p.constraints], float),
+                    (concat([c.row for c in p.constraints], int),
+                     concat([c.col for c in p.constraints], int))),
+                   shape=(num_cons, num_vars)).tocsr()
+
+    c = np.zeros(num_vars)
+    for o in p.objective:
+        np.add.at(c, o.var, o.coeff)
+
+    return Dict(A=A, sense=sense, b=b, lb=lb, ub=ub, c=c, binaries=binaries)
+
 # =============================================================================
 # helpers, helper functions
 # =============================================================================
 
+def _broadcast_shape(*shapes):
+    """
+    Returns the shape which results from broadcasting arrays of the given
+    shapes, using zero-strided views instead of allocating them.
+    """
+    return np.broadcast(*(np.broadcast_to(0, s) for s in shapes)).shape
+
+
 def broadcasted_axes(*dfs):
     """
     Helper function which, from a collection of arrays, series, frames and other
@@ -255,7 +389,11 @@ def broadcasted_axes(*dfs):
         dfs = sum(dfs, ())
 
     for df in dfs:
-        shape = max(shape, np.asarray(df).shape)
+        if isinstance(df, LinearTerms):
+            shape = _broadcast_shape(shape, df.shape)
+            axes = df.axes if len(df.axes) > len(axes) else axes
+            continue
+        shape = _broadcast_shape(shape, np.shape(df))
         if isinstance(df, (pd.Series, pd.DataFrame)):
             if len(axes):
                 assert (axes[-1] == df.axes[-1]).all(), ('Series or DataFrames '
@@ -337,6 +475,139 @@ def linexpr(*tuples, as_pandas=True, return_axes=False):
     return expr
 
 
+class LinearTerms(object):
+    """
+    Array of linear expressions in coordinate format.
+
+    In contrast to the strings created by :func:`linexpr`, each term is
+    stored as the flat position of its expression in the array, its
+    coefficient and its variable reference, such that no text has to be
+    formed for the 'matrix' backend. Terms of the same expression keep the
+    order in which they were added. LinearTerms are created with
+    :func:`linterms` and can be passed as lhs to
+    :func:`define_constraints`.
+
+    Parameters
+    ----------
+    row : array-like of int
+        Flat positions of the expressions of the terms.
+    coeff : array-like of float
+        Coefficients of the terms.
+    var : array-like of int
+        Variable references of the terms.
+    shape : tuple
+        Shape of the array of expressions.
+    axes : list of pd.Index, default None
+        Index and columns if present.
+
+    Example
+    -------
+    >>> lhs = linterms((1, get_var(n, 'Generator', 'p')))
+    >>> lhs + linterms((-1, get_var(n, 'Generator', 'p_nom')))
+    """
+
+    def __init__(self, row, coeff, var, shape, axes=None):
+        self.row = np.asarray(row, dtype=int).ravel()
+        self.coeff = np.asarray(coeff, dtype=float).ravel()
+        self.var = np.asarray(var, dtype=int).ravel()
+        self.shape = tuple(shape)
+        self.axes = list(axes) if axes is not None else []
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    def broadcast_to(self, shape):
+        """
+        Broadcast the expressions to `shape` following numpy's rules, i.e.
+        the terms are repeated for all new positions of an expression.
+        """
+        shape = tuple(shape)
+        if shape == self.shape:
+            return self
+        if not self.size or not len(self.row):
+            return LinearTerms([], [], [], shape, self.axes)
+        source = np.broadcast_to(np.arange(self.size).reshape(self.shape),
+                                 shape).ravel()
+        targets = np.argsort(source, kind='stable').reshape(self.size, -1)
+        repeats = targets.shape[1]
+        return LinearTerms(targets[self.row].ravel(),
+                           np.repeat(self.coeff, repeats),
+                           np.repeat(self.var, repeats), shape, self.axes)
+
+    def __add__(self, other):
+        """Elementwise concatenation of the terms of two expression arrays."""
+        if isinstance(other, str) and other == '':
+            return self
+        if not isinstance(other, LinearTerms):
+            return NotImplemented
+        shape = np.broadcast(np.broadcast_to(0, self.shape),
+                             np.broadcast_to(0, other.shape)).shape
+        axes = self.axes if len(self.axes) >= len(other.axes) else other.axes
+        a, b = self.broadcast_to(shape), other.broadcast_to(shape)
+        return LinearTerms(np.concatenate([a.row, b.row]),
+                           np.concatenate([a.coeff, b.coeff]),
+                           np.concatenate([a.var, b.var]), shape, axes)
+
+    __radd__ = __add__
+
+    def to_strings(self):
+        """
+        Render the expressions as numpy.array of strings as created by
+        :func:`linexpr`.
+        """
+        exprs = np.full(self.size, '', dtype=object)
+        if len(self.row):
+            order = np.argsort(self.row, kind='stable')
+            row = self.row[order]
+            terms = (_str_array(self.coeff[order]) + ' x' +
+                     _str_array(self.var[order], True) + '\n')
+            starts = np.flatnonzero(np.r_[True, row[1:] != row[:-1]])
+            exprs[row[starts]] = np.add.reduceat(terms, starts)
+        return exprs.reshape(self.shape)
+
+
+def linterms(*tuples):
+    """
+    Elementwise combination of tuples in the form (coefficient, variables) to
+    :class:`LinearTerms`. It takes the same arguments as :func:`linexpr`,
+    but the variables must be references, i.e. arrays, series or frames of
+    integers, and no strings are formed.
+
+    Parameters
+    ----------
+    tuples: tuple of tuples
+        Each tuple must of the form (coeff, var), where
+
+        * coeff is a numerical  value, or a numerical array, series, frame
+        * var is a array, series, frame of variable references
+
+    Example
+    -------
+    >>> lhs = linterms((max_pu, get_var(n, 'Generator', 'p_nom')),
+                       (-1, get_var(n, 'Generator', 'p')))
+    >>> define_constraints(n, lhs, '>=', 0, 'Generator', 'mu_upper')
+    """
+    axes, shape = broadcasted_axes(*tuples)
+    size = int(np.prod(shape))
+    row = np.tile(np.arange(size), len(tuples))
+    coeff = np.concatenate([_broadcast(c, shape, float) for c, v in tuples])
+    var = np.concatenate([_broadcast(v, shape) for c, v in tuples])
+    return LinearTerms(row, coeff, var, shape, axes)
+
+
+def _parse_exprs(exprs):
+    """
+    Coordinates (position, coefficient, variable reference) of the terms of
+    an array of linear expression strings as created by :func:`linexpr`.
+    """
+    exprs = np.asarray(exprs, dtype=object).ravel()
+    counts = np.fromiter((e.count('x') for e in exprs), int, len(exprs))
+    values = np.array(' '.join(exprs).replace('x', ' ').split(), dtype=float)
+    return (np.repeat(np.arange(len(exprs)), counts), values[0::2],
+            values[1::2].astype(int))
+
+
 def to_pandas(array, *axes):
     """
     Convert a numpy array to pandas.Series if 1-dimensional or to a
@@ -345,10 +616,26 @@ def to_pandas(array, *axes):
     return pd.Series(array, *axes) if array.ndim == 1 else pd.DataFrame(array, *axes)
 
 _to_float_str = lambda f: '%+f'%f
-_v_to_float_str = np.vectorize(_to_float_str, otypes=[object])
 
 _to_int_str = lambda d: '%d'%d
-_v_to_int_str = np.vectorize(_to_int_str, otypes=[object])
+
+def _format_array(array, fmt, chunksize=2**16):
+    """
+    Formats all entries of a numerical array with the %-format `fmt` and
+    returns them as an object array of the same shape. The entries are
+    formatted with one string formatting call per chunk of `chunksize`
+    entries instead of one Python call per entry, such that the memory of
+    the intermediate text is bounded.
+    """
+    flat = array.ravel()
+    strings = np.empty(flat.size, dtype=object)
+    template = (fmt + '\n') * chunksize
+    for start in range(0, flat.size, chunksize):
+        chunk = flat[start:start + chunksize].tolist()
+        if len(chunk) < chunksize:
+            template = (fmt + '\n') * len(chunk)
+        strings[start:start + len(chunk)] = (template % tuple(chunk)).split('\n')[:-1]
+    return strings.reshape(array.shape)
 
 def _str_array(array, integer_string=False):
     if isinstance(array, (float, int)):
@@ -357,9 +644,7 @@ def _str_array(array, integer_string=False):
         return _to_float_str(array)
     array = np.asarray(array)
     if array.dtype < str and array.size:
-        if integer_string:
-            return _v_to_int_str(np.asarray(array))
-        return _v_to_float_str(np.asarray(array))
+        return _format_array(array, '%d' if integer_string else '%+f')
     else:
         return array
 
@@ -532,13 +817,74 @@ def set_int_index(ser):
     ser.index = ser.index.str[1:].astype(int)
     return ser
 
+
+def to_dense(references, values, size):
+    """
+    Returns an array of length `size` with the `values` at the positions of
+    the variable or constraint `references`. Positions without value are NaN.
+    """
+    dense = np.full(size, np.nan)
+    dense[references] = values
+    return dense
+
+
+def read_cbc_solution(data, num_vars, num_cons):
+    """
+    Parses the lines 'index name value dual' of a cbc solution file, given as
+    bytes without the status line, into dense arrays of the variable solutions
+    and the constraint duals indexed by their references.
+
+    All fields are split at once into a bytes array; entries violating their
+    bounds are marked by an additional field '**', which is dropped. The
+    prefix 'x' or 'c' of the name field tells variables from constraints.
+    """
+    fields = np.array(data.split(), dtype=bytes)
+    table = fields[fields != b'**'].reshape(-1, 4)
+    names = table[:, 1]
+    prefix = names.astype('S1')
+    references = np.char.lstrip(names, b'xc').astype(int)
+    is_var, is_con = prefix == b'x', prefix == b'c'
+    variables_sol = to_dense(references[is_var],
+                             table[is_var, 2].astype(float), num_vars)
+    constraints_dual = to_dense(references[is_con],
+                                table[is_con, 3].astype(float), num_cons)
+    return variables_sol, constraints_dual
+
+
+def read_glpk_table(block):
+    """
+    Splits a table of the glpk solution report into a dictionary of its
+    stripped columns as bytes arrays. The fields are fixed-width, their
+    positions are taken from the dashed line below the header.
+    """
+    header, dashes, *lines = block.split(b'\n')
+    table = np.array(lines, dtype=f'S{max(len(dashes), 1)}')
+    chars = table.view('S1').reshape(len(table), table.itemsize)
+    columns = {}
+    for field in re.finditer(rb'-+', dashes):
+        start, end = field.span()
+        name = header[start:end].strip().decode()
+        values = np.ascontiguousarray(chars[:, start:end])
+        columns[name] = np.char.strip(values.view(f'S{end - start}').ravel())
+    return columns
+
+
+def glpk_to_float(values):
+    """
+    Converts a column of the glpk solution report to floats, where empty
+    fields, '< eps' and '=' are zero.
+    """
+    blank = np.isin(values, [b'', b'< eps', b'='])
+    return np.where(blank, b'0', values).astype(float)
+
+
 def run_and_read_cbc(n, problem_fn, solution_fn, solver_logfile,
                      solver_options, keep_files, warmstart=None,
                      store_basis=True):
     """
     Solving function. Reads the linear problem file and passes it to the cbc
     solver. If the solution is sucessful it returns variable solutions and
-    constraint dual values.
+    constraint dual values as dense arrays indexed by their references.
 
     For more information on the solver options, run 'cbc' in your shell
     """
@@ -557,15 +903,16 @@ def run_and_read_cbc(n, problem_fn, solution_fn, solver_logfile,
     if solver_logfile is not None:
         print(result.stdout.decode('utf-8'), file=open(solver_logfile, 'w'))
 
-    f = open(solution_fn,"r")
-    data = f.readline()
-    f.close()
+    # the solution file is read into memory at once and parsed vectorized
+    with open(solution_fn, 'rb') as f:
+        status_line = f.readline().decode()
+        data = f.read()
 
-    if data.startswith("Optimal - objective value"):
+    if status_line.startswith("Optimal - objective value"):
         status = "ok"
-        termination_condition = status
-        objective = float(data[len("Optimal - objective value "):])
-    elif "Infeasible" in data:
+        termination_condition = "optimal"
+        objective = float(status_line[len("Optimal - objective value "):])
+    elif "Infeasible" in status_line:
         termination_condition = "infeasible"
         status = 'infeasible'
     else:
@@ -575,11 +922,8 @@ def run_and_read_cbc(n, problem_fn, solution_fn, solver_logfile,
     if termination_condition != "optimal":
         return status, termination_condition, None, None, None
 
-    sol = pd.read_csv(solution_fn, header=None, skiprows=[0],
-                      sep=r'\s+', usecols=[1,2,3], index_col=0)
-    variables_b = sol.index.str[0] == 'x'
-    variables_sol = sol[variables_b][2].pipe(set_int_index)
-    constraints_dual = sol[~variables_b][3].pipe(set_int_index)
+    variables_sol, constraints_dual = read_cbc_solution(
+        data, n._xCounter, n._cCounter)
 
     return (status, termination_condition, variables_sol,
             constraints_dual, objective)
@@ -591,7 +935,7 @@ def run_and_read_glpk(n, problem_fn, solution_fn, solver_logfile,
     """
     Solving function. Reads the linear problem file and passes it to the glpk
     solver. If the solution is sucessful it returns variable solutions and
-    constraint dual values.
+    constraint dual values as dense arrays indexed by their references.
 
     For more information on the glpk solver options:
     https://kam.mff.cuni.cz/~elias/glpk.pdf
@@ -610,38 +954,36 @@ def run_and_read_glpk(n, problem_fn, solution_fn, solver_logfile,
 
     subprocess.run(command.split(' '), stdout=subprocess.PIPE)
 
-    f = open(solution_fn)
-    def read_until_break(f):
-        linebreak = False
-        while not linebreak:
-            line = f.readline()
-            linebreak = line == '\n'
-            yield line
-
-    info = io.StringIO(''.join(read_until_break(f))[:-2])
-    info = pd.read_csv(info, sep=':',  index_col=0, header=None)[1]
-    status = info.Status.lower().strip()
-    objective = float(re.sub('[^0-9\.\+\-]+', '', info.Objective))
+    # the report consists of blocks separated by empty lines: the problem
+    # info, the rows, the columns and the optimality conditions
+    # the report is read into memory at once
+    with open(solution_fn, 'rb') as f:
+        blocks = f.read().split(b'\n\n')
+
+    info = dict(line.split(':', 1) for line in blocks[0].decode().splitlines()
+                if ':' in line)
+    status = info.get('Status', 'other').lower().strip()
     termination_condition = status
 
     if 'optimal' not in termination_condition:
         return status, termination_condition, None, None, None
     else:
         status = 'ok'
+    objective = float(re.search(r'=\s*(\S+)', info['Objective']).group(1))
 
-    duals = io.StringIO(''.join(read_until_break(f))[:-2])
-    duals = pd.read_fwf(duals)[1:].set_index('Row name')
-    if 'Marginal' in duals:
-        constraints_dual = pd.to_numeric(duals['Marginal'], 'coerce')\
-                              .fillna(0).pipe(set_int_index)
+    rows = read_glpk_table(blocks[1])
+    constraints = np.char.lstrip(rows['Row name'], b'c').astype(int)
+    if 'Marginal' in rows:
+        constraints_dual = to_dense(constraints, glpk_to_float(rows['Marginal']),
+                                    n._cCounter)
     else:
         logger.warning("Shadow prices of MILP couldn't be parsed")
-        constraints_dual = pd.Series(index=duals.index)
+        constraints_dual = np.full(n._cCounter, np.nan)
 
-    sol = io.StringIO(''.join(read_until_break(f))[:-2])
-    variables_sol = (pd.read_fwf(sol)[1:].set_index('Column name')
-                     ['Activity'].astype(float).pipe(set_int_index))
-    f.close()
+    cols = read_glpk_table(blocks[2])
+    variables = np.char.lstrip(cols['Column name'], b'x').astype(int)
+    variables_sol = to_dense(variables, glpk_to_float(cols['Activity']),
+                             n._xCounter)
 
     return (status, termination_condition, variables_sol,
             constraints_dual, objective)
@@ -653,7 +995,8 @@ def run_and_read_gurobi(n, problem_fn, solution_fn, solver_logfile,
     """
     Solving function. Reads the linear problem file and passes it to the gurobi
     solver. If the solution is sucessful it returns variable solutions and
-    constraint dual values. Gurobipy must be installed for using this function
+    constraint dual values as dense arrays indexed by their references.
+    Gurobipy must be installed for using this function
 
     For more information on solver options:
     https://www.gurobi.com/documentation/{gurobi_verion}/refman/parameter_descriptions.html
@@ -692,15 +1035,86 @@ def run_and_read_gurobi(n, problem_fn, solution_fn, solver_logfile,
     else:
         status = 'ok'
 
-    variables_sol = pd.Series({v.VarName: v.x for v
-                               in m.getVars()}).pipe(set_int_index)
+    variables, constraints = m.getVars(), m.getConstrs()
+    sol = pd.Series(m.getAttr('X', variables),
+                    m.getAttr('VarName', variables)).pipe(set_int_index)
+    variables_sol = to_dense(sol.index, sol.values, n._xCounter)
     try:
-        constraints_dual = pd.Series({c.ConstrName: c.Pi for c in
-                                      m.getConstrs()}).pipe(set_int_index)
-    except AttributeError:
+        dual = pd.Series(m.getAttr('Pi', constraints),
+                         m.getAttr('ConstrName', constraints)).pipe(set_int_index)
+        constraints_dual = to_dense(dual.index, dual.values, n._cCounter)
+    except (AttributeError, gurobipy.GurobiError):
         logger.warning("Shadow prices of MILP couldn't be parsed")
-        constraints_dual = pd.Series(index=[c.ConstrName for c in m.getConstrs()])
+        constraints_dual = np.full(n._cCounter, np.nan)
     objective = m.ObjVal
     del m
     return (status, termination_condition, variables_sol,
             constraints_dual, objective)
+
+
+def run_and_read_highs(n, problem_fn, solution_fn, solver_logfile,
+                       solver_options, keep_files, warmstart=None,
+                       store_basis=True):
+    """
+    Solving function. Passes the linear problem, which must be built with
+    the 'matrix' backend, as sparse matrices to the HiGHS solver of scipy,
+    i.e. scipy.optimize.linprog or scipy.optimize.milp if there are binaries,
+    within the same process and without any files. If the solution is
+    sucessful it returns variable solutions and constraint dual values as
+    dense arrays indexed by their references.
+
+    For more information on the solver options:
+    https://docs.scipy.org/doc/scipy/reference/optimize.linprog-highs.html
+    """
+    from scipy.optimize import linprog
+
+    if warmstart or store_basis:
+        logger.warning("Warmstart and storing the basis are not supported "
+                       "by the highs solver")
+    if solver_logfile is not None:
+        logger.warning("The highs solver does not write a logfile, set "
+                       "solver_options={'disp': True} for the output instead")
+    options = {} if solver_options is None else solver_options
+
+    m = problem_matrices(n)
+
+    if len(m.binaries):
+        from scipy.optimize import milp, LinearConstraint, Bounds
+        integrality = np.zeros(len(m.c))
+        integrality[m.binaries] = 1
+        lower = np.where(m.sense == '<=', -np.inf, m.b)
+        upper = np.where(m.sense == '>=', np.inf, m.b)
+        res = milp(m.c, constraints=LinearConstraint(m.A, lower, upper),
+                   integrality=integrality, bounds=Bounds(m.lb, m.ub),
+                   options=options)
+    else:
+        # greater-equal constraints are passed as negated less-equal ones
+        ineq = np.flatnonzero(m.sense != '=')
+        eq = np.flatnonzero(m.sense == '=')
+        sign = np.where(m.sense[ineq] == '>=', -1., 1.)
+        res = linprog(m.c, A_ub=diags(sign) @ m.A[ineq], b_ub=sign * m.b[ineq],
+                      A_eq=m.A[eq], b_eq=m.b[eq],
+                      bounds=np.column_stack([m.lb, m.ub]),
+                      method='highs', options=options)
+
+    termination_condition = {0: 'optimal', 1: 'iteration_limit',
+                             2: 'infeasible', 3: 'unbounded'}.get(res.status,
+                                                                  'other')
+    if termination_condition != "optimal":
+        return termination_condition, termination_condition, None, None, None
+    else:
+        status = 'ok'
+
+    variables_sol = res.x
+    if len(m.binaries):
+        logger.warning("Shadow prices of MILP couldn't be parsed")
+        constraints_dual = np.full(len(m.b), np.nan)
+    else:
+        # marginals are the sensitivities of the objective to the rhs
+        constraints_dual = np.empty(len(m.b))
+        constraints_dual[ineq] = sign * res.ineqlin.marginals
+        constraints_dual[eq] = res.eqlin.marginals
+    objective = res.fun
+
+    return (status, termination_condition, variables_sol,
+            constraints_dual, objective)
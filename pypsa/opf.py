@@ -51,7 +51,8 @@ except ValueError:
     _pd_version = LooseVersion(pd.__version__)
 
 from .pf import (calculate_dependent_values, find_slack_bus,
-                 find_bus_controls, calculate_B_H, calculate_PTDF, find_tree,
+                 find_bus_controls, calculate_B_H, calculate_PTDF,
+                 calculate_lazy_PTDF, find_tree,
                  find_cycles, _as_snapshots)
 from .opt import (l_constraint, l_objective, LExpression, LConstraint,
                   patch_optsolver_record_memusage_before_solving,
@@ -803,19 +804,21 @@ def define_passive_branch_flows_with_PTDF(network,snapshots,ptdf_tolerance=0.):
 
         branches_i = sub_network.branches_i()
         if len(branches_i) > 0:
-            calculate_PTDF(sub_network)
+            calculate_B_H(sub_network)
 
-            #kill small PTDF values
-            sub_network.PTDF[abs(sub_network.PTDF) < ptdf_tolerance] = 0
+            #sparse PTDF without small values
+            PTDF = calculate_lazy_PTDF(sub_network, skip_pre=True).sparse(tolerance=ptdf_tolerance)
 
         for i,branch in enumerate(branches_i):
             bt = branch[0]
             bn = branch[1]
 
+            row = slice(PTDF.indptr[i], PTDF.indptr[i+1])
+            buses = sub_network.buses_o[PTDF.indices[row]]
+
             for sn in snapshots:
-                lhs = sum(sub_network.PTDF[i,j]*network._p_balance[bus,sn]
-                          for j,bus in enumerate(sub_network.buses_o)
-                          if sub_network.PTDF[i,j] != 0)
+                lhs = sum(ptdf*network._p_balance[bus,sn]
+                          for ptdf,bus in zip(PTDF.data[row], buses))
                 rhs = LExpression([(1,network.model.passive_branch_p[bt,bn,sn])])
                 flows[bt,bn,sn] = LConstraint(lhs,"==",rhs)
 
@@ -1521,7 +1524,7 @@ def network_lopf_prepare_solver(network, solver_name="glpk", solver_io=None):
 
 
 def network_lopf_solve(network, snapshots=None, formulation="angles", solver_options={},solver_logfile=None,  keep_files=False,
-                       free_memory={'pyomo'},extra_postprocessing=None):
+                       free_memory={'pyomo'},extra_postprocessing=None, warmstart=False):
     """
     Solve linear optimal power flow for a group of snapshots and extract results.
 
@@ -1551,6 +1554,10 @@ def network_lopf_solve(network, snapshots=None, formulation="angles", solver_opt
         `extra_postprocessing(network,snapshots,duals)` and is called after
         the model has solved and the results are extracted. It allows the user to
         extract further information about the solution, such as additional shadow prices.
+    warmstart : bool, default False
+        Start the solver from the current values of the variables, e.g.
+        the last solution when the model is solved again, if the solver
+        supports it. Persistent solvers keep their state anyway.
 
     Returns
     -------
@@ -1561,19 +1568,22 @@ def network_lopf_solve(network, snapshots=None, formulation="angles", solver_opt
 
     logger.info("Solving model using %s", network.opt.name)
 
+    kwargs = {}
     if isinstance(network.opt, PersistentSolver):
         args = []
     else:
         args = [network.model]
+        if warmstart and network.opt.warm_start_capable():
+            kwargs['warmstart'] = True
 
     if isinstance(free_memory, string_types):
         free_memory = {free_memory}
 
     if 'pypsa' in free_memory:
         with empty_network(network):
-            network.results = network.opt.solve(*args, suffixes=["dual"], keepfiles=keep_files, logfile=solver_logfile, options=solver_options)
+            network.results = network.opt.solve(*args, suffixes=["dual"], keepfiles=keep_files, logfile=solver_logfile, options=solver_options, **kwargs)
     else:
-        network.results = network.opt.solve(*args, suffixes=["dual"], keepfiles=keep_files, logfile=solver_logfile, options=solver_options)
+        network.results = network.opt.solve(*args, suffixes=["dual"], keepfiles=keep_files, logfile=solver_logfile, options=solver_options, **kwargs)
 
     if logger.isEnabledFor(logging.INFO):
         network.results.write()
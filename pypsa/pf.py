@@ -19,7 +19,7 @@
 # make the code as Python 3 compatible as possible
 from __future__ import division, absolute_import
 from six.moves import range
-from six import iterkeys
+from six import iterkeys, iteritems
 from six.moves.collections_abc import Sequence
 
 
@@ -32,7 +32,7 @@ logger = logging.getLogger(__name__)
 from scipy.sparse import issparse, csr_matrix, csc_matrix, hstack as shstack, vstack as svstack, dok_matrix
 
 from numpy import r_, ones
-from scipy.sparse.linalg import spsolve
+from scipy.sparse.linalg import spsolve, splu
 from numpy.linalg import norm
 
 import numpy as np
@@ -42,6 +42,12 @@ import networkx as nx
 import six
 from operator import itemgetter
 import time
+import os
+import copy
+import hashlib
+from collections import OrderedDict, Counter
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 
 from .descriptors import get_switchable_as_dense, allocate_series_dataframes, Dict, zsum, degree
 
@@ -63,6 +69,16 @@ def _as_snapshots(network, snapshots):
         return pd.Index(snapshots)
 
 
+def _snapshot_windows(snapshots, chunksize=None):
+    """Split the snapshots into consecutive windows of at most chunksize
+    snapshots."""
+
+    if chunksize is None or len(snapshots) <= chunksize:
+        return [snapshots]
+    assert chunksize > 0, "The chunksize must be positive. Is {}.".format(chunksize)
+    return [snapshots[i:i+chunksize] for i in range(0, len(snapshots), chunksize)]
+
+
 def _allocate_pf_outputs(network, linear=False):
 
     to_allocate = {'Generator': ['p'],
@@ -95,20 +111,235 @@ def _calculate_controllable_nodal_power_balance(sub_network, network, snapshots,
 
         # set the power injection at each node from controllable components
         network.buses_t[n].loc[snapshots, buses_o] = \
-            sum([((c.pnl[n].loc[snapshots, c.ind] * c.df.loc[c.ind, 'sign'])
-                  .groupby(c.df.loc[c.ind, 'bus'], axis=1).sum()
-                  .reindex(columns=buses_o, fill_value=0.))
-                 for c in sub_network.iterate_components(network.controllable_one_port_components)])
-
-        if n == "p":
-            network.buses_t[n].loc[snapshots, buses_o] += sum(
-                [(- c.pnl[n+str(i)].loc[snapshots].groupby(c.df["bus"+str(i)], axis=1).sum()
-                  .reindex(columns=buses_o, fill_value=0))
-                 for c in network.iterate_components(network.controllable_branch_components)
-                 for i in [int(col[3:]) for col in c.df.columns if col[:3] == "bus"]])
+            _calculate_nodal_injections(network, snapshots, buses_o,
+                                        sub_network.iterate_components(network.controllable_one_port_components),
+                                        attr=n)
+
+
+def _bus_aggregation_matrix(component_buses, buses, weights=1.):
+    """Sparse matrix which maps the values of components connected to
+    component_buses (in columns) to the buses (in rows), multiplied by
+    weights. Components at other buses are ignored."""
+
+    rows = buses.get_indexer(component_buses)
+    keep = rows >= 0
+    weights = np.broadcast_to(np.asarray(weights, dtype=float), rows.shape)
+    return csr_matrix((weights[keep], (rows[keep], np.flatnonzero(keep))),
+                      shape=(len(buses), len(rows)))
+
+
+def _distribute_slack_to_generators(network, generators_i, buses, slack_power, weights,
+                                    even_if_zero=False):
+    """Distribute the slack power at the buses (snapshots x buses) to the
+    generators generators_i at these buses in proportion to their weights,
+    given per generator or per snapshot and generator. If even_if_zero,
+    the slack of buses whose generators have zero total weight is split
+    evenly among them.
+
+    Uses a sparse generator-to-bus weight matrix, so that the slack of all
+    snapshots is distributed with a single matrix product. Returns the
+    additional generator dispatch (snapshots x generators)."""
+
+    incidence = _bus_aggregation_matrix(network.generators.bus.loc[generators_i], buses)
+    weights = np.asarray(weights, dtype=float)
+
+    def bus_totals(w):
+        return incidence.T.dot(incidence.dot(np.atleast_2d(w).T)).T
+
+    if even_if_zero:
+        weights = np.where(bus_totals(weights) == 0., 1., weights)
+
+    totals = bus_totals(weights)
+    shares = np.divide(weights, totals, out=np.zeros(totals.shape), where=totals != 0.)
+
+    slack_power = np.asarray(slack_power, dtype=float)
+    if weights.ndim == 1:
+        return incidence.multiply(shares).T.dot(slack_power.T).T
+    else:
+        return incidence.T.dot(slack_power.T).T * shares
+
+
+def _calculate_nodal_injections(network, snapshots, buses, one_ports, attr='p'):
+    """Active (attr='p') or reactive (attr='q') power injections at the
+    buses for all snapshots from the dispatch of the one port components
+    one_ports (with sign) and, for active power, of all controllable
+    branches, aggregated with sparse matrices."""
+
+    injections = np.zeros((len(buses), len(snapshots)))
+
+    for c in one_ports:
+        ind = c.df.index if c.ind is None else c.ind
+        aggregation = _bus_aggregation_matrix(c.df.loc[ind, 'bus'], buses, c.df.loc[ind, 'sign'].values)
+        injections += aggregation.dot(c.pnl[attr].loc[snapshots, ind].values.T)
+
+    if attr == 'p':
+        for c in network.iterate_components(network.controllable_branch_components):
+            for i in [int(col[3:]) for col in c.df.columns if col[:3] == "bus"]:
+                aggregation = _bus_aggregation_matrix(c.df["bus"+str(i)], buses)
+                injections -= aggregation.dot(c.pnl["p"+str(i)].loc[snapshots, c.df.index].values.T)
+
+    return injections.T
+
+
+def _lpf_factorization(sub_network):
+    """LU factorization of the reduced weighted Laplacian B[1:,1:] of the
+    linear power flow, cached on the sub-network until B changes."""
+
+    B = sub_network.B.tocsr()
+    cache = getattr(sub_network, '_B_lu', None)
+    if cache is None or not (cache[0] is sub_network.B or
+                             (cache[1].shape == B.shape and
+                              np.array_equal(cache[1].indptr, B.indptr) and
+                              np.array_equal(cache[1].indices, B.indices) and
+                              np.array_equal(cache[1].data, B.data))):
+        lu = splu(B[1:,1:].tocsc()) if B.shape[0] > 1 else None
+        sub_network._B_lu = cache = (sub_network.B, B, lu)
+
+    return cache[2]
+
+
+class _WoodburyLU(object):
+    """Solve with B[1:,1:] + U diag(c) U^T for a low-rank U through the LU
+    factorization of B[1:,1:] and the Sherman-Morrison-Woodbury identity."""
+
+    def __init__(self, lu, U, c):
+        self.lu = lu
+        self.U = U
+        self.c = c
+        self.X = lu.solve(U)
+        self.M = np.eye(len(c)) + c[:,np.newaxis]*U.T.dot(self.X)
+        if np.linalg.cond(self.M) > 1/np.finfo(float).eps:
+            raise ValueError("The branch changes split the sub-network; "
+                             "call network.determine_network_topology() instead.")
+
+    def correction(self, Y):
+        """(I + C U^T B^-1 U)^-1 C Y for Y = U^T B^-1 y"""
+        return np.linalg.solve(self.M, self.c[:,np.newaxis]*Y)
+
+    def solve(self, rhs):
+        x = self.lu.solve(rhs)
+        x2d = x.reshape((x.shape[0], -1))
+        x2d = x2d - self.X.dot(self.correction(self.U.T.dot(x2d)))
+        return x2d.reshape(x.shape)
+
+
+class MatrixCache(object):
+    """
+    Cache of the network matrices of sub-networks.
+
+    Entries are keyed by a fingerprint of the bus, branch, shunt and
+    type data they are built from, so that they survive the rebuilding
+    of the sub-networks by ``network.determine_network_topology()`` and
+    are only recomputed if one of their inputs actually changes. The
+    cache is available as ``network.matrix_cache``.
+
+    Parameters
+    ----------
+    maxsize : int, default 64
+        Maximum number of cached entries; the least recently used entry
+        is discarded first. Set to 0 to disable caching.
+
+    Attributes
+    ----------
+    hits : collections.Counter
+        Number of cache hits per kind of entry ("dependent_values", "Y",
+        "B_H" and "PTDF").
+    misses : collections.Counter
+        Number of cache misses per kind of entry.
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.hits = Counter()
+        self.misses = Counter()
+        self.clear()
+
+    def clear(self):
+        """Discard all entries, but keep the counters."""
+        self._entries = OrderedDict()
+        self.dependent_values = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, kind, key):
+        """Return the entry of `kind` for fingerprint `key` or None."""
+        entry = self._entries.pop((kind, key), None)
+        if entry is None:
+            self.misses[kind] += 1
+            return None
+        self._entries[(kind, key)] = entry
+        self.hits[kind] += 1
+        return entry
+
+    def peek(self, kind, key):
+        """Return the entry of `kind` for fingerprint `key` or None,
+        without counting the lookup or marking the entry as recently
+        used."""
+        return self._entries.get((kind, key))
+
+    def set(self, kind, key, entry):
+        """Store `entry` of `kind` under fingerprint `key`."""
+        if self.maxsize <= 0:
+            return
+        self._entries.pop((kind, key), None)
+        self._entries[(kind, key)] = entry
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+def _matrix_cache(network):
+    cache = getattr(network, 'matrix_cache', None)
+    if cache is None:
+        cache = network.matrix_cache = MatrixCache()
+    return cache
+
+
+def _fingerprint(*objs):
+    """Digest of pandas objects, arrays and scalars, which serves as a
+    cache key for matrices built from them."""
+
+    digest = hashlib.md5()
+
+    def update(values):
+        values = values.values if isinstance(values, (pd.Series, pd.Index)) else np.asarray(values)
+        digest.update(repr(values.shape).encode())
+        if values.dtype.kind in 'biufcmM':
+            digest.update(np.ascontiguousarray(values).tobytes())
+        elif values.size:
+            digest.update(pd.util.hash_array(values.astype(object), categorize=False).tobytes())
+
+    for obj in objs:
+        if isinstance(obj, pd.DataFrame):
+            digest.update(repr(list(obj.columns)).encode())
+            update(obj.index)
+            for col in obj.columns:
+                update(obj[col].values)
+        elif isinstance(obj, pd.Series):
+            update(obj.index)
+            update(obj)
+        elif isinstance(obj, (pd.Index, np.ndarray)):
+            update(obj)
+        else:
+            digest.update(repr(obj).encode())
+        digest.update(b'|')
+    return digest.hexdigest()
+
+
+def _branch_fingerprint(sub_network, attrs):
+    """Fingerprint of the branch attributes `attrs` and the bus order of
+    sub_network."""
+
+    network = sub_network.network
+    objs = [sub_network.buses_o]
+    for c in sub_network.iterate_components(network.passive_branch_components):
+        objs += [c.name, c.df.loc[c.ind, [attr for attr in attrs if attr in c.df]]]
+    return _fingerprint(*objs)
+
 
 def _network_prepare_and_run_pf(network, snapshots, skip_pre, linear=False,
-                                distribute_slack=False, slack_weights='p_set', **kwargs):
+                                distribute_slack=False, slack_weights='p_set', n_jobs=1,
+                                executor=None, chunksize=None, sink=None, **kwargs):
 
     if linear:
         sub_network_pf_fun = sub_network_lpf
@@ -137,44 +368,68 @@ def _network_prepare_and_run_pf(network, snapshots, skip_pre, linear=False,
     itdf = pd.DataFrame(index=snapshots, columns=network.sub_networks.index, dtype=int)
     difdf = pd.DataFrame(index=snapshots, columns=network.sub_networks.index)
     cnvdf = pd.DataFrame(index=snapshots, columns=network.sub_networks.index, dtype=bool)
-    for sub_network in network.sub_networks.obj:
-        if not skip_pre:
+    seeddf = pd.DataFrame(False, index=snapshots, columns=network.sub_networks.index)
+
+    if not skip_pre:
+        for sub_network in network.sub_networks.obj:
             find_bus_controls(sub_network)
 
             branches_i = sub_network.branches_i()
             if len(branches_i) > 0:
                 sub_network_prepare_fun(sub_network, skip_pre=True)
 
+    sn_slack_weights = {}
+    for sub_network in network.sub_networks.obj:
         if type(slack_weights) == dict:
-            sn_slack_weights = slack_weights[sub_network.name]
-        else:
-            sn_slack_weights = slack_weights
-
-        if type(sn_slack_weights) == dict:
-            sn_slack_weights = pd.Series(sn_slack_weights)
-
-        if not linear:
-            # escape for single-bus sub-network
-            if len(sub_network.buses()) <= 1:
-                itdf[sub_network.name],\
-                difdf[sub_network.name],\
-                cnvdf[sub_network.name] = sub_network_pf_singlebus(sub_network, snapshots=snapshots, skip_pre=True,
-                                                                   distribute_slack=distribute_slack,
-                                                                   slack_weights=sn_slack_weights)
-            else:
-                itdf[sub_network.name],\
-                difdf[sub_network.name],\
-                cnvdf[sub_network.name] = sub_network_pf_fun(sub_network, snapshots=snapshots,
-                                                             skip_pre=True, distribute_slack=distribute_slack,
-                                                             slack_weights=sn_slack_weights, **kwargs)
+            sn_slack_weights[sub_network.name] = slack_weights[sub_network.name]
         else:
-            sub_network_pf_fun(sub_network, snapshots=snapshots, skip_pre=True, **kwargs)
+            sn_slack_weights[sub_network.name] = slack_weights
+
+        if type(sn_slack_weights[sub_network.name]) == dict:
+            sn_slack_weights[sub_network.name] = pd.Series(sn_slack_weights[sub_network.name])
+
+    # solve chunks of snapshots in parallel if an executor is available and
+    # process windows of at most chunksize snapshots one after another
+    with _pf_executor(n_jobs, executor) as executor:
+        for window in _snapshot_windows(snapshots, chunksize):
+            for sub_network in network.sub_networks.obj:
+                if not linear:
+                    # escape for single-bus sub-network
+                    if len(sub_network.buses()) <= 1:
+                        itdf.loc[window, sub_network.name],\
+                        difdf.loc[window, sub_network.name],\
+                        cnvdf.loc[window, sub_network.name] = sub_network_pf_singlebus(sub_network, snapshots=window, skip_pre=True,
+                                                                                       distribute_slack=distribute_slack,
+                                                                                       slack_weights=sn_slack_weights[sub_network.name])
+                    else:
+                        itdf.loc[window, sub_network.name],\
+                        difdf.loc[window, sub_network.name],\
+                        cnvdf.loc[window, sub_network.name],\
+                        seeddf.loc[window, sub_network.name] = _sub_network_pf(sub_network, snapshots=window,
+                                                                               skip_pre=True, distribute_slack=distribute_slack,
+                                                                               slack_weights=sn_slack_weights[sub_network.name],
+                                                                               n_jobs=n_jobs, executor=executor, **kwargs)
+                else:
+                    sub_network_pf_fun(sub_network, snapshots=window, skip_pre=True, n_jobs=n_jobs,
+                                       executor=executor, **kwargs)
+
+            if sink is not None:
+                sink(network, window)
 
     if not linear:
-        return Dict({ 'n_iter': itdf, 'error': difdf, 'converged': cnvdf })
+        itdf = itdf.astype(int)
+        difdf = difdf.astype(float)
+        cnvdf = cnvdf.astype(bool)
+        diagnostics = Dict({ 'n_iter': itdf, 'error': difdf, 'converged': cnvdf })
+        if kwargs.get('use_seed') == 'previous':
+            diagnostics['seeded'] = seeddf
+            diagnostics['n_iter_saved'] = _estimate_saved_iterations(itdf, seeddf)
+        return diagnostics
 
 def network_pf(network, snapshots=None, skip_pre=False, x_tol=1e-6, use_seed=False,
-               distribute_slack=False, slack_weights='p_set'):
+               distribute_slack=False, slack_weights='p_set', batch=False, reuse_jacobian=0,
+               method='newton', fdlf_variant='XB', n_jobs=1, executor=None,
+               chunksize=None, sink=None):
     """
     Full non-linear power flow for generic network.
 
@@ -187,8 +442,17 @@ def network_pf(network, snapshots=None, skip_pre=False, x_tol=1e-6, use_seed=Fal
         Skip the preliminary steps of computing topology, calculating dependent values and finding bus controls.
     x_tol: float
         Tolerance for Newton-Raphson power flow.
-    use_seed : bool, default False
+    use_seed : bool|str, default False
         Use a seed for the initial guess for the Newton-Raphson algorithm.
+        If ``True``, start from the voltages in ``network.buses_t``. If
+        'previous', solve the snapshots in order and start each snapshot
+        from the solution of the last converged snapshot before it, which
+        saves iterations for chronological time series; the first snapshot
+        starts flat. This solves the snapshots one after another also if
+        ``batch=True``.
+        The returned dictionary then also contains the keys 'seeded'
+        (whether a snapshot was seeded) and 'n_iter_saved' (estimated number
+        of iterations saved per sub-network compared to a flat start).
     distribute_slack : bool, default False
         If ``True``, distribute the slack power across generators proportional to generator dispatch by default
         or according to the distribution scheme provided in ``slack_weights``.
@@ -204,6 +468,50 @@ def network_pf(network, snapshots=None, skip_pre=False, x_tol=1e-6, use_seed=Fal
         corresponding subnetwork as index/keys.
         When specifying custom weights with buses as index/keys the slack power of a bus is distributed
         among its generators in proportion to their nominal capacity (``p_nom``) if given, otherwise evenly.
+    batch : bool, default False
+        If ``True``, solve all snapshots of a sub-network simultaneously. The
+        states of all snapshots are kept in contiguous arrays, the mismatches of
+        all unconverged snapshots are evaluated in one vectorized pass and
+        their Jacobians are solved as one block-diagonal sparse system.
+        Otherwise the snapshots are solved one after another.
+    reuse_jacobian : int, default 0
+        Number of subsequent Newton-Raphson iterations in which the last
+        numeric LU factorization of the Jacobian is reused ("dishonest"
+        Newton). The fill-reducing ordering of the Jacobian is always
+        computed only once per sub-network and reused.
+    method : str, default 'newton'
+        Power flow algorithm, either 'newton' for the full Newton-Raphson
+        method or 'fdlf' for the fast-decoupled power flow, which iterates
+        all snapshots at once with the constant matrices B' and B'' that are
+        factorized only once per sub-network. Snapshots for which the
+        fast-decoupled power flow does not converge are solved again with
+        Newton-Raphson; their number of iterations includes the iterations
+        of both methods. The fast-decoupled power flow does not support
+        ``distribute_slack``, for which Newton-Raphson is used instead.
+    fdlf_variant : str, default 'XB'
+        Variant of the fast-decoupled power flow, either 'XB' (series
+        resistances neglected in B') or 'BX' (neglected in B'').
+    n_jobs : int, default 1
+        Number of worker processes. If larger than 1, the snapshots of
+        each sub-network are split into n_jobs chunks, which are solved in
+        parallel in a process pool; -1 uses all cores. Only the prepared
+        matrices and the nodal injections are sent to the workers and the
+        results are merged back into the network afterwards.
+    executor : concurrent.futures.Executor, default None
+        Executor to solve the chunks of snapshots on instead of starting a
+        new process pool, e.g. to reuse a pool across calls. If n_jobs is 1,
+        the snapshots are split into as many chunks as the executor has
+        workers.
+    chunksize : int, default None
+        If given, process the snapshots in consecutive windows of at most
+        chunksize snapshots, so that the memory of the intermediate arrays
+        is bounded independently of the number of snapshots. The results
+        of each window are written to the output frames of the network
+        before the next window is solved.
+    sink : callable, default None
+        Function called as ``sink(network, snapshots)`` after the results
+        of each window of snapshots have been written, e.g. to stream them
+        to disk.
 
     Returns
     -------
@@ -215,20 +523,321 @@ def network_pf(network, snapshots=None, skip_pre=False, x_tol=1e-6, use_seed=Fal
 
     return _network_prepare_and_run_pf(network, snapshots, skip_pre, linear=False, x_tol=x_tol,
                                        use_seed=use_seed, distribute_slack=distribute_slack,
-                                       slack_weights=slack_weights)
+                                       slack_weights=slack_weights, batch=batch,
+                                       reuse_jacobian=reuse_jacobian, method=method,
+                                       fdlf_variant=fdlf_variant, n_jobs=n_jobs, executor=executor,
+                                       chunksize=chunksize, sink=sink)
+
+
+def _solve_pf(Y, num_pvs, ss, v_mag_pu, v_ang, guesses, slack_weights=None, x_tol=1e-6,
+              seed_previous=False, batch=False, reuse_jacobian=0, fdlf_lu=None,
+              jacobian=None, jacobian_solver=None):
+    """Solve the non-linear power flow equations of a sub-network for the
+    snapshots given by the rows of the arrays of the nodal injections ss,
+    the known voltage magnitudes and angles and the initial guesses, all in
+    the order of buses_o. Only arrays and matrices are needed, so that it
+    can be run in a separate process.
+
+    If the LU factorizations of B' and B'' are passed as fdlf_lu, the
+    fast-decoupled power flow is used with a fallback to Newton-Raphson.
+    A distributed slack is included if slack_weights are given.
+
+    Returns arrays of the roots, the number of iterations, the remaining
+    error, the convergence status and whether the snapshot was seeded
+    from its predecessor.
+    """
+
+    distribute_slack = slack_weights is not None
+
+    if jacobian is None:
+        jacobian = PowerFlowJacobian(Y, num_pvs, distribute_slack)
+    if jacobian_solver is None:
+        jacobian_solver = JacobianSolver()
+    jacobian_solver.reuse = reuse_jacobian
+
+    def f(guess, i):
+        V = _pf_voltages(guess, v_mag_pu[i], v_ang[i], num_pvs)
+        if distribute_slack:
+            return _pf_mismatch(Y, V, ss[i], num_pvs, slack_weights[i], guess[:,-1])
+        else:
+            return _pf_mismatch(Y, V, ss[i], num_pvs)
+
+    def dfdx(guess, i):
+        V = _pf_voltages(guess, v_mag_pu[i], v_ang[i], num_pvs)
+        return jacobian(V, slack_weights[i] if distribute_slack else None)
+
+    def solve_newton(index):
+        """Newton-Raphson for the snapshots with the positions `index`."""
+        seeded = np.zeros(len(index), dtype=bool)
+        if batch and not seed_previous:
+            start = time.time()
+            roots, n_iter, diff, converged = newton_raphson_sparse_batch(lambda x, k: f(x, index[k]), guesses[index],
+                                                                         lambda x, k: dfdx(x, index[k]), x_tol=x_tol,
+                                                                         jacobian_solver=jacobian_solver)
+            logger.info("Newton-Raphson solved %d snapshots in at most %d iterations with maximum error of %f in %f seconds",
+                        len(index), n_iter.max(initial=0), diff.max(initial=0.), time.time()-start)
+        else:
+            roots = np.empty((len(index), guesses.shape[1]))
+            n_iter = np.zeros(len(index), dtype=int)
+            diff = np.empty(len(index))
+            converged = np.zeros(len(index), dtype=bool)
+            previous = None
+            for k, i in enumerate(index):
+                #seed from the solution of the last converged snapshot
+                guess = guesses[i]
+                if seed_previous and previous is not None:
+                    guess = previous
+                    seeded[k] = True
+
+                #Now try and solve
+                start = time.time()
+                roots[k], n_iter[k], diff[k], converged[k] = newton_raphson_sparse(lambda x, **kwargs: f(x[np.newaxis], [i])[0], guess,
+                                                                                   lambda x, **kwargs: dfdx(x[np.newaxis], [i]), x_tol=x_tol,
+                                                                                   jacobian_solver=jacobian_solver)
+                logger.info("Newton-Raphson solved in %d iterations with error of %f in %f seconds", n_iter[k],diff[k],time.time()-start)
+
+                if converged[k]:
+                    previous = roots[k]
+        return roots, n_iter, diff, converged, seeded
+
+    if fdlf_lu is None:
+        return solve_newton(np.arange(len(ss)))
+
+    start = time.time()
+    v_ang_fd, v_mag_pu_fd, n_iter, diff, converged = fast_decoupled_pf(Y, fdlf_lu[0], fdlf_lu[1], v_ang, v_mag_pu, ss,
+                                                                       num_pvs, x_tol=x_tol)
+    logger.info("Fast-decoupled power flow solved %d snapshots in at most %d iterations with maximum error of %f in %f seconds",
+                len(ss), n_iter.max(initial=0), np.nanmax(diff), time.time()-start)
+    roots = np.hstack((v_ang_fd[:,1:], v_mag_pu_fd[:,1+num_pvs:]))
+    seeded = np.zeros(len(ss), dtype=bool)
+
+    #fall back to Newton-Raphson for the snapshots which did not converge
+    failed = np.flatnonzero(~converged)
+    if len(failed) > 0:
+        logger.info("Falling back to Newton-Raphson for %d snapshots for which the fast-decoupled power flow did not converge",
+                    len(failed))
+        roots[failed], nr_iter, diff[failed], converged[failed], seeded[failed] = solve_newton(failed)
+        n_iter[failed] += nr_iter
+
+    return roots, n_iter, diff, converged, seeded
+
+
+def _solve_pf_chunk(Y, num_pvs, ss, v_mag_pu, v_ang, guesses, slack_weights=None,
+                    fdlf_matrices=None, **kwargs):
+    """Worker for the parallel power flow: factorize B' and B'' if the
+    fast-decoupled power flow is used and solve a chunk of snapshots with
+    _solve_pf."""
+
+    if fdlf_matrices is not None:
+        B_p, B_pp = fdlf_matrices
+        kwargs['fdlf_lu'] = (splu(B_p.tocsc()),
+                             splu(B_pp.tocsc()) if B_pp.shape[0] > 0 else None)
+
+    return _solve_pf(Y, num_pvs, ss, v_mag_pu, v_ang, guesses, slack_weights, **kwargs)
+
+
+#LU factorizations of the reduced B of the parallel linear power flow in
+#each worker process, keyed by the fingerprint of B
+_lpf_worker_lu = {}
+
+
+def _solve_lpf_chunk(B, p, key):
+    """Worker for the parallel linear power flow: voltage angle (or
+    magnitude) differences of the non-slack buses for the nodal injections
+    p (one row per snapshot). B is only factorized once per worker process
+    and fingerprint `key`."""
+
+    lu = _lpf_worker_lu.get(key)
+    if lu is None:
+        _lpf_worker_lu.clear()
+        lu = _lpf_worker_lu[key] = splu(B.tocsc())
+    return lu.solve(np.ascontiguousarray(p.T)).T.reshape(p.shape)
+
+
+def _snapshot_chunks(num_snapshots, n_jobs=1, executor=None):
+    """Split the snapshot positions into one chunk per worker."""
+
+    if n_jobs > 1:
+        num_chunks = n_jobs
+    else:
+        num_chunks = getattr(executor, '_max_workers', None) or os.cpu_count() or 1
+    chunks = np.array_split(np.arange(num_snapshots), min(num_chunks, max(num_snapshots, 1)))
+    return [c for c in chunks if len(c) > 0]
+
+
+@contextmanager
+def _pf_executor(n_jobs=1, executor=None):
+    """Yield the executor for a parallel power flow, starting a process pool
+    with n_jobs workers if none is given (n_jobs=-1 uses all cores), or
+    None for a serial power flow."""
+
+    if executor is not None:
+        yield executor
+        return
+
+    if n_jobs < 0:
+        n_jobs = max((os.cpu_count() or 1) + 1 + n_jobs, 1)
+
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            yield executor
+    else:
+        yield None
+
 
+def _estimate_saved_iterations(n_iter, seeded):
+    """Estimate the Newton-Raphson iterations saved by seeding snapshots
+    from their predecessors for each column of the dataframes, compared to
+    the average number of iterations of the (non-trivial) snapshots solved
+    from a flat start."""
 
-def newton_raphson_sparse(f, guess, dfdx, x_tol=1e-10, lim_iter=100, distribute_slack=False, slack_weights=None):
+    n_iter = n_iter.astype(float)
+    seeded = seeded.astype(bool)
+    flat = n_iter.where(~seeded & (n_iter > 0)).mean()
+    return (flat*seeded.sum() - n_iter.where(seeded).sum()).fillna(0.)
+
+
+class JacobianSolver(object):
+    """
+    Sparse LU solver for Newton-Raphson Jacobians with a fixed sparsity
+    pattern.
+
+    The fill-reducing column ordering is computed once and reused for all
+    Jacobians with the same sparsity pattern; Jacobians of several
+    snapshots assembled into one block-diagonal matrix reuse the ordering
+    of a single block. As long as the pattern is unchanged, the entries of
+    a new Jacobian are gathered directly into the column-permuted matrix
+    that is factorized. Note that scipy's SuperLU does not expose its
+    symbolic factorization, so the elimination tree and fill pattern are
+    still recomputed by each numeric factorization.
+
+    Parameters
+    ----------
+    reuse : int, default 0
+        Number of subsequent solves in which the last numeric
+        factorization is reused instead of refactorizing ("dishonest"
+        Newton). The factorization is refreshed earlier if the Newton
+        error does not decrease.
+    permc_spec : str, default 'COLAMD'
+        Fill-reducing ordering passed to scipy.sparse.linalg.splu.
+
+    Attributes
+    ----------
+    n_analyses : int
+        Number of column orderings computed.
+    n_factorizations : int
+        Number of numeric factorizations computed.
+    """
+
+    def __init__(self, reuse=0, permc_spec='COLAMD'):
+        self.reuse = reuse
+        self.permc_spec = permc_spec
+        self.n_analyses = 0
+        self.n_factorizations = 0
+        self._pattern = None
+        self._perm = None
+        self._structure = None
+        self.reset()
+
+    def reset(self):
+        """Discard the numeric factorization, but keep the ordering."""
+        self._lu = None
+        self._key = None
+        self._n_solves = 0
+
+    @staticmethod
+    def _same_pattern(indptr, indices, pattern):
+        return (pattern is not None and np.array_equal(indptr, pattern[0])
+                and np.array_equal(indices, pattern[1]))
+
+    def _analyse(self, J, size):
+        """Compute the column ordering of the first diagonal block of size
+        `size` of the CSR matrix J, unless the block has the sparsity
+        pattern of the last ordering."""
+        end = J.indptr[size]
+        if self._same_pattern(J.indptr[:size+1], J.indices[:end], self._pattern):
+            return
+        #splu only exposes the ordering of a complete factorization
+        block = J if size == J.shape[0] else J[:size,:size]
+        lu = splu(block.tocsc(), permc_spec=self.permc_spec)
+        self._pattern = (J.indptr[:size+1].copy(), J.indices[:end].copy())
+        self._perm = np.argsort(lu.perm_c)
+        self._structure = None
+        self.n_analyses += 1
+
+    def _permuted(self, J, perm):
+        """Positions of the entries of the CSR matrix J in the CSC matrix of
+        its columns permuted by perm, computed once per sparsity pattern."""
+        if (self._structure is None or J.shape != self._structure[0] or
+            not self._same_pattern(J.indptr, J.indices, self._structure[1])):
+            positions = csr_matrix((np.arange(J.nnz), J.indices, J.indptr),
+                                   shape=J.shape).tocsc()[:,perm]
+            positions.sort_indices()
+            #duplicate entries would be summed in place by splu
+            if not positions.has_canonical_format:
+                positions = None
+            self._structure = (J.shape, (J.indptr.copy(), J.indices.copy()), positions)
+        return self._structure[2]
+
+    def needs_factorization(self, key=None):
+        """Whether the Jacobian has to be (re)factorized before the next
+        solve. `key` identifies the system, e.g. the active snapshots;
+        a factorization is only reused for the same key."""
+        return (self._lu is None or self._n_solves > self.reuse
+                or not np.array_equal(key, self._key))
+
+    def factorize(self, J, num_blocks=1, key=None):
+        """Numerically factorize J, which consists of num_blocks diagonal
+        blocks with the same sparsity pattern."""
+        J = J.tocsr()
+        size = J.shape[0]//num_blocks
+        self._key = key
+        self._n_solves = 0
+        self.n_factorizations += 1
+        try:
+            self._analyse(J, size)
+            perm = (self._perm if num_blocks == 1 else
+                    (self._perm + size*np.arange(num_blocks)[:,np.newaxis]).ravel())
+            positions = self._permuted(J, perm)
+            if positions is None:
+                J_perm = J.tocsc()[:,perm]
+            else:
+                J_perm = csc_matrix((J.data[positions.data], positions.indices,
+                                     positions.indptr), shape=J.shape)
+            self._lu = splu(J_perm, permc_spec='NATURAL')
+            self._perm_full = perm
+        except RuntimeError:
+            #like spsolve, a singular Jacobian yields NaNs, which stop the iteration
+            logger.warning("The Jacobian is singular, the power flow cannot be solved.")
+            self._lu = False
+
+    def solve(self, b):
+        """Solve J x = b with the last factorization of J."""
+        self._n_solves += 1
+        if self._lu is False:
+            return np.full_like(b, np.nan, dtype=float)
+        x = np.empty_like(b)
+        x[self._perm_full] = self._lu.solve(b)
+        return x
+
+
+def newton_raphson_sparse(f, guess, dfdx, x_tol=1e-10, lim_iter=100, distribute_slack=False, slack_weights=None,
+                          jacobian_solver=None):
     """Solve f(x) = 0 with initial guess for x and dfdx(x). dfdx(x) should
     return a sparse Jacobian.  Terminate if error on norm of f(x) is <
     x_tol or there were more than lim_iter iterations.
 
+    If a JacobianSolver is passed as jacobian_solver, it is used to solve
+    the linear systems and may reuse factorizations between iterations.
+
     """
 
     slack_args = {"distribute_slack": distribute_slack,
                   "slack_weights": slack_weights}
     converged = False
     n_iter = 0
+    if jacobian_solver is not None:
+        jacobian_solver.reset()
     F = f(guess, **slack_args)
     diff = norm(F,np.Inf)
 
@@ -238,11 +847,21 @@ def newton_raphson_sparse(f, guess, dfdx, x_tol=1e-10, lim_iter=100, distribute_
 
         n_iter +=1
 
-        guess = guess - spsolve(dfdx(guess, **slack_args),F)
+        if jacobian_solver is None:
+            guess = guess - spsolve(dfdx(guess, **slack_args),F)
+        else:
+            if jacobian_solver.needs_factorization():
+                jacobian_solver.factorize(dfdx(guess, **slack_args))
+            guess = guess - jacobian_solver.solve(F)
 
+        last_diff = diff
         F = f(guess, **slack_args)
         diff = norm(F,np.Inf)
 
+        #refresh a reused factorization if it no longer improves the error
+        if jacobian_solver is not None and not diff < last_diff:
+            jacobian_solver.reset()
+
         logger.debug("Error at iteration %d: %f", n_iter, diff)
 
     if diff > x_tol:
@@ -252,6 +871,309 @@ def newton_raphson_sparse(f, guess, dfdx, x_tol=1e-10, lim_iter=100, distribute_
 
     return guess, n_iter, diff, converged
 
+
+def newton_raphson_sparse_batch(f, guess, dfdx, x_tol=1e-10, lim_iter=100, jacobian_solver=None):
+    """Solve a batch of independent problems f_i(x_i) = 0 simultaneously.
+
+    `guess` is a 2d array with one row per problem. f(guess, active) must
+    return the mismatches of the problems with the row indices `active`
+    as a 2d array and dfdx(guess, active) their Jacobians as a single
+    block-diagonal sparse matrix. Each problem terminates individually
+    if the error on the norm of its f is < x_tol or there were more than
+    lim_iter iterations, so that only unconverged problems are iterated
+    further.
+
+    If a JacobianSolver is passed as jacobian_solver, it is used to solve
+    the block-diagonal systems and may reuse factorizations between
+    iterations as long as the set of unconverged problems does not change.
+
+    Returns arrays of the roots, the number of iterations, the remaining
+    error and the convergence status of each problem.
+
+    """
+
+    guess = np.array(guess, dtype=float)
+    num_problems, num_vars = guess.shape
+    active = np.arange(num_problems)
+
+    n_iter = np.zeros(num_problems, dtype=int)
+    if jacobian_solver is not None:
+        jacobian_solver.reset()
+    F = f(guess, active)
+    diff = np.abs(F).max(axis=1) if num_vars else np.zeros(num_problems)
+
+    logger.debug("Maximum error at iteration %d: %f", 0, diff.max(initial=0.))
+
+    # NaN errors compare False and therefore drop out of the iteration
+    active = active[diff > x_tol]
+    while len(active) > 0 and n_iter.max(initial=0) < lim_iter:
+
+        n_iter[active] += 1
+
+        if jacobian_solver is None:
+            dx = spsolve(dfdx(guess[active], active), F[active].ravel())
+        else:
+            if jacobian_solver.needs_factorization(key=active):
+                jacobian_solver.factorize(dfdx(guess[active], active),
+                                          num_blocks=len(active), key=active)
+            dx = jacobian_solver.solve(F[active].ravel())
+        guess[active] -= dx.reshape(len(active), num_vars)
+
+        last_diff = diff[active]
+        F[active] = f(guess[active], active)
+        diff[active] = np.abs(F[active]).max(axis=1)
+
+        #refresh a reused factorization if it no longer improves the error
+        if jacobian_solver is not None and not (diff[active] < last_diff).all():
+            jacobian_solver.reset()
+
+        logger.debug("Maximum error at iteration %d: %f", n_iter.max(), diff[active].max())
+
+        active = active[diff[active] > x_tol]
+
+    converged = (diff <= x_tol) & ~np.isnan(diff)
+    if not converged.all():
+        logger.warning("Warning, we didn't reach the required tolerance within %d iterations for %d of %d problems, maximum error is at %f. See the section \"Troubleshooting\" in the documentation for tips to fix this. ", lim_iter, (~converged).sum(), num_problems, np.nanmax(diff))
+
+    return guess, n_iter, diff, converged
+
+
+def fast_decoupled_pf(Y, Bp_lu, Bpp_lu, v_ang, v_mag_pu, s, num_pvs, x_tol=1e-6, lim_iter=100):
+    """Fast-decoupled power flow for several snapshots at once.
+
+    The voltage angles v_ang and magnitudes v_mag_pu (one row per
+    snapshot, buses ordered as slack, PVs, PQs) are iterated with
+    alternating half iterations for the angles of the PV and PQ buses
+    and the magnitudes of the PQ buses, using the factorized constant
+    matrices B' (Bp_lu) and B'' (Bpp_lu). Each snapshot terminates
+    individually if the error on the norm of its power mismatches is <
+    x_tol or there were more than lim_iter iterations.
+
+    Returns arrays of the voltage angles and magnitudes, the number of
+    iterations, the remaining error and the convergence status of each
+    snapshot.
+
+    """
+
+    #following leans heavily on pypower.fdpf
+    #Copyright Richard Lincoln, Ray Zimmerman, BSD-style licence
+
+    v_ang = np.array(v_ang, dtype=float)
+    v_mag_pu = np.array(v_mag_pu, dtype=float)
+    num_snapshots = len(v_ang)
+
+    def mismatch(k):
+        V = v_mag_pu[k]*np.exp(1j*v_ang[k])
+        return V*np.conj(Y.dot(V.T)).T - s[k]
+
+    def error(mis):
+        return np.abs(np.hstack((mis.real[:,1:], mis.imag[:,1+num_pvs:]))).max(axis=1)
+
+    n_iter = np.zeros(num_snapshots, dtype=int)
+    active = np.arange(num_snapshots)
+    mis = mismatch(active)
+    diff = error(mis)
+
+    # NaN errors compare False and therefore drop out of the iteration
+    active = active[diff > x_tol]
+    mis = mis[diff > x_tol]
+    while len(active) > 0 and n_iter.max(initial=0) < lim_iter:
+
+        n_iter[active] += 1
+
+        #P half iteration
+        dv_ang = Bp_lu.solve(np.ascontiguousarray((mis.real[:,1:]/v_mag_pu[active,1:]).T))
+        v_ang[active,1:] -= dv_ang.T
+
+        #Q half iteration
+        if Bpp_lu is not None:
+            mis = mismatch(active)
+            dv_mag_pu = Bpp_lu.solve(np.ascontiguousarray((mis.imag[:,1+num_pvs:]/v_mag_pu[active,1+num_pvs:]).T))
+            v_mag_pu[active,1+num_pvs:] -= dv_mag_pu.T
+
+        mis = mismatch(active)
+        diff[active] = error(mis)
+
+        logger.debug("Maximum error at iteration %d: %f", n_iter.max(), diff[active].max())
+
+        unconverged = diff[active] > x_tol
+        active = active[unconverged]
+        mis = mis[unconverged]
+
+    converged = (diff <= x_tol) & ~np.isnan(diff)
+
+    return v_ang, v_mag_pu, n_iter, diff, converged
+
+
+def _fdlf_factorizations(sub_network, variant):
+    """LU factorizations of B' and B'' of the fast-decoupled power flow,
+    cached on the sub-network until its admittance matrix is recalculated."""
+
+    cache = getattr(sub_network, '_fdlf_lu', None)
+    if cache is None or cache[0] is not sub_network.Y or cache[1] != variant:
+        calculate_B_fdlf(sub_network, variant, skip_pre=True)
+        Bp_lu = splu(sub_network.B_p.tocsc())
+        Bpp_lu = splu(sub_network.B_pp.tocsc()) if sub_network.B_pp.shape[0] > 0 else None
+        sub_network._fdlf_lu = cache = (sub_network.Y, variant, Bp_lu, Bpp_lu)
+
+    return cache[2:]
+
+
+def _pf_voltages(guess, v_mag_pu, v_ang, num_pvs):
+    """Complex bus voltages in the order of buses_o from the Newton-Raphson
+    state vectors `guess` (one row per snapshot) and the known voltage
+    magnitudes and angles of the same snapshots."""
+
+    num_pvpqs = v_ang.shape[1] - 1
+    num_pqs = num_pvpqs - num_pvs
+
+    v_mag_pu = v_mag_pu.copy()
+    v_ang = v_ang.copy()
+    v_ang[:,1:] = guess[:,:num_pvpqs]
+    v_mag_pu[:,1+num_pvs:] = guess[:,num_pvpqs:num_pvpqs+num_pqs]
+
+    return v_mag_pu*np.exp(1j*v_ang)
+
+
+def _pf_mismatch(Y, V, s, num_pvs, slack_weights=None, slack_power=None):
+    """Power mismatches of the voltages V (one row per snapshot) for the
+    nodal injections s. If slack_weights are given, the distributed slack
+    power slack_power is added to the nodal balance and the mismatch of
+    the slack bus is included."""
+
+    mismatch = V*np.conj(Y.dot(V.T)).T - s
+
+    if slack_weights is not None:
+        mismatch = mismatch + slack_weights*slack_power[:,np.newaxis]
+        return np.hstack((mismatch.real, mismatch.imag[:,1+num_pvs:]))
+    else:
+        return np.hstack((mismatch.real[:,1:], mismatch.imag[:,1+num_pvs:]))
+
+
+class PowerFlowJacobian(object):
+    """
+    Sparse Jacobian of the power mismatches with a precomputed structure.
+
+    The CSR structure of the Jacobian and the maps from the nonzeros of
+    the bus admittance matrix Y to the slots of the Jacobian are computed
+    once, so that building the Jacobian for given voltages only fills the
+    data array of the fixed structure. The Jacobian of several snapshots
+    is assembled directly as a block-diagonal matrix.
+
+    Parameters
+    ----------
+    Y : scipy.sparse matrix
+        Bus admittance matrix in the order of buses_o (slack, PVs, PQs).
+    num_pvs : int
+        Number of PV buses.
+    distribute_slack : bool, default False
+        Whether the Jacobian includes the active power balance of the
+        slack bus (extra row) and the derivatives with respect to the
+        distributed slack power (extra column).
+    """
+
+    def __init__(self, Y, num_pvs, distribute_slack=False):
+        self.Y = Y
+        self.num_pvs = num_pvs
+        self.distribute_slack = distribute_slack
+
+        #ensure the diagonal is part of the structure
+        num_buses = Y.shape[0]
+        buses = np.arange(num_buses)
+        Y = Y.tocoo()
+        Y = csr_matrix((np.r_[Y.data, np.zeros(num_buses)],
+                        (np.r_[Y.row, buses], np.r_[Y.col, buses])),
+                       shape=(num_buses, num_buses)).tocoo()
+        self._Y_data = Y.data
+        self._Y_row = Y.row
+        self._Y_col = Y.col
+        self._diag = np.flatnonzero(Y.row == Y.col)[np.argsort(Y.row[Y.row == Y.col])]
+
+        num_pvpqs = num_buses - 1
+        num_pqs = num_pvpqs - num_pvs
+        first_p = 0 if distribute_slack else 1
+        num_p = num_buses - first_p
+
+        #row and column positions of each bus in the Jacobian (-1 if none)
+        p_row = np.where(buses >= first_p, buses - first_p, -1)
+        q_row = np.where(buses > num_pvs, num_p + buses - 1 - num_pvs, -1)
+        a_col = buses - 1
+        m_col = np.where(buses > num_pvs, num_pvpqs + buses - 1 - num_pvs, -1)
+
+        #(row, column, source) of each Jacobian entry, where the source
+        #selects the nonzeros of Y and the quantity they contribute
+        rows = []
+        cols = []
+        self._sources = []
+        for quantity, row, col in [('dVa', p_row, a_col), ('dVm', p_row, m_col),
+                                   ('dVa', q_row, a_col), ('dVm', q_row, m_col)]:
+            k = np.flatnonzero((row[Y.row] >= 0) & (col[Y.col] >= 0))
+            rows.append(row[Y.row[k]])
+            cols.append(col[Y.col[k]])
+            self._sources.append((quantity, row is p_row, k))
+
+        self.shape = (num_p + num_pqs, num_pvpqs + num_pqs + (1 if distribute_slack else 0))
+        if distribute_slack:
+            rows.append(np.arange(num_buses))
+            cols.append(np.full(num_buses, self.shape[1] - 1))
+
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        self._order = np.lexsort((cols, rows))
+        self.indices = cols[self._order].astype(np.int32)
+        self.indptr = np.r_[0, np.cumsum(np.bincount(rows, minlength=self.shape[0]))].astype(np.int32)
+        self.nnz = len(self.indices)
+
+    def updated(self, Y):
+        """Jacobian for the bus admittance matrix Y, whose nonzeros must be
+        part of the structure of this Jacobian, e.g. after the outage of a
+        branch. The structure is shared, only the values of Y are
+        replaced."""
+
+        jacobian = copy.copy(self)
+        jacobian.Y = Y
+        jacobian._Y_data = np.asarray(Y.tocsr()[self._Y_row, self._Y_col]).ravel()
+        return jacobian
+
+    def data(self, V, slack_weights=None):
+        """Values of the Jacobian entries for the voltages V (one row per
+        snapshot) in the order of the CSR structure."""
+
+        V = np.atleast_2d(V)
+        row, col, Y_data = self._Y_row, self._Y_col, self._Y_data
+        I = self.Y.dot(V.T).T
+        V_norm = V/abs(V)
+
+        #derivatives of the complex power at the nonzeros of Y
+        dVa = -1j*V[:,row]*np.conj(Y_data*V[:,col])
+        dVa[:,self._diag] += 1j*V*np.conj(I)
+        dVm = V[:,row]*np.conj(Y_data*V_norm[:,col])
+        dVm[:,self._diag] += V_norm*np.conj(I)
+
+        derivatives = {'dVa': dVa, 'dVm': dVm}
+        parts = [derivatives[quantity][:,k].real if real else derivatives[quantity][:,k].imag
+                 for quantity, real, k in self._sources]
+        if self.distribute_slack:
+            parts.append(np.broadcast_to(slack_weights, V.shape))
+
+        return np.hstack(parts)[:,self._order]
+
+    def __call__(self, V, slack_weights=None):
+        """Sparse Jacobian for the voltages V of a single snapshot or, if V
+        has several rows, the block-diagonal Jacobian of all snapshots."""
+
+        data = self.data(V, slack_weights)
+        num_blocks = data.shape[0]
+        if num_blocks == 1:
+            return csr_matrix((data[0], self.indices, self.indptr), shape=self.shape)
+
+        blocks = np.arange(num_blocks)[:,np.newaxis]
+        indices = (self.indices + self.shape[1]*blocks).ravel()
+        indptr = np.r_[(self.indptr[:-1] + self.nnz*blocks).ravel(), self.nnz*num_blocks]
+        return csr_matrix((data.ravel(), indices, indptr),
+                          shape=(self.shape[0]*num_blocks, self.shape[1]*num_blocks))
+
+
 def sub_network_pf_singlebus(sub_network, snapshots=None, skip_pre=False,
                              distribute_slack=False, slack_weights='p_set', linear=False):
     """
@@ -297,18 +1219,20 @@ def sub_network_pf_singlebus(sub_network, snapshots=None, skip_pre=False,
     network.buses_t.v_ang.loc[snapshots,sub_network.slack_bus] = 0.
 
     if distribute_slack:
-        for bus, group in sub_network.generators().groupby('bus'):
-            if slack_weights in ['p_nom', 'p_nom_opt']:
-                assert not all(network.generators[slack_weights]) == 0, "Invalid slack weights! Generator attribute {} is always zero.".format(slack_weights)
-                bus_generator_shares = network.generators[slack_weights].loc[group.index].pipe(normed).fillna(0)
-            elif slack_weights == 'p_set':
-                generators_t_p_choice = get_switchable_as_dense(network, 'Generator', slack_weights, snapshots)
-                assert not generators_t_p_choice.isna().all().all(), "Invalid slack weights! Generator attribute {} is always NaN.".format(slack_weights)
-                assert not (generators_t_p_choice == 0).all().all(), "Invalid slack weights! Generator attribute {} is always zero.".format(slack_weights)
-                bus_generator_shares = generators_t_p_choice.loc[snapshots,group.index].apply(normed, axis=1).fillna(0)
-            else:
-                bus_generator_shares = slack_weights.pipe(normed).fillna(0)
-            network.generators_t.p.loc[snapshots,group.index] += bus_generator_shares.multiply(-network.buses_t.p.loc[snapshots,bus], axis=0)
+        generators_i = sub_network.generators().index
+        if type(slack_weights) == str and slack_weights in ['p_nom', 'p_nom_opt']:
+            assert (network.generators[slack_weights] != 0).any(), "Invalid slack weights! Generator attribute {} is always zero.".format(slack_weights)
+            weights = network.generators[slack_weights].loc[generators_i]
+        elif type(slack_weights) == str and slack_weights == 'p_set':
+            generators_t_p_choice = get_switchable_as_dense(network, 'Generator', slack_weights, snapshots, generators_i)
+            assert not generators_t_p_choice.isna().all().all(), "Invalid slack weights! Generator attribute {} is always NaN.".format(slack_weights)
+            assert not (generators_t_p_choice == 0).all().all(), "Invalid slack weights! Generator attribute {} is always zero.".format(slack_weights)
+            weights = generators_t_p_choice.fillna(0.)
+        else:
+            weights = slack_weights.reindex(generators_i).fillna(0.)
+        network.generators_t.p.loc[snapshots,generators_i] += \
+            _distribute_slack_to_generators(network, generators_i, buses_o,
+                                            -network.buses_t.p.loc[snapshots,buses_o].values, weights.values)
     else:
         network.generators_t.p.loc[snapshots,sub_network.slack_generator] -= network.buses_t.p.loc[snapshots,sub_network.slack_bus]
 
@@ -321,7 +1245,9 @@ def sub_network_pf_singlebus(sub_network, snapshots=None, skip_pre=False,
 
 
 def sub_network_pf(sub_network, snapshots=None, skip_pre=False, x_tol=1e-6, use_seed=False,
-                   distribute_slack=False, slack_weights='p_set'):
+                   distribute_slack=False, slack_weights='p_set', batch=False, reuse_jacobian=0,
+                   method='newton', fdlf_variant='XB', n_jobs=1, executor=None,
+                   chunksize=None, sink=None):
     """
     Non-linear power flow for connected sub-network.
 
@@ -334,8 +1260,14 @@ def sub_network_pf(sub_network, snapshots=None, skip_pre=False, x_tol=1e-6, use_
         Skip the preliminary steps of computing topology, calculating dependent values and finding bus controls.
     x_tol: float
         Tolerance for Newton-Raphson power flow.
-    use_seed : bool, default False
+    use_seed : bool|str, default False
         Use a seed for the initial guess for the Newton-Raphson algorithm.
+        If ``True``, start from the voltages in ``network.buses_t``. If
+        'previous', solve the snapshots in order and start each snapshot
+        from the solution of the last converged snapshot before it, which
+        saves iterations for chronological time series; the first snapshot
+        starts flat. This solves the snapshots one after another also if
+        ``batch=True``.
     distribute_slack : bool, default False
         If ``True``, distribute the slack power across generators proportional to generator dispatch by default
         or according to the distribution scheme provided in ``slack_weights``.
@@ -348,6 +1280,50 @@ def sub_network_pf(sub_network, snapshots=None, skip_pre=False, x_tol=1e-6, use_
         that has the buses or the generators of the subnetwork as index/keys.
         When using custom weights with buses as index/keys the slack power of a bus is distributed
         among its generators in proportion to their nominal capacity (``p_nom``) if given, otherwise evenly.
+    batch : bool, default False
+        If ``True``, solve all snapshots of a sub-network simultaneously. The
+        states of all snapshots are kept in contiguous arrays, the mismatches of
+        all unconverged snapshots are evaluated in one vectorized pass and
+        their Jacobians are solved as one block-diagonal sparse system.
+        Otherwise the snapshots are solved one after another.
+    reuse_jacobian : int, default 0
+        Number of subsequent Newton-Raphson iterations in which the last
+        numeric LU factorization of the Jacobian is reused ("dishonest"
+        Newton). The fill-reducing ordering of the Jacobian is always
+        computed only once per sub-network and reused.
+    method : str, default 'newton'
+        Power flow algorithm, either 'newton' for the full Newton-Raphson
+        method or 'fdlf' for the fast-decoupled power flow, which iterates
+        all snapshots at once with the constant matrices B' and B'' that are
+        factorized only once per sub-network. Snapshots for which the
+        fast-decoupled power flow does not converge are solved again with
+        Newton-Raphson; their number of iterations includes the iterations
+        of both methods. The fast-decoupled power flow does not support
+        ``distribute_slack``, for which Newton-Raphson is used instead.
+    fdlf_variant : str, default 'XB'
+        Variant of the fast-decoupled power flow, either 'XB' (series
+        resistances neglected in B') or 'BX' (neglected in B'').
+    n_jobs : int, default 1
+        Number of worker processes. If larger than 1, the snapshots of
+        each sub-network are split into n_jobs chunks, which are solved in
+        parallel in a process pool; -1 uses all cores. Only the prepared
+        matrices and the nodal injections are sent to the workers and the
+        results are merged back into the network afterwards.
+    executor : concurrent.futures.Executor, default None
+        Executor to solve the chunks of snapshots on instead of starting a
+        new process pool, e.g. to reuse a pool across calls. If n_jobs is 1,
+        the snapshots are split into as many chunks as the executor has
+        workers.
+    chunksize : int, default None
+        If given, process the snapshots in consecutive windows of at most
+        chunksize snapshots, so that the memory of the intermediate arrays
+        is bounded independently of the number of snapshots. The results
+        of each window are written to the output frames of the network
+        before the next window is solved.
+    sink : callable, default None
+        Function called as ``sink(network, snapshots)`` after the results
+        of each window of snapshots have been written, e.g. to stream them
+        to disk.
 
     Returns
     -------
@@ -355,6 +1331,34 @@ def sub_network_pf(sub_network, snapshots=None, skip_pre=False, x_tol=1e-6, use_
     remaining error, and convergence status for each snapshot
     """
 
+    snapshots = _as_snapshots(sub_network.network, snapshots)
+
+    results = []
+    with _pf_executor(n_jobs, executor) as executor:
+        for window in _snapshot_windows(snapshots, chunksize):
+            results.append(_sub_network_pf(sub_network, snapshots=window, skip_pre=skip_pre, x_tol=x_tol,
+                                           use_seed=use_seed, distribute_slack=distribute_slack,
+                                           slack_weights=slack_weights, batch=batch,
+                                           reuse_jacobian=reuse_jacobian, method=method,
+                                           fdlf_variant=fdlf_variant, n_jobs=n_jobs, executor=executor)[:3])
+            skip_pre = True
+
+            if sink is not None:
+                sink(sub_network.network, window)
+
+    return tuple(pd.concat(r) for r in zip(*results))
+
+
+def _sub_network_pf(sub_network, snapshots=None, skip_pre=False, x_tol=1e-6, use_seed=False,
+                    distribute_slack=False, slack_weights='p_set', batch=False, reuse_jacobian=0,
+                    method='newton', fdlf_variant='XB', n_jobs=1, executor=None):
+    """Non-linear power flow for connected sub-network, see sub_network_pf.
+
+    Returns the number of iterations, the remaining error, the convergence
+    status and whether the snapshot was seeded from its predecessor as
+    four pandas.Series.
+    """
+
     assert type(slack_weights) in [str, pd.Series, dict], "Type of 'slack_weights' must be string, pd.Series or dict. Is {}.".format(type(slack_weights))
 
     if type(slack_weights) == dict:
@@ -363,6 +1367,14 @@ def sub_network_pf(sub_network, snapshots=None, skip_pre=False, x_tol=1e-6, use_
         valid_strings = ['p_nom', 'p_nom_opt', 'p_set']
         assert slack_weights in valid_strings, "String value for 'slack_weights' must be one of {}. Is {}.".format(valid_strings, slack_weights)
 
+    assert use_seed in [True, False, 'previous'], "'use_seed' must be a bool or 'previous'. Is {}.".format(use_seed)
+
+    assert method in ['newton', 'fdlf'], "The power flow method must be one of 'newton' or 'fdlf'. Is {}.".format(method)
+
+    if method == 'fdlf' and distribute_slack:
+        logger.warning("The fast-decoupled power flow does not support a distributed slack, using Newton-Raphson instead.")
+        method = 'newton'
+
     snapshots = _as_snapshots(sub_network.network, snapshots)
     logger.info("Performing non-linear load-flow on {} sub-network {} for snapshots {}".format(sub_network.network.sub_networks.at[sub_network.name,"carrier"], sub_network, snapshots))
 
@@ -397,87 +1409,17 @@ def sub_network_pf(sub_network, snapshots=None, skip_pre=False, x_tol=1e-6, use_
 
     _calculate_controllable_nodal_power_balance(sub_network, network, snapshots, buses_o)
 
-    def f(guess, distribute_slack=False, slack_weights=None):
-
-        last_pq = -1 if distribute_slack else None
-        network.buses_t.v_ang.loc[now,sub_network.pvpqs] = guess[:len(sub_network.pvpqs)]
-        network.buses_t.v_mag_pu.loc[now,sub_network.pqs] = guess[len(sub_network.pvpqs):last_pq]
-
-        v_mag_pu = network.buses_t.v_mag_pu.loc[now,buses_o]
-        v_ang = network.buses_t.v_ang.loc[now,buses_o]
-        V = v_mag_pu*np.exp(1j*v_ang)
-
-        if distribute_slack:
-            slack_power = slack_weights*guess[-1]
-            mismatch = V*np.conj(sub_network.Y*V) - s + slack_power
-        else:
-            mismatch = V*np.conj(sub_network.Y*V) - s
-
-        if distribute_slack:
-            F = r_[real(mismatch)[:],imag(mismatch)[1+len(sub_network.pvs):]]
-        else:
-            F = r_[real(mismatch)[1:],imag(mismatch)[1+len(sub_network.pvs):]]
-
-        return F
-
-
-    def dfdx(guess, distribute_slack=False, slack_weights=None):
-
-        last_pq = -1 if distribute_slack else None
-        network.buses_t.v_ang.loc[now,sub_network.pvpqs] = guess[:len(sub_network.pvpqs)]
-        network.buses_t.v_mag_pu.loc[now,sub_network.pqs] = guess[len(sub_network.pvpqs):last_pq]
-
-        v_mag_pu = network.buses_t.v_mag_pu.loc[now,buses_o]
-        v_ang = network.buses_t.v_ang.loc[now,buses_o]
-
-        V = v_mag_pu*np.exp(1j*v_ang)
-
-        index = r_[:len(buses_o)]
-
-        #make sparse diagonal matrices
-        V_diag = csr_matrix((V,(index,index)))
-        V_norm_diag = csr_matrix((V/abs(V),(index,index)))
-        I_diag = csr_matrix((sub_network.Y*V,(index,index)))
-
-        dS_dVa = 1j*V_diag*np.conj(I_diag - sub_network.Y*V_diag)
-
-        dS_dVm = V_norm_diag*np.conj(I_diag) + V_diag * np.conj(sub_network.Y*V_norm_diag)
-
-        J10 = dS_dVa[1+len(sub_network.pvs):,1:].imag
-        J11 = dS_dVm[1+len(sub_network.pvs):,1+len(sub_network.pvs):].imag
-
-        if distribute_slack:
-            J00 = dS_dVa[:,1:].real
-            J01 = dS_dVm[:,1+len(sub_network.pvs):].real
-            J02 = csr_matrix(slack_weights,(1,1+len(sub_network.pvpqs))).T
-            J12 = csr_matrix((1,len(sub_network.pqs))).T
-            J_P_blocks = [J00, J01, J02]
-            J_Q_blocks = [J10, J11, J12]
-        else:
-            J00 = dS_dVa[1:,1:].real
-            J01 = dS_dVm[1:,1+len(sub_network.pvs):].real
-            J_P_blocks = [J00, J01]
-            J_Q_blocks = [J10, J11]
-
-        J = svstack([
-            shstack(J_P_blocks),
-            shstack(J_Q_blocks)
-        ], format="csr")
-
-        return J
-
-
     #Set what we know: slack V and v_mag_pu for PV buses
     v_mag_pu_set = get_switchable_as_dense(network, 'Bus', 'v_mag_pu_set', snapshots)
     network.buses_t.v_mag_pu.loc[snapshots,sub_network.pvs] = v_mag_pu_set.loc[:,sub_network.pvs]
     network.buses_t.v_mag_pu.loc[snapshots,sub_network.slack_bus] = v_mag_pu_set.loc[:,sub_network.slack_bus]
     network.buses_t.v_ang.loc[snapshots,sub_network.slack_bus] = 0.
 
-    if not use_seed:
+    #seeding from previous snapshots starts the first snapshot flat
+    if not use_seed or use_seed == 'previous':
         network.buses_t.v_mag_pu.loc[snapshots,sub_network.pqs] = 1.
         network.buses_t.v_ang.loc[snapshots,sub_network.pvpqs] = 0.
 
-    slack_args = {'distribute_slack': distribute_slack}
     slack_variable_b = 1 if distribute_slack else 0
 
     if distribute_slack:
@@ -488,60 +1430,97 @@ def sub_network_pf(sub_network, snapshots=None, skip_pre=False, x_tol=1e-6, use_
             slack_weights_calc = pd.DataFrame(bus_generation.groupby(bus_generation.columns, axis=1).sum(), columns=buses_o).apply(normed, axis=1).fillna(0)
         
         elif type(slack_weights) == str and slack_weights in ['p_nom', 'p_nom_opt']:
-            assert not all(network.generators[slack_weights]) == 0, "Invalid slack weights! Generator attribute {} is always zero.".format(slack_weights)
+            assert (network.generators[slack_weights] != 0).any(), "Invalid slack weights! Generator attribute {} is always zero.".format(slack_weights)
             slack_weights_calc = network.generators.groupby('bus').sum()[slack_weights].reindex(buses_o).pipe(normed).fillna(0)
         
         elif generator_slack_weights_b:
             # convert generator-based slack weights to bus-based slack weights
-            slack_weights_calc = slack_weights.rename(network.generators.bus).groupby(slack_weights.index.name).sum().reindex(buses_o).pipe(normed).fillna(0)
+            slack_weights_calc = slack_weights.rename(network.generators.bus).groupby(level=0).sum().reindex(buses_o).pipe(normed).fillna(0)
 
         elif bus_slack_weights_b:
             # take bus-based slack weights
             slack_weights_calc = slack_weights.reindex(buses_o).pipe(normed).fillna(0)
 
-    ss = np.empty((len(snapshots), len(buses_o)), dtype=np.complex)
-    roots = np.empty((len(snapshots), len(sub_network.pvpqs) + len(sub_network.pqs) + slack_variable_b))
-    iters = pd.Series(0, index=snapshots)
-    diffs = pd.Series(index=snapshots)
-    convs = pd.Series(False, index=snapshots)
-    for i, now in enumerate(snapshots):
-        p = network.buses_t.p.loc[now,buses_o]
-        q = network.buses_t.q.loc[now,buses_o]
-        ss[i] = s = p + 1j*q
+        # snapshot-dependent slack weights for 'p_set', otherwise the same for all snapshots
+        slack_weights_calc = np.broadcast_to(slack_weights_calc.values, (len(snapshots), len(buses_o)))
 
-        #Make a guess for what we don't know: V_ang for PV and PQs and v_mag_pu for PQ buses
-        guess = r_[network.buses_t.v_ang.loc[now,sub_network.pvpqs],network.buses_t.v_mag_pu.loc[now,sub_network.pqs]]
+    # keep the state of all snapshots in contiguous arrays
+    # (buses_o is ordered as slack, PVs, PQs)
+    num_pvs = len(sub_network.pvs)
+    num_pvpqs = len(sub_network.pvpqs)
 
-        if distribute_slack:
-            guess = np.append(guess, [0]) # for total slack power
-            if type(slack_weights) is str and slack_weights == 'p_set':
-                # snapshot-dependent slack weights
-                slack_args["slack_weights"] = slack_weights_calc.loc[now]
-            else:
-                slack_args["slack_weights"] = slack_weights_calc
+    ss = (network.buses_t.p.loc[snapshots,buses_o].values
+          + 1j*network.buses_t.q.loc[snapshots,buses_o].values)
+    v_mag_pu = network.buses_t.v_mag_pu.loc[snapshots,buses_o].values.astype(float)
+    v_ang = network.buses_t.v_ang.loc[snapshots,buses_o].values.astype(float)
 
-        #Now try and solve
-        start = time.time()
-        roots[i], n_iter, diff, converged = newton_raphson_sparse(f, guess, dfdx, x_tol=x_tol, **slack_args)
-        logger.info("Newton-Raphson solved in %d iterations with error of %f in %f seconds", n_iter,diff,time.time()-start)
-        iters[now] = n_iter
-        diffs[now] = diff
-        convs[now] = converged
+    #Make a guess for what we don't know: V_ang for PV and PQs and v_mag_pu for PQ buses
+    #and the total slack power if it is distributed
+    guesses = np.hstack((v_ang[:,1:], v_mag_pu[:,1+num_pvs:],
+                         np.zeros((len(snapshots), slack_variable_b))))
 
+    seed_previous = use_seed == 'previous'
+    if seed_previous and batch:
+        logger.info("Seeding from the previous snapshots requires solving the snapshots one after another, ignoring batch=True.")
 
-    #now set everything
     if distribute_slack:
-        last_pq = -1
-        slack_power = roots[:,-1]
+        slack_weights_calc = np.ascontiguousarray(slack_weights_calc)
+    else:
+        slack_weights_calc = None
+
+    options = dict(x_tol=x_tol, seed_previous=seed_previous, batch=batch,
+                   reuse_jacobian=reuse_jacobian)
+
+    if executor is None:
+        # the structure of the Jacobian is cached on the sub-network, so that
+        # only its values have to be filled in
+        jacobian = getattr(sub_network, '_jacobian', None)
+        if (jacobian is None or jacobian.Y is not sub_network.Y or jacobian.num_pvs != num_pvs
+            or jacobian.distribute_slack != distribute_slack):
+            sub_network._jacobian = jacobian = PowerFlowJacobian(sub_network.Y, num_pvs, distribute_slack)
+
+        # the ordering of the Jacobian is cached on the sub-network and reused
+        # across Newton iterations, snapshots and calls
+        if getattr(sub_network, '_jacobian_solver', None) is None:
+            sub_network._jacobian_solver = JacobianSolver()
+
+        fdlf_lu = _fdlf_factorizations(sub_network, fdlf_variant) if method == 'fdlf' else None
+
+        roots, n_iter, diff, converged, seeded = _solve_pf(sub_network.Y, num_pvs, ss, v_mag_pu, v_ang, guesses,
+                                                           slack_weights_calc, fdlf_lu=fdlf_lu, jacobian=jacobian,
+                                                           jacobian_solver=sub_network._jacobian_solver, **options)
     else:
-        last_pq = None
-    network.buses_t.v_ang.loc[snapshots,sub_network.pvpqs] = roots[:,:len(sub_network.pvpqs)]
-    network.buses_t.v_mag_pu.loc[snapshots,sub_network.pqs] = roots[:,len(sub_network.pvpqs):last_pq]
+        # ship only the matrices and the injections of each chunk of
+        # snapshots to the workers
+        if method == 'fdlf':
+            calculate_B_fdlf(sub_network, fdlf_variant, skip_pre=True)
+            fdlf_matrices = (sub_network.B_p, sub_network.B_pp)
+        else:
+            fdlf_matrices = None
+
+        chunks = _snapshot_chunks(len(snapshots), n_jobs, executor)
+        futures = [executor.submit(_solve_pf_chunk, sub_network.Y, num_pvs, ss[c], v_mag_pu[c], v_ang[c], guesses[c],
+                                   None if slack_weights_calc is None else slack_weights_calc[c],
+                                   fdlf_matrices=fdlf_matrices, **options)
+                   for c in chunks]
+        results = [future.result() for future in futures]
+        roots, n_iter, diff, converged, seeded = (np.concatenate(r) for r in zip(*results))
+        logger.info("Solved %d snapshots in %d chunks in parallel", len(snapshots), len(chunks))
+
+    if seed_previous and seeded.any():
+        logger.info("Seeding %d snapshots from their predecessors saved about %d iterations",
+                    seeded.sum(), _estimate_saved_iterations(pd.DataFrame(n_iter), pd.DataFrame(seeded)).iloc[0])
 
-    v_mag_pu = network.buses_t.v_mag_pu.loc[snapshots,buses_o].values
-    v_ang = network.buses_t.v_ang.loc[snapshots,buses_o].values
+    iters = pd.Series(n_iter, index=snapshots)
+    diffs = pd.Series(diff, index=snapshots)
+    convs = pd.Series(converged, index=snapshots)
 
-    V = v_mag_pu*np.exp(1j*v_ang)
+    #now set everything
+    V = _pf_voltages(roots, v_mag_pu, v_ang, num_pvs)
+    v_mag_pu = abs(V)
+
+    network.buses_t.v_ang.loc[snapshots,sub_network.pvpqs] = roots[:,:num_pvpqs]
+    network.buses_t.v_mag_pu.loc[snapshots,sub_network.pqs] = v_mag_pu[:,1+num_pvs:]
 
     #add voltages to branches
     buses_indexer = buses_o.get_indexer
@@ -552,11 +1531,8 @@ def sub_network_pf(sub_network, snapshots=None, skip_pre=False, x_tol=1e-6, use_
     v0 = V[:,buses_indexer(branch_bus0)]
     v1 = V[:,buses_indexer(branch_bus1)]
 
-    i0 = np.empty((len(snapshots), sub_network.Y0.shape[0]), dtype=np.complex)
-    i1 = np.empty((len(snapshots), sub_network.Y1.shape[0]), dtype=np.complex)
-    for i, now in enumerate(snapshots):
-        i0[i] = sub_network.Y0*V[i]
-        i1[i] = sub_network.Y1*V[i]
+    i0 = sub_network.Y0.dot(V.T).T
+    i1 = sub_network.Y1.dot(V.T).T
 
     s0 = pd.DataFrame(v0*np.conj(i0), columns=branches_i, index=snapshots)
     s1 = pd.DataFrame(v1*np.conj(i1), columns=branches_i, index=snapshots)
@@ -568,9 +1544,7 @@ def sub_network_pf(sub_network, snapshots=None, skip_pre=False, x_tol=1e-6, use_
         c.pnl.p1.loc[snapshots,s1t.columns] = s1t.values.real
         c.pnl.q1.loc[snapshots,s1t.columns] = s1t.values.imag
 
-    s_calc = np.empty((len(snapshots), len(buses_o)), dtype=np.complex)
-    for i in np.arange(len(snapshots)):
-        s_calc[i] = V[i]*np.conj(sub_network.Y*V[i])
+    s_calc = V*np.conj(sub_network.Y.dot(V.T)).T
     slack_index = buses_o.get_loc(sub_network.slack_bus)
     if distribute_slack:
         network.buses_t.p.loc[snapshots,sn_buses] = s_calc.real[:,buses_indexer(sn_buses)]
@@ -589,22 +1563,20 @@ def sub_network_pf(sub_network, snapshots=None, skip_pre=False, x_tol=1e-6, use_
 
     #let slack generator take up the slack
     if distribute_slack:
-        distributed_slack_power = network.buses_t.p.loc[snapshots,sn_buses] - ss[:,buses_indexer(sn_buses)].real
-        for bus, group in sub_network.generators().groupby('bus'):
-            if type(slack_weights) == str and slack_weights == 'p_set':
-                generators_t_p_choice = get_switchable_as_dense(network, 'Generator', slack_weights, snapshots)
-                bus_generator_shares = generators_t_p_choice.loc[snapshots,group.index].apply(normed, axis=1).fillna(0)
-                network.generators_t.p.loc[snapshots,group.index] += bus_generator_shares.multiply(distributed_slack_power.loc[snapshots,bus], axis=0)
-            else:
-                if generator_slack_weights_b:
-                    bus_generator_shares = slack_weights.loc[group.index].pipe(normed).fillna(0)
-                else:
-                    bus_generators_p_nom = network.generators.p_nom.loc[group.index]
-                    # distribute evenly if no p_nom given
-                    if all(bus_generators_p_nom) == 0:
-                        bus_generators_p_nom = 1
-                    bus_generator_shares = bus_generators_p_nom.pipe(normed).fillna(0)
-                network.generators_t.p.loc[snapshots,group.index] += distributed_slack_power.loc[snapshots,bus].apply(lambda row: row*bus_generator_shares)
+        distributed_slack_power = network.buses_t.p.loc[snapshots,sn_buses].values - ss[:,buses_indexer(sn_buses)].real
+        sn_generators_i = sub_network.generators().index
+        even_if_zero = False
+        if type(slack_weights) == str and slack_weights == 'p_set':
+            weights = get_switchable_as_dense(network, 'Generator', slack_weights, snapshots, sn_generators_i).values
+        elif generator_slack_weights_b:
+            weights = slack_weights.reindex(sn_generators_i).fillna(0.).values
+        else:
+            # distribute evenly at buses without p_nom
+            weights = network.generators.p_nom.loc[sn_generators_i].values
+            even_if_zero = True
+        network.generators_t.p.loc[snapshots,sn_generators_i] += \
+            _distribute_slack_to_generators(network, sn_generators_i, sn_buses, distributed_slack_power,
+                                            weights, even_if_zero=even_if_zero)
     else:
         network.generators_t.p.loc[snapshots,sub_network.slack_generator] += network.buses_t.p.loc[snapshots,sub_network.slack_bus] - ss[:,slack_index].real
 
@@ -612,10 +1584,11 @@ def sub_network_pf(sub_network, snapshots=None, skip_pre=False, x_tol=1e-6, use_
     network.generators_t.q.loc[snapshots,sub_network.slack_generator] += network.buses_t.q.loc[snapshots,sub_network.slack_bus] - ss[:,slack_index].imag
     network.generators_t.q.loc[snapshots,network.buses.loc[sub_network.pvs, "generator"]] += np.asarray(network.buses_t.q.loc[snapshots,sub_network.pvs] - ss[:,buses_indexer(sub_network.pvs)].imag)
 
-    return iters, diffs, convs
+    return iters, diffs, convs, pd.Series(seeded, index=snapshots)
 
 
-def network_lpf(network, snapshots=None, skip_pre=False):
+def network_lpf(network, snapshots=None, skip_pre=False, n_jobs=1, executor=None,
+                chunksize=None, sink=None):
     """
     Linear power flow for generic network.
 
@@ -627,13 +1600,34 @@ def network_lpf(network, snapshots=None, skip_pre=False):
     skip_pre : bool, default False
         Skip the preliminary steps of computing topology, calculating
         dependent values and finding bus controls.
+    n_jobs : int, default 1
+        Number of worker processes. If larger than 1, the snapshots are
+        split into n_jobs chunks, which are solved in parallel in a process
+        pool; -1 uses all cores. Only the matrix B and the nodal injections
+        are sent to the workers.
+    executor : concurrent.futures.Executor, default None
+        Executor to solve the chunks of snapshots on instead of starting a
+        new process pool. If n_jobs is 1, the snapshots are split into as
+        many chunks as the executor has workers.
+    chunksize : int, default None
+        If given, process the snapshots in consecutive windows of at most
+        chunksize snapshots, so that the memory of the intermediate arrays
+        is bounded independently of the number of snapshots. The results
+        of each window are written to the output frames of the network
+        before the next window is solved.
+    sink : callable, default None
+        Function called as ``sink(network, snapshots)`` after the results
+        of each window of snapshots have been written, e.g. to stream them
+        to disk.
 
     Returns
     -------
     None
     """
 
-    _network_prepare_and_run_pf(network, snapshots, skip_pre, linear=True)
+    _network_prepare_and_run_pf(network, snapshots, skip_pre, linear=True,
+                                n_jobs=n_jobs, executor=executor,
+                                chunksize=chunksize, sink=sink)
 
 
 def apply_line_types(network):
@@ -736,8 +1730,40 @@ def apply_transformer_t_model(network):
     network.transformers.loc[ts_b,"b_pu"] = imag(2/za)
 
 
+def _dependent_values_fingerprint(network):
+    """Fingerprint of the inputs and outputs of calculate_dependent_values."""
+
+    line_attrs = ["bus0", "x", "r", "b", "g", "type", "length", "num_parallel",
+                  "v_nom", "x_pu", "r_pu", "b_pu", "g_pu", "x_pu_eff", "r_pu_eff"]
+    transformer_attrs = ["x", "r", "b", "g", "s_nom", "tap_ratio", "tap_side", "phase_shift",
+                         "type", "tap_position", "num_parallel", "model",
+                         "x_pu", "r_pu", "b_pu", "g_pu", "x_pu_eff", "r_pu_eff"]
+    shunt_attrs = ["bus", "b", "g", "v_nom", "b_pu", "g_pu"]
+
+    def columns(df, attrs):
+        return df[[attr for attr in attrs if attr in df]]
+
+    return _fingerprint(network.buses.v_nom,
+                        columns(network.lines, line_attrs),
+                        network.line_types,
+                        columns(network.transformers, transformer_attrs),
+                        network.transformer_types,
+                        columns(network.shunt_impedances, shunt_attrs))
+
+
 def calculate_dependent_values(network):
-    """Calculate per unit impedances and append voltages to lines and shunt impedances."""
+    """Calculate per unit impedances and append voltages to lines and shunt impedances.
+
+    Nothing is recalculated if neither the inputs nor the results have
+    changed since the last call.
+    """
+
+    cache = _matrix_cache(network)
+    if cache.dependent_values is not None:
+        if cache.dependent_values == _dependent_values_fingerprint(network):
+            cache.hits["dependent_values"] += 1
+            return
+    cache.misses["dependent_values"] += 1
 
     apply_line_types(network)
     apply_transformer_types(network)
@@ -766,6 +1792,9 @@ def calculate_dependent_values(network):
     network.shunt_impedances["b_pu"] = network.shunt_impedances.b*network.shunt_impedances.v_nom**2
     network.shunt_impedances["g_pu"] = network.shunt_impedances.g*network.shunt_impedances.v_nom**2
 
+    if cache.maxsize > 0:
+        cache.dependent_values = _dependent_values_fingerprint(network)
+
 
 def find_slack_bus(sub_network):
     """Find the slack bus in a connected sub-network."""
@@ -836,6 +1865,14 @@ def find_bus_controls(sub_network):
     sub_network.buses_o = sub_network.pvpqs.insert(0, sub_network.slack_bus)
 
 
+def _branch_phase_shift(sub_network):
+    """Phase shifts of the passive branches of sub_network in radians."""
+
+    return np.concatenate([(c.df.loc[c.ind, "phase_shift"]).values*np.pi/180. if c.name == "Transformer"
+                           else np.zeros((len(c.ind),))
+                           for c in sub_network.iterate_components(sub_network.network.passive_branch_components)])
+
+
 def calculate_B_H(sub_network,skip_pre=False):
     """Calculate B and H matrices for AC or DC sub-networks."""
 
@@ -850,6 +1887,15 @@ def calculate_B_H(sub_network,skip_pre=False):
     else:
         attribute="x_pu_eff"
 
+    cache = _matrix_cache(network)
+    key = _branch_fingerprint(sub_network, ["bus0", "bus1", attribute, "phase_shift"])
+    sub_network._B_H_key = key
+    entry = cache.get("B_H", key)
+    if entry is not None:
+        for attr, value in iteritems(entry):
+            setattr(sub_network, attr, value)
+        return
+
     #following leans heavily on pypower.makeBdc
 
     #susceptances
@@ -870,12 +1916,14 @@ def calculate_B_H(sub_network,skip_pre=False):
     sub_network.B = sub_network.K * sub_network.H
 
 
-    sub_network.p_branch_shift = -b*np.concatenate([(c.df.loc[c.ind, "phase_shift"]).values*np.pi/180. if c.name == "Transformer"
-                                                    else np.zeros((len(c.ind),))
-                                                    for c in sub_network.iterate_components(network.passive_branch_components)])
+    sub_network.p_branch_shift = -b*_branch_phase_shift(sub_network)
 
     sub_network.p_bus_shift = sub_network.K * sub_network.p_branch_shift
 
+    cache.set("B_H", key, {attr: getattr(sub_network, attr)
+                           for attr in ["K", "H", "B", "p_branch_shift", "p_bus_shift"]})
+
+
 def calculate_PTDF(sub_network,skip_pre=False):
     """
     Calculate the Power Transfer Distribution Factor (PTDF) for
@@ -895,6 +1943,18 @@ def calculate_PTDF(sub_network,skip_pre=False):
     if not skip_pre:
         calculate_B_H(sub_network)
 
+    #the PTDF is only cached along with B and H from calculate_B_H
+    cache = _matrix_cache(sub_network.network)
+    key = getattr(sub_network, '_B_H_key', None)
+    entry = cache.peek("B_H", key) if key is not None else None
+    if entry is None or entry["B"] is not sub_network.B or entry["H"] is not sub_network.H:
+        key = None
+    else:
+        cached = cache.get("PTDF", key)
+        if cached is not None:
+            sub_network.PTDF = cached["PTDF"]
+            return
+
     #calculate inverse of B with slack removed
 
     n_pvpq = len(sub_network.pvpqs)
@@ -916,6 +1976,323 @@ def calculate_PTDF(sub_network,skip_pre=False):
 
     sub_network.PTDF = sub_network.H*B_inverse
 
+    if key is not None:
+        cache.set("PTDF", key, {"PTDF": sub_network.PTDF})
+
+
+class LazyPTDF(object):
+    """
+    Power Transfer Distribution Factors (PTDF) of a sub-network, which
+    are computed row by row on demand.
+
+    Rather than inverting B, the rows of the requested branches are
+    obtained from the cached LU factorization of B[1:,1:], so that the
+    dense num_branches x num_buses matrix is never formed unless it is
+    asked for. Small entries can be dropped into a sparse matrix.
+
+    Parameters
+    ----------
+    sub_network : pypsa.SubNetwork
+        Sub-network for which B and H have been calculated.
+
+    Attributes
+    ----------
+    branches_i : pandas.MultiIndex
+        Branches in the order of the rows.
+    buses_o : pandas.Index
+        Buses in the order of the columns.
+    shape : tuple
+        Shape of the full PTDF.
+    """
+
+    def __init__(self, sub_network):
+        self.B = sub_network.B
+        self.H = sub_network.H
+        self.branches_i = sub_network.branches_i()
+        self.buses_o = sub_network.buses_o
+        self.shape = self.H.shape
+        self._H = self.H.tocsr()
+        self._lu = _lpf_factorization(sub_network)
+        self._rows = {}
+
+    def _positions(self, branches):
+        if branches is None:
+            return np.arange(self.shape[0])
+        index = pd.Index(branches)
+        if index.is_integer():
+            positions = index.values
+        else:
+            positions = self.branches_i.get_indexer(index)
+            assert (positions >= 0).all(), ("The branches {} are not in the sub-network"
+                                            .format(", ".join(map(str, index[positions < 0]))))
+        return positions
+
+    def _solve(self, positions):
+        rows = np.zeros((len(positions), self.shape[1]))
+        if self._lu is not None and len(positions):
+            #B is symmetric, so the rows of H B^-1 are the columns of B^-1 H^T
+            rows[:,1:] = self._lu.solve(self._H[positions][:,1:].T.toarray()).T
+        return rows
+
+    def rows(self, branches=None):
+        """
+        Dense rows of the PTDF for `branches`.
+
+        Rows are cached, so that subsequent requests of the same
+        branches are not recomputed.
+
+        Parameters
+        ----------
+        branches : list-like, default None
+            Branch labels as in branches_i or integer row positions;
+            defaults to all branches.
+
+        Returns
+        -------
+        numpy.ndarray
+            len(branches) x num_buses array.
+        """
+
+        positions = self._positions(branches)
+        missing = np.unique([i for i in positions if i not in self._rows]).astype(int)
+        self._rows.update(zip(missing, self._solve(missing)))
+        if len(positions) == 0:
+            return np.zeros((0, self.shape[1]))
+        return np.array([self._rows[i] for i in positions])
+
+    def sparse(self, branches=None, tolerance=0., chunksize=256):
+        """
+        Sparse rows of the PTDF for `branches` with all entries whose
+        absolute value is below `tolerance` dropped.
+
+        The rows are computed in chunks of `chunksize` branches, so
+        that at most one dense chunk is held in memory.
+
+        Parameters
+        ----------
+        branches : list-like, default None
+            Branch labels as in branches_i or integer row positions;
+            defaults to all branches.
+        tolerance : float, default 0.
+            Entries with smaller absolute values are dropped.
+        chunksize : int, default 256
+            Number of rows computed at once.
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+            len(branches) x num_buses matrix.
+        """
+
+        positions = self._positions(branches)
+        blocks = []
+        for start in range(0, len(positions), chunksize):
+            chunk = positions[start:start+chunksize]
+            if all(i in self._rows for i in chunk):
+                dense = np.array([self._rows[i] for i in chunk])
+            else:
+                dense = self._solve(chunk)
+            dense[abs(dense) < tolerance] = 0.
+            blocks.append(csr_matrix(dense))
+        if not blocks:
+            return csr_matrix((0, self.shape[1]))
+        return svstack(blocks, format='csr')
+
+    def toarray(self):
+        """The full dense PTDF."""
+        return self.rows()
+
+
+def calculate_lazy_PTDF(sub_network, skip_pre=False):
+    """
+    Calculate the Power Transfer Distribution Factor (PTDF) for
+    sub_network lazily, i.e. without forming the dense matrix.
+
+    Sets and returns sub_network.lazy_PTDF as a LazyPTDF, which is kept
+    with its cached rows as long as B and H are unchanged.
+
+    Parameters
+    ----------
+    sub_network : pypsa.SubNetwork
+    skip_pre : bool, default False
+        Skip the preliminary steps of computing topology, calculating dependent values,
+        finding bus controls and computing B and H.
+
+    Returns
+    -------
+    LazyPTDF
+
+    Examples
+    --------
+    >>> ptdf = sub_network.calculate_lazy_PTDF()
+    >>> ptdf.sparse(tolerance=1e-5)
+    """
+
+    if not skip_pre:
+        calculate_B_H(sub_network)
+
+    ptdf = getattr(sub_network, 'lazy_PTDF', None)
+    if ptdf is None or ptdf.B is not sub_network.B or ptdf.H is not sub_network.H:
+        sub_network.lazy_PTDF = ptdf = LazyPTDF(sub_network)
+
+    return ptdf
+
+
+def _branch_outage_distribution_factors(PTDF, K):
+    """BODF from the PTDF and the incidence matrix K of a sub-network."""
+
+    num_branches = PTDF.shape[0]
+
+    #build LxL version of PTDF
+    branch_PTDF = PTDF*K
+
+    denominator = csr_matrix((1/(1-np.diag(branch_PTDF)),(r_[:num_branches],r_[:num_branches])))
+
+    BODF = branch_PTDF*denominator
+
+    #make sure the flow on the branch itself is zero
+    np.fill_diagonal(BODF,-1)
+
+    return BODF
+
+
+def update_PTDF(sub_network, branches=None, b=None, max_updates=20, skip_pre=False):
+    """
+    Update B, H, the factorization of B and, where they have been
+    calculated, the PTDF and BODF of sub_network after the series
+    impedances of a few branches have changed.
+
+    All susceptance changes since the last full calculation are applied
+    as one low-rank Sherman-Morrison-Woodbury correction to the LU
+    factorization of B[1:,1:] and to the PTDF, which costs
+    O(num_branches x num_buses x rank) instead of a new factorization
+    and inversion. Once more than `max_updates` branches have changed,
+    the matrices are rebuilt from scratch instead.
+
+    A branch is removed by setting its susceptance to zero and added by
+    raising it from zero, so that it keeps its row of the PTDF; removing
+    branches which split the sub-network raises a ValueError.
+
+    Parameters
+    ----------
+    sub_network : pypsa.SubNetwork
+    branches : list-like, default None
+        Branch labels as in sub_network.branches_i() or integer row
+        positions; defaults to all branches whose susceptance in the
+        network data differs from the one in B.
+    b : float or array-like, default None
+        New per unit susceptances 1/x_pu_eff (1/r_pu_eff for DC) of
+        `branches`; defaults to the ones in the network data.
+    max_updates : int, default 20
+        Number of changed branches beyond which the matrices are rebuilt.
+    skip_pre : bool, default False
+        Skip calculating the dependent values, e.g. x_pu_eff from x.
+
+    Examples
+    --------
+    >>> network.lines.loc[extended, "x"] /= factor
+    >>> sub_network.update_PTDF()
+    """
+
+    network = sub_network.network
+
+    if not skip_pre:
+        calculate_dependent_values(network)
+
+    if not hasattr(sub_network, 'B'):
+        calculate_B_H(sub_network, skip_pre=True)
+
+    if network.sub_networks.at[sub_network.name,"carrier"] == "DC":
+        attribute="r_pu_eff"
+    else:
+        attribute="x_pu_eff"
+
+    #the state is rebuilt if B, H or the PTDF were recalculated elsewhere,
+    #e.g. by calculate_PTDF() after an update without PTDF
+    state = getattr(sub_network, '_PTDF_update', None)
+    PTDF = getattr(sub_network, 'PTDF', None)
+    if (state is None or state.B is not sub_network.B or state.H is not sub_network.H
+        or (PTDF is not None and PTDF is not state.current)):
+        #the current matrices are the base of the following updates
+        lu = _lpf_factorization(sub_network)
+        if isinstance(lu, _WoodburyLU):
+            lu = splu(sub_network.B.tocsr()[1:,1:].tocsc())
+        b0 = np.asarray(sub_network.H.multiply(sub_network.K.T).sum(axis=1)).ravel()/2.
+        state = Dict(B=sub_network.B, H=sub_network.H, lu=lu, b0=b0, b=b0.copy(),
+                     PTDF=PTDF, current=PTDF)
+
+    data = 1./np.concatenate([c.df.loc[c.ind, attribute].values
+                              for c in sub_network.iterate_components(network.passive_branch_components)])
+
+    if branches is None:
+        assert b is None, "The susceptances b can only be given for explicit branches"
+        positions = np.flatnonzero(data != state.b)
+    else:
+        index = pd.Index(branches)
+        if index.is_integer():
+            positions = index.values
+        else:
+            positions = sub_network.branches_i().get_indexer(index)
+            assert (positions >= 0).all(), ("The branches {} are not in the sub-network"
+                                            .format(", ".join(map(str, index[positions < 0]))))
+
+    b_new = state.b.copy()
+    b_new[positions] = data[positions] if b is None else b
+    changed = np.flatnonzero(b_new != state.b0)
+    rebuild = len(changed) > max_updates
+
+    if not rebuild and state.lu is not None and len(changed):
+        #raises before anything is modified if the sub-network is split
+        U = sub_network.K[1:,changed].toarray()
+        c = b_new[changed] - state.b0[changed]
+        lu = _WoodburyLU(state.lu, U, c)
+    else:
+        lu = state.lu
+
+    state.b = b_new
+    b_diag = csr_matrix((b_new, (r_[:len(b_new)], r_[:len(b_new)])))
+    sub_network.H = b_diag*sub_network.K.T
+    sub_network.B = sub_network.K*sub_network.H
+    sub_network.p_branch_shift = -b_new*_branch_phase_shift(sub_network)
+    sub_network.p_bus_shift = sub_network.K*sub_network.p_branch_shift
+
+    #only matrices which agree with the network data are cached
+    cache = _matrix_cache(network)
+    key = None
+    if np.array_equal(b_new, data):
+        key = _branch_fingerprint(sub_network, ["bus0", "bus1", attribute, "phase_shift"])
+        cache.set("B_H", key, {attr: getattr(sub_network, attr)
+                               for attr in ["K", "H", "B", "p_branch_shift", "p_bus_shift"]})
+    sub_network._B_H_key = key
+
+    if rebuild:
+        logger.debug("Rebuilding the PTDF of sub-network %s after changes of %d branches",
+                     sub_network.name, len(changed))
+        sub_network._PTDF_update = None
+        if state.PTDF is not None:
+            calculate_PTDF(sub_network, skip_pre=True)
+    else:
+        state.B, state.H = sub_network.B, sub_network.H
+        sub_network._PTDF_update = state
+        sub_network._B_lu = (sub_network.B, sub_network.B.tocsr(), lu)
+
+        if state.PTDF is not None:
+            PTDF = state.PTDF.copy()
+            if isinstance(lu, _WoodburyLU):
+                #H B^-1 = (H_0 + dH) (B_0^-1 - X M^-1 C X^T) with X = B_0^-1 U
+                #and dH non-zero only in the rows of the changed branches
+                A = state.PTDF[:,1:]
+                HX = A.dot(lu.U)
+                HX[changed] += c[:,np.newaxis]*lu.U.T.dot(lu.X)
+                PTDF[changed,1:] += c[:,np.newaxis]*lu.X.T
+                PTDF[:,1:] -= HX.dot(lu.correction(lu.X.T))
+            sub_network.PTDF = state.current = PTDF
+            if key is not None:
+                cache.set("PTDF", key, {"PTDF": PTDF})
+
+    if getattr(sub_network, 'PTDF', None) is not None and hasattr(sub_network, 'BODF'):
+        sub_network.BODF = _branch_outage_distribution_factors(sub_network.PTDF, sub_network.K)
+
 
 def calculate_Y(sub_network,skip_pre=False):
     """Calculate bus admittance matrices for AC sub-networks."""
@@ -927,11 +2304,33 @@ def calculate_Y(sub_network,skip_pre=False):
         logger.warning("Non-AC networks not supported for Y!")
         return
 
-    branches = sub_network.branches()
     buses_o = sub_network.buses_o
 
     network = sub_network.network
 
+    #bus shunt impedances
+    b_sh = network.shunt_impedances.b_pu.groupby(network.shunt_impedances.bus).sum().reindex(buses_o, fill_value = 0.)
+    g_sh = network.shunt_impedances.g_pu.groupby(network.shunt_impedances.bus).sum().reindex(buses_o, fill_value = 0.)
+    Y_sh = g_sh + 1.j*b_sh
+
+    cache = _matrix_cache(network)
+    key = _fingerprint(_branch_fingerprint(sub_network, ["bus0", "bus1", "r_pu", "x_pu", "g_pu", "b_pu",
+                                                         "tap_ratio", "tap_side", "phase_shift"]),
+                       Y_sh.values)
+    entry = cache.get("Y", key)
+    if entry is None:
+        entry = dict(zip(["Y0", "Y1", "Y"], _admittance_matrices(sub_network.branches(), buses_o, Y_sh)))
+        cache.set("Y", key, entry)
+
+    for attr, value in iteritems(entry):
+        setattr(sub_network, attr, value)
+
+
+def _admittance_matrices(branches, buses_o, Y_sh):
+    """Branch admittance matrices Y0, Y1 and bus admittance matrix Y for
+    the per unit impedances of `branches` and the bus shunt admittances
+    Y_sh, with the buses ordered as in buses_o."""
+
     #following leans heavily on pypower.makeYbus
     #Copyright Richard Lincoln, Ray Zimmerman, BSD-style licence
 
@@ -964,11 +2363,6 @@ def calculate_Y(sub_network,skip_pre=False):
     Y01 = -y_se/tau_lv/tau_hv/np.conj(phase_shift)
     Y00 = (y_se + 0.5*y_sh)/tau_hv**2
 
-    #bus shunt impedances
-    b_sh = network.shunt_impedances.b_pu.groupby(network.shunt_impedances.bus).sum().reindex(buses_o, fill_value = 0.)
-    g_sh = network.shunt_impedances.g_pu.groupby(network.shunt_impedances.bus).sum().reindex(buses_o, fill_value = 0.)
-    Y_sh = g_sh + 1.j*b_sh
-
     #get bus indices
     bus0 = buses_o.get_indexer(branches.bus0)
     bus1 = buses_o.get_indexer(branches.bus1)
@@ -980,13 +2374,68 @@ def calculate_Y(sub_network,skip_pre=False):
     #build Y{0,1} such that Y{0,1} * V is the vector complex branch currents
 
     i = r_[np.arange(num_branches), np.arange(num_branches)]
-    sub_network.Y0 = csr_matrix((r_[Y00,Y01],(i,r_[bus0,bus1])), (num_branches,num_buses))
-    sub_network.Y1 = csr_matrix((r_[Y10,Y11],(i,r_[bus0,bus1])), (num_branches,num_buses))
+    Y0 = csr_matrix((r_[Y00,Y01],(i,r_[bus0,bus1])), (num_branches,num_buses))
+    Y1 = csr_matrix((r_[Y10,Y11],(i,r_[bus0,bus1])), (num_branches,num_buses))
 
     #now build bus admittance matrix
-    sub_network.Y = C0.T * sub_network.Y0 + C1.T * sub_network.Y1 + \
+    Y = C0.T * Y0 + C1.T * Y1 + \
        csr_matrix((Y_sh, (np.arange(num_buses), np.arange(num_buses))))
 
+    return Y0, Y1, Y
+
+
+def calculate_B_fdlf(sub_network, variant='XB', skip_pre=False):
+    """
+    Calculate the constant B' and B'' matrices of the fast-decoupled
+    power flow for AC sub-networks.
+
+    Sets sub_network.B_p (for the voltage angles of the PV and PQ buses)
+    and sub_network.B_pp (for the voltage magnitudes of the PQ buses) as
+    sparse matrices.
+
+    Parameters
+    ----------
+    sub_network : pypsa.SubNetwork
+    variant : string, default 'XB'
+        Either 'XB', which neglects the series resistances in B', or 'BX',
+        which neglects them in B''.
+    skip_pre : bool, default False
+        Skip the preliminary step of computing the dependent values.
+
+    """
+
+    #following leans heavily on pypower.makeB
+    #Copyright Richard Lincoln, Ray Zimmerman, BSD-style licence
+
+    assert variant in ['XB', 'BX'], "The fast-decoupled variant must be one of 'XB' or 'BX'. Is {}.".format(variant)
+
+    if not skip_pre:
+        calculate_dependent_values(sub_network.network)
+
+    branches = sub_network.branches()
+    buses_o = sub_network.buses_o
+    network = sub_network.network
+    num_pvs = len(sub_network.pvs)
+
+    #B' neglects shunts and tap ratios
+    branches_p = branches.copy()
+    branches_p[["g_pu", "b_pu"]] = 0.
+    branches_p["tap_ratio"] = 1.
+    if variant == 'XB':
+        branches_p["r_pu"] = 0.
+    Y_p = _admittance_matrices(branches_p, buses_o, np.zeros(len(buses_o)))[2]
+
+    #B'' neglects phase shifts
+    branches_pp = branches.copy()
+    branches_pp["phase_shift"] = 0.
+    if variant == 'BX':
+        branches_pp["r_pu"] = 0.
+    b_sh = network.shunt_impedances.b_pu.groupby(network.shunt_impedances.bus).sum().reindex(buses_o, fill_value = 0.)
+    Y_pp = _admittance_matrices(branches_pp, buses_o, 1.j*b_sh)[2]
+
+    sub_network.B_p = -Y_p.imag[1:,1:]
+    sub_network.B_pp = -Y_pp.imag[1+num_pvs:,1+num_pvs:]
+
 
 
 def aggregate_multi_graph(sub_network):
@@ -1121,7 +2570,8 @@ def find_cycles(sub_network, weight='x_pu'):
                 sub_network.C[b_i,c] = sign
                 c+=1
 
-def sub_network_lpf(sub_network, snapshots=None, skip_pre=False):
+def sub_network_lpf(sub_network, snapshots=None, skip_pre=False, n_jobs=1, executor=None,
+                    chunksize=None, sink=None):
     """
     Linear power flow for connected sub-network.
 
@@ -1133,6 +2583,25 @@ def sub_network_lpf(sub_network, snapshots=None, skip_pre=False):
     skip_pre : bool, default False
         Skip the preliminary steps of computing topology, calculating
         dependent values and finding bus controls.
+    n_jobs : int, default 1
+        Number of worker processes. If larger than 1, the snapshots are
+        split into n_jobs chunks, which are solved in parallel in a process
+        pool; -1 uses all cores. Only the matrix B and the nodal injections
+        are sent to the workers.
+    executor : concurrent.futures.Executor, default None
+        Executor to solve the chunks of snapshots on instead of starting a
+        new process pool. If n_jobs is 1, the snapshots are split into as
+        many chunks as the executor has workers.
+    chunksize : int, default None
+        If given, process the snapshots in consecutive windows of at most
+        chunksize snapshots, so that the memory of the intermediate arrays
+        is bounded independently of the number of snapshots. The results
+        of each window are written to the output frames of the network
+        before the next window is solved.
+    sink : callable, default None
+        Function called as ``sink(network, snapshots)`` after the results
+        of each window of snapshots have been written, e.g. to stream them
+        to disk.
 
     Returns
     -------
@@ -1140,6 +2609,18 @@ def sub_network_lpf(sub_network, snapshots=None, skip_pre=False):
     """
 
     snapshots = _as_snapshots(sub_network.network, snapshots)
+
+    windows = _snapshot_windows(snapshots, chunksize)
+    if len(windows) > 1 or sink is not None:
+        with _pf_executor(n_jobs, executor) as executor:
+            for window in windows:
+                sub_network_lpf(sub_network, window, skip_pre=skip_pre, n_jobs=n_jobs, executor=executor)
+                skip_pre = True
+
+                if sink is not None:
+                    sink(sub_network.network, window)
+        return
+
     logger.info("Performing linear load-flow on %s sub-network %s for snapshot(s) %s",
                 sub_network.network.sub_networks.at[sub_network.name,"carrier"], sub_network, snapshots)
 
@@ -1168,15 +2649,8 @@ def sub_network_lpf(sub_network, snapshots=None, skip_pre=False):
 
     # set the power injection at each node
     network.buses_t.p.loc[snapshots, buses_o] = \
-        sum([((c.pnl.p.loc[snapshots, c.ind] * c.df.loc[c.ind, 'sign'])
-              .groupby(c.df.loc[c.ind, 'bus'], axis=1).sum()
-              .reindex(columns=buses_o, fill_value=0.))
-             for c in sub_network.iterate_components(network.one_port_components)]
-            +
-            [(- c.pnl["p"+str(i)].loc[snapshots].groupby(c.df["bus"+str(i)], axis=1).sum()
-              .reindex(columns=buses_o, fill_value=0))
-             for c in network.iterate_components(network.controllable_branch_components)
-             for i in [int(col[3:]) for col in c.df.columns if col[:3] == "bus"]])
+        _calculate_nodal_injections(network, snapshots, buses_o,
+                                           sub_network.iterate_components(network.one_port_components))
 
     if not skip_pre and len(branches_i) > 0:
         calculate_B_H(sub_network, skip_pre=True)
@@ -1184,7 +2658,20 @@ def sub_network_lpf(sub_network, snapshots=None, skip_pre=False):
     v_diff = np.zeros((len(snapshots), len(buses_o)))
     if len(branches_i) > 0:
         p = network.buses_t['p'].loc[snapshots, buses_o].values - sub_network.p_bus_shift
-        v_diff[:,1:] = spsolve(sub_network.B[1:, 1:], p[:,1:].T).T
+        with _pf_executor(n_jobs, executor) as executor:
+            if executor is None:
+                v_diff[:,1:] = _lpf_factorization(sub_network).solve(np.ascontiguousarray(p[:,1:].T)).T
+            else:
+                #workers in this process (threads) or forked from it reuse
+                #the cached factorization
+                B = sub_network.B[1:, 1:].tocsr()
+                key = _fingerprint(B.indptr, B.indices, B.data)
+                _lpf_worker_lu.clear()
+                _lpf_worker_lu[key] = _lpf_factorization(sub_network)
+                chunks = _snapshot_chunks(len(snapshots), n_jobs, executor)
+                futures = [executor.submit(_solve_lpf_chunk, B, p[c,1:], key) for c in chunks]
+                for c, future in zip(chunks, futures):
+                    v_diff[c,1:] = future.result()
         flows = pd.DataFrame(v_diff * sub_network.H.T,
                              columns=branches_i, index=snapshots) + sub_network.p_branch_shift
 
@@ -1211,7 +2698,107 @@ def sub_network_lpf(sub_network, snapshots=None, skip_pre=False):
 
 
 
-def network_batch_lpf(network,snapshots=None):
-    """Batched linear power flow with numpy.dot for several snapshots."""
+def network_batch_lpf(network, snapshots=None, skip_pre=False):
+    """
+    Batched linear power flow for all snapshots at once.
+
+    Equivalent to network.lpf(), but designed for many repeated calls,
+    e.g. in Monte Carlo studies. The dispatch of all components of the
+    network is mapped to the nodal injections of all snapshots with sparse
+    component-to-bus aggregation matrices, the reduced matrix B of each
+    sub-network is factorized only once (the factorization is cached until
+    the branch parameters change) and all snapshots are solved with one
+    multi-RHS back-substitution. The results are written to the network
+    in bulk.
 
-    raise NotImplementedError("Batch linear power flow not supported yet.")
+    Parameters
+    ----------
+    snapshots : list-like|single snapshot
+        A subset or an elements of network.snapshots on which to run
+        the power flow, defaults to network.snapshots
+    skip_pre : bool, default False
+        Skip the preliminary steps of computing topology, calculating
+        dependent values, finding bus controls and calculating the B and H
+        matrices. Use this for repeated calls in which only the dispatch
+        changes.
+
+    Returns
+    -------
+    None
+    """
+
+    if not skip_pre:
+        network.determine_network_topology()
+        calculate_dependent_values(network)
+        _allocate_pf_outputs(network, linear=True)
+
+        for sub_network in network.sub_networks.obj:
+            find_bus_controls(sub_network)
+            if len(sub_network.branches_i()) > 0:
+                calculate_B_H(sub_network, skip_pre=True)
+
+    snapshots = _as_snapshots(network, snapshots)
+    logger.info("Performing batched linear load-flow for %d snapshots", len(snapshots))
+
+    #deal with links
+    for c in network.iterate_components(network.controllable_branch_components):
+        p_set = get_switchable_as_dense(network, c.name, 'p_set', snapshots)
+        c.pnl.p0.loc[snapshots] = p_set
+        for i in [int(col[3:]) for col in c.df.columns if col[:3] == "bus" and col != "bus0"]:
+            eff_name = "efficiency" if i == 1 else "efficiency{}".format(i)
+            efficiency = get_switchable_as_dense(network, c.name, eff_name, snapshots)
+            links = c.df.index[c.df["bus{}".format(i)] != ""]
+            c.pnl['p{}'.format(i)].loc[snapshots, links] = -p_set.loc[:, links]*efficiency.loc[:, links]
+
+    # allow all shunt impedances and one ports to dispatch as set
+    network.shunt_impedances_t.p.loc[snapshots] = network.shunt_impedances.g_pu.values
+    for c in network.iterate_components(network.controllable_one_port_components):
+        c.pnl.p.loc[snapshots] = get_switchable_as_dense(network, c.name, 'p_set', snapshots)
+
+    buses = network.buses.index
+    p = _calculate_nodal_injections(network, snapshots, buses,
+                                           network.iterate_components(network.one_port_components))
+    v_ang = np.zeros_like(p)
+    v_mag_pu = np.ones_like(p)
+    generators_p = network.generators_t.p.loc[snapshots].values.copy()
+    generators_i = network.generators.index
+    flows = []
+
+    for sub_network in network.sub_networks.obj:
+        buses_i = buses.get_indexer(sub_network.buses_o)
+        branches_i = sub_network.branches_i()
+
+        v_diff = np.zeros((len(snapshots), len(buses_i)))
+        if len(branches_i) > 0:
+            lu = _lpf_factorization(sub_network)
+            p_sub = p[:,buses_i] - sub_network.p_bus_shift
+            v_diff[:,1:] = lu.solve(np.ascontiguousarray(p_sub[:,1:].T)).T
+            flows.append(pd.DataFrame(v_diff*sub_network.H.T + sub_network.p_branch_shift,
+                                      index=snapshots, columns=branches_i))
+
+        if network.sub_networks.at[sub_network.name,"carrier"] == "DC":
+            v_mag_pu[:,buses_i] = 1 + v_diff
+        else:
+            v_ang[:,buses_i] = v_diff
+
+        # set slack bus power to pick up remained
+        slack_adjustment = -p[:,buses_i].sum(axis=1)
+        p[:,buses_i[0]] += slack_adjustment
+
+        # let slack generator take up the slack
+        if sub_network.slack_generator is not None:
+            generators_p[:,generators_i.get_loc(sub_network.slack_generator)] += slack_adjustment
+
+    network.buses_t.p.loc[snapshots, buses] = p
+    network.buses_t.v_ang.loc[snapshots, buses] = v_ang
+    network.buses_t.v_mag_pu.loc[snapshots, buses] = v_mag_pu
+    network.generators_t.p.loc[snapshots, generators_i] = generators_p
+
+    if flows:
+        flows = pd.concat(flows, axis=1)
+        components = flows.columns.get_level_values(0)
+        for c in network.iterate_components(network.passive_branch_components):
+            if c.name in components:
+                f = flows.loc[:, c.name]
+                c.pnl.p0.loc[snapshots, f.columns] = f
+                c.pnl.p1.loc[snapshots, f.columns] = -f
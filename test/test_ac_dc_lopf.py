@@ -3,6 +3,9 @@ from itertools import product
 import os
 from numpy.testing import assert_array_almost_equal as equal
 import sys
+import pytest
+import scipy
+from packaging.version import Version
 
 solver_name = 'glpk' if sys.platform == 'win32' else 'cbc'
 
@@ -46,6 +49,57 @@ def test_lopf():
         equal(n.links_t.p0.loc[:,n.links.index],
               n_r.links_t.p0.loc[:,n.links.index],decimal=2)
 
+        status, cond = n.lopf(snapshots=snapshots, solver_name=solver_name,
+                              pyomo=False, backend='matrix')
+        assert status == 'ok'
+        equal(n.generators_t.p.loc[:,n.generators.index],
+              n_r.generators_t.p.loc[:,n.generators.index],decimal=2)
+        equal(n.lines_t.p0.loc[:,n.lines.index],
+              n_r.lines_t.p0.loc[:,n.lines.index],decimal=2)
+
+
+def test_lopf_few_snapshots():
+
+    csv_folder_name = os.path.join(os.path.dirname(__file__), "..", "examples",
+                                   "ac-dc-meshed", "ac-dc-data")
+
+    n = pypsa.Network(csv_folder_name)
+
+    #fewer snapshots than generators
+    snapshots = n.snapshots[:2]
+    assert len(snapshots) < len(n.generators)
+
+    objectives = []
+    for backend in ['text', 'matrix']:
+        status, cond = n.lopf(snapshots=snapshots, solver_name=solver_name,
+                              pyomo=False, backend=backend)
+        assert status == 'ok'
+        objectives.append(n.objective)
+    equal(*objectives, decimal=2)
+
+
+@pytest.mark.skipif(Version(scipy.__version__) < Version('1.7.0'),
+                    reason="HiGHS marginals need scipy >= 1.7")
+def test_lopf_highs():
+
+    csv_folder_name = os.path.join(os.path.dirname(__file__), "..", "examples",
+                                   "ac-dc-meshed", "ac-dc-data")
+
+    n = pypsa.Network(csv_folder_name)
+    n_r = pypsa.Network(os.path.join(csv_folder_name,"results-lopf"))
+
+    status, cond = n.lopf(pyomo=False, solver_name='highs',
+                          keep_shadowprices=True)
+    assert status == 'ok'
+    equal(n.generators_t.p.loc[:,n.generators.index],
+          n_r.generators_t.p.loc[:,n.generators.index],decimal=2)
+    equal(n.lines_t.p0.loc[:,n.lines.index],
+          n_r.lines_t.p0.loc[:,n.lines.index],decimal=2)
+    equal(n.buses_t.marginal_price.loc[:,n.buses.index],
+          n_r.buses_t.marginal_price.loc[:,n.buses.index],decimal=2)
+
 
 if __name__ == "__main__":
     test_lopf()
+    test_lopf_few_snapshots()
+    test_lopf_highs()
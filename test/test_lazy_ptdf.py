@@ -0,0 +1,42 @@
+from __future__ import absolute_import
+
+import pypsa
+
+from pypower.api import case118 as case
+
+import numpy as np
+
+
+def test_lazy_ptdf():
+
+    network = pypsa.Network()
+    network.import_from_pypower_ppc(case())
+    network.determine_network_topology()
+
+    sub_network = network.sub_networks.obj[0]
+    sub_network.calculate_PTDF()
+    PTDF = sub_network.PTDF
+
+    ptdf = sub_network.calculate_lazy_PTDF()
+
+    assert ptdf.shape == PTDF.shape
+    np.testing.assert_array_almost_equal(ptdf.toarray(), PTDF)
+
+    #rows by label and by position
+    branches = ptdf.branches_i[[5, 0, 17]]
+    np.testing.assert_array_almost_equal(ptdf.rows(branches), PTDF[[5, 0, 17]])
+    np.testing.assert_array_almost_equal(ptdf.rows([5, 0, 17]), PTDF[[5, 0, 17]])
+
+    #small values are dropped from the sparse version
+    tolerance = 1e-2
+    sparse = ptdf.sparse(tolerance=tolerance, chunksize=50)
+    np.testing.assert_array_almost_equal(sparse.toarray(),
+                                         np.where(abs(PTDF) < tolerance, 0., PTDF))
+    assert sparse.nnz < (abs(PTDF) >= tolerance).sum() + 1
+
+    #the object and its cached rows are kept while B and H are unchanged
+    assert sub_network.calculate_lazy_PTDF() is ptdf
+
+
+if __name__ == "__main__":
+    test_lazy_ptdf()
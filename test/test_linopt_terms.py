@@ -0,0 +1,68 @@
+import pypsa
+import os
+import numpy as np
+import pandas as pd
+from numpy.testing import assert_array_equal, assert_array_almost_equal
+
+from pypsa.linopt import (linexpr, linterms, _parse_exprs, problem_matrices,
+                          get_con, get_var)
+from pypsa.linopf import prepare_lopf
+
+
+def test_linterms():
+
+    index = pd.Index(['a', 'b', 'c'])
+    columns = pd.Index(['x', 'y'])
+    var1 = pd.DataFrame([[1, 2], [3, 4], [5, 6]], index, columns)
+    var2 = pd.Series([7, 8], columns)
+    coeff = pd.DataFrame([[0.5, -1], [2, 3], [1, 1e-3]], index, columns)
+
+    exprs = linexpr((coeff, var1), (-2, var2), as_pandas=False)
+    terms = linterms((coeff, var1), (-2, var2))
+    assert terms.shape == (3, 2)
+    assert_array_equal(terms.to_strings(), exprs)
+
+    #concatenation with broadcasting keeps the order of the terms
+    exprs = exprs + linexpr((1, var2), as_pandas=False)
+    terms = terms + linterms((1, var2))
+    assert_array_equal(terms.to_strings(), exprs)
+
+    #strings are parsed into the same coordinates
+    row, coeff, var = _parse_exprs(exprs)
+    order = np.argsort(terms.row, kind='stable')
+    assert_array_equal(row, terms.row[order])
+    assert_array_almost_equal(coeff, terms.coeff[order])
+    assert_array_equal(var, terms.var[order])
+
+
+def test_linterms_broadcasting():
+
+    #a series broadcasts over a frame with fewer rows than columns
+    wide = pd.DataFrame([[1, 2, 3, 4]], columns=list('abcd'))
+    coeff = pd.Series([1., 2, 3, 4], wide.columns)
+    terms = linterms((coeff, wide))
+    assert terms.shape == (1, 4)
+    assert_array_equal(terms.to_strings(),
+                       linexpr((coeff, wide), as_pandas=False))
+
+
+def test_problem_matrices():
+
+    csv_folder_name = os.path.join(os.path.dirname(__file__), "..", "examples",
+                                   "ac-dc-meshed", "ac-dc-data")
+    n = pypsa.Network(csv_folder_name)
+    n.calculate_dependent_values()
+    n.determine_network_topology()
+
+    fdp, problem_fn = prepare_lopf(n, backend='matrix')
+    os.close(fdp); os.remove(problem_fn)
+    m = problem_matrices(n)
+    assert m.A.shape == (n._cCounter, n._xCounter)
+
+    #the nodal balance of each bus contains the dispatch of its generators
+    cons = get_con(n, 'Bus', 'marginal_price')
+    gens = get_var(n, 'Generator', 'p')
+    for gen, bus in n.generators.bus.items():
+        row, col = cons.at[n.snapshots[0], bus], gens.at[n.snapshots[0], gen]
+        assert m.A[row, col] == 1.
+        assert m.sense[row] == '='
@@ -0,0 +1,62 @@
+import time
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from pypsa.linopt import _str_array, _format_array, _to_float_str, _to_int_str
+
+
+def format_entries(array, to_str):
+    return np.array([to_str(v) for v in array.ravel()],
+                    dtype=object).reshape(array.shape)
+
+
+def test_str_array():
+
+    floats = np.array([[0., -0., 1., -1.5, 1e-7, -5e-7, 123456789.123456789],
+                       [np.nan, np.inf, -np.inf, 1e20, -3e-12, 0.1, 2/3]])
+    assert_array_equal(_str_array(floats), format_entries(floats, _to_float_str))
+
+    ints = np.array([1, 0, 12, 2**40, 987654321])
+    assert_array_equal(_str_array(ints, True), format_entries(ints, _to_int_str))
+
+    #integer references stored as floats
+    assert_array_equal(_str_array(ints.astype(float), True),
+                       format_entries(ints, _to_int_str))
+
+    #chunks which do not divide the number of entries
+    assert_array_equal(_format_array(floats, '%+f', chunksize=3),
+                       format_entries(floats, _to_float_str))
+
+    assert _str_array(np.array([])).shape == (0,)
+
+    #expressions are passed through
+    exprs = np.array(['+1.000000 x1\n', '-2.500000 x2\n'], dtype=object)
+    assert_array_equal(_str_array(exprs), exprs)
+
+
+def benchmark_str_array(num_terms=10000000):
+    """
+    Compares the formatting of the coefficients and variable references of
+    a problem with `num_terms` terms by np.vectorize and in chunks.
+    """
+
+    coeffs = np.random.uniform(-1e3, 1e3, num_terms)
+    references = np.arange(1, num_terms + 1)
+
+    results = {}
+    for name, to_float, to_int in [
+            ("np.vectorize", np.vectorize(_to_float_str, otypes=[object]),
+                             np.vectorize(_to_int_str, otypes=[object])),
+            ("chunked", lambda a: _format_array(a, '%+f'),
+                        lambda a: _format_array(a, '%d'))]:
+        start = time.time()
+        results[name] = (to_float(coeffs), to_int(references))
+        print("{}: {:.2f}s for {} terms".format(name, time.time() - start, num_terms))
+
+    for expected, actual in zip(*results.values()):
+        assert_array_equal(expected, actual)
+
+
+if __name__ == "__main__":
+    test_str_array()
+    benchmark_str_array()
@@ -0,0 +1,45 @@
+from __future__ import absolute_import
+
+import pypsa
+
+import numpy as np
+
+import os
+
+
+def test_batch_lpf():
+    csv_folder_name = os.path.join(os.path.dirname(__file__), "..", "examples", "ac-dc-meshed", "ac-dc-data")
+
+    network = pypsa.Network(csv_folder_name)
+
+    network.lpf()
+    results = {("buses_t", "v_ang"): network.buses_t.v_ang.copy(),
+               ("buses_t", "p"): network.buses_t.p.copy(),
+               ("generators_t", "p"): network.generators_t.p.copy(),
+               ("lines_t", "p0"): network.lines_t.p0.copy(),
+               ("lines_t", "p1"): network.lines_t.p1.copy(),
+               ("links_t", "p0"): network.links_t.p0.copy()}
+
+    network.batch_lpf()
+
+    for (pnl, attr), df in results.items():
+        np.testing.assert_array_almost_equal(df, getattr(network, pnl)[attr].loc[:, df.columns])
+
+    #the factorizations are reused while the branch parameters do not change
+    sub_networks = [sn for sn in network.sub_networks.obj if len(sn.branches_i()) > 0]
+    factorizations = {sn.name: sn._B_lu[2] for sn in sub_networks}
+
+    network.loads_t.p_set *= 1.1
+    network.batch_lpf(skip_pre=True)
+    lines_p0 = network.lines_t.p0.copy()
+
+    for sn in sub_networks:
+        assert sn._B_lu[2] is factorizations[sn.name]
+
+    network.lpf()
+    np.testing.assert_array_almost_equal(lines_p0, network.lines_t.p0)
+    assert not np.allclose(lines_p0, results[("lines_t", "p0")])
+
+
+if __name__ == "__main__":
+    test_batch_lpf()
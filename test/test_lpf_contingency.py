@@ -0,0 +1,39 @@
+from __future__ import absolute_import
+
+import pypsa
+
+import os
+
+import numpy as np
+
+
+def test_lpf_contingency():
+
+    csv_folder_name = os.path.join(os.path.dirname(__file__), "..", "examples",
+                                   "scigrid-de", "scigrid-with-load-gen-trafos")
+
+    network = pypsa.Network(csv_folder_name)
+    snapshots = network.snapshots[:3]
+    branch_outages = network.lines.index[:5]
+
+    p0 = network.lpf_contingency(snapshots, branch_outages=branch_outages, chunksize=2)
+
+    assert p0.shape == (len(snapshots)*len(network.passive_branches()), 1 + len(branch_outages))
+
+    #the stacked frames agree with the single snapshot ones
+    for snapshot in snapshots:
+        p0_snapshot = network.lpf_contingency(snapshot, branch_outages=branch_outages)
+        np.testing.assert_array_almost_equal(p0.loc[snapshot].reindex(p0_snapshot.index),
+                                             p0_snapshot)
+
+    #compare with the power flow of the network without the outaged branch
+    branch = ("Line", branch_outages[0])
+    network.remove("Line", branch_outages[0])
+    network.lpf(snapshots)
+
+    np.testing.assert_array_almost_equal(p0[branch].unstack(0).loc["Line"].reindex(network.lines.index),
+                                         network.lines_t.p0.loc[snapshots].T)
+
+
+if __name__ == "__main__":
+    test_lpf_contingency()
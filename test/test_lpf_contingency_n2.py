@@ -0,0 +1,81 @@
+from __future__ import absolute_import
+
+import pypsa
+
+import os
+
+from pypower.api import case118 as case
+
+import numpy as np
+import pandas as pd
+
+
+def test_multi_bodf():
+
+    network = pypsa.Network()
+    network.import_from_pypower_ppc(case())
+    network.lpf()
+
+    sub_network = network.sub_networks.obj[0]
+    branches_i = sub_network.branches_i()
+
+    outage_sets = [branches_i[[3, 7]], branches_i[[20, 100, 50]], branches_i[[7]]]
+    multi_BODF = sub_network.calculate_multi_BODF(outage_sets)
+
+    assert sub_network.multi_BODF is multi_BODF
+    assert multi_BODF.shape == (len(branches_i), 6)
+
+    p0 = pd.concat({c: network.pnl(c).p0.iloc[0] for c in network.passive_branch_components})
+    p0 = p0.reindex(branches_i).values
+
+    #the single outage agrees with the BODF
+    sub_network.calculate_BODF()
+    np.testing.assert_array_almost_equal(multi_BODF[2].values[:,0], sub_network.BODF[:,7])
+
+    #compare with the power flow of the network without the outaged branches
+    for i, outage_set in enumerate(outage_sets):
+        expected = p0 + multi_BODF[i].values.dot(p0[branches_i.get_indexer(outage_set)])
+
+        n = network.copy()
+        for c, name in outage_set:
+            n.remove(c, name)
+        n.lpf()
+
+        remaining = branches_i.difference(outage_set)
+        p0_after = pd.concat({c: n.pnl(c).p0.iloc[0] for c in n.passive_branch_components})
+        np.testing.assert_array_almost_equal(expected[branches_i.get_indexer(remaining)],
+                                             p0_after.reindex(remaining).values)
+        np.testing.assert_array_almost_equal(expected[branches_i.get_indexer(outage_set)], 0.)
+
+
+def test_lpf_contingency_n2():
+
+    csv_folder_name = os.path.join(os.path.dirname(__file__), "..", "examples",
+                                   "scigrid-de", "scigrid-with-load-gen-trafos")
+
+    network = pypsa.Network(csv_folder_name)
+    snapshots = network.snapshots[:2]
+    branch_outages = network.lines.index[:12]
+
+    full = network.lpf_contingency_n2(snapshots, branch_outages=branch_outages,
+                                      top_k=None, threshold=0.5, prune=False)
+    pruned = network.lpf_contingency_n2(snapshots, branch_outages=branch_outages,
+                                        top_k=None, threshold=0.5, chunksize=7)
+
+    #pruning never drops an overload
+    pd.testing.assert_frame_equal(full, pruned)
+
+    worst = network.lpf_contingency_n2(snapshots, branch_outages=branch_outages,
+                                       top_k=1, threshold=None)
+    pair = worst.iloc[0]
+
+    network.remove("Line", pair.outage_0)
+    network.remove("Line", pair.outage_1)
+    network.lpf(snapshots)
+
+    assert abs(network.pnl(pair.branch_type).p0.at[pair.snapshot, pair.branch] - pair.p0) < 1e-6
+
+
+if __name__ == "__main__":
+    test_multi_bodf()
+    test_lpf_contingency_n2()
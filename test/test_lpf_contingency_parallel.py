@@ -0,0 +1,55 @@
+from __future__ import absolute_import
+
+import pypsa
+
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+def build_network():
+
+    csv_folder_name = os.path.join(os.path.dirname(__file__), "..", "examples",
+                                   "scigrid-de", "scigrid-with-load-gen-trafos")
+
+    return pypsa.Network(csv_folder_name)
+
+
+def test_lpf_contingency_parallel():
+
+    network = build_network()
+    snapshots = network.snapshots[:3]
+    branch_outages = network.lines.index[:10]
+
+    serial = network.lpf_contingency(snapshots, branch_outages=branch_outages)
+
+    parallel = network.lpf_contingency(snapshots, branch_outages=branch_outages, n_jobs=2)
+    np.testing.assert_array_almost_equal(serial, parallel)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        parallel = network.lpf_contingency(snapshots, branch_outages=branch_outages,
+                                           chunksize=4, executor=executor)
+    np.testing.assert_array_almost_equal(serial, parallel)
+
+
+def test_lpf_contingency_screening_parallel():
+
+    network = build_network()
+    snapshots = network.snapshots[:4]
+    branch_outages = network.lines.index[:20]
+
+    serial = network.lpf_contingency_screening(snapshots, branch_outages=branch_outages,
+                                               top_k=3, chunksize=7)
+
+    parallel = network.lpf_contingency_screening(snapshots, branch_outages=branch_outages,
+                                                 top_k=3, chunksize=7, n_jobs=2)
+
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+if __name__ == "__main__":
+    test_lpf_contingency_parallel()
+    test_lpf_contingency_screening_parallel()
@@ -0,0 +1,42 @@
+from __future__ import absolute_import
+
+import pypsa
+
+import os
+
+import numpy as np
+
+
+def test_lpf_contingency_screening():
+
+    csv_folder_name = os.path.join(os.path.dirname(__file__), "..", "examples",
+                                   "scigrid-de", "scigrid-with-load-gen-trafos")
+
+    network = pypsa.Network(csv_folder_name)
+    snapshots = network.snapshots[:4]
+    branch_outages = network.lines.index[:20]
+
+    p0 = network.lpf_contingency(snapshots, branch_outages=branch_outages)
+    s_nom = network.passive_branches().s_nom
+    loading = abs(p0.drop(columns="base")).divide(s_nom.reindex(p0.index.droplevel(0)).values, axis=0)
+
+    top = network.lpf_contingency_screening(snapshots, branch_outages=branch_outages,
+                                            top_k=3, chunksize=7)
+
+    assert len(top) == 3*len(snapshots)*len(branch_outages)
+
+    for snapshot in snapshots:
+        for i, outage in enumerate(branch_outages):
+            worst = top[(top.snapshot == snapshot) & (top.outage == outage)]
+            expected = loading.loc[snapshot].iloc[:,i].sort_values(ascending=False)
+            np.testing.assert_array_almost_equal(worst.loading, expected.iloc[:3])
+
+    overloads = network.lpf_contingency_screening(snapshots, branch_outages=branch_outages,
+                                                  top_k=None, threshold=0.8)
+
+    assert len(overloads) == (loading >= 0.8).values.sum()
+    assert (overloads.loading >= 0.8).all()
+
+
+if __name__ == "__main__":
+    test_lpf_contingency_screening()
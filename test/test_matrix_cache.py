@@ -0,0 +1,88 @@
+from __future__ import absolute_import
+
+import pypsa
+
+from pypower.api import case30 as case
+
+import pandas as pd
+import numpy as np
+from collections import Counter
+
+
+def test_matrix_cache():
+
+    network = pypsa.Network()
+    network.import_from_pypower_ppc(case())
+    network.set_snapshots(pd.RangeIndex(2))
+
+    cache = network.matrix_cache
+
+    network.pf()
+    v_ang = network.buses_t.v_ang.copy()
+    Y = network.sub_networks.obj[0].Y
+    jacobian_solver = network.sub_networks.obj[0]._jacobian_solver
+
+    assert cache.misses["Y"] == 1 and cache.hits["Y"] == 0
+
+    #the matrices and factorizations survive the rebuilt sub-networks
+    network.pf()
+
+    assert cache.hits["Y"] == 1 and cache.hits["dependent_values"] >= 1
+    assert network.sub_networks.obj[0].Y is Y
+    assert network.sub_networks.obj[0]._jacobian_solver is jacobian_solver
+    np.testing.assert_array_almost_equal(v_ang, network.buses_t.v_ang)
+
+    #a change of a relevant input invalidates the cache
+    x = network.lines.x.copy()
+    network.lines.x *= 1.2
+    network.pf()
+
+    assert cache.misses["Y"] == 2
+    assert network.sub_networks.obj[0].Y is not Y
+    assert not np.allclose(v_ang, network.buses_t.v_ang)
+
+    network.lines.x = x
+    network.pf()
+
+    assert cache.hits["Y"] == 2
+    np.testing.assert_array_almost_equal(v_ang, network.buses_t.v_ang)
+
+
+def test_matrix_cache_ptdf():
+
+    network = pypsa.Network()
+    network.import_from_pypower_ppc(case())
+
+    network.lpf()
+    sub_network = network.sub_networks.obj[0]
+    sub_network.calculate_PTDF()
+    PTDF = sub_network.PTDF
+
+    sub_network.calculate_PTDF()
+
+    assert network.matrix_cache.hits["PTDF"] == 1
+    assert sub_network.PTDF is PTDF
+
+    #the resistance does not enter the PTDF of an AC sub-network
+    network.lines.loc[network.lines.index[0], "r"] *= 2
+    sub_network.calculate_PTDF()
+
+    assert network.matrix_cache.hits["PTDF"] == 2
+    assert sub_network.PTDF is PTDF
+
+    #checking the cached B and H for the PTDF is not counted as a lookup
+    hits, misses = network.matrix_cache.hits.copy(), network.matrix_cache.misses.copy()
+    sub_network.calculate_PTDF(skip_pre=True)
+    assert network.matrix_cache.hits - hits == Counter({"PTDF": 1})
+    assert network.matrix_cache.misses == misses
+
+    network.lines.loc[network.lines.index[0], "x"] *= 2
+    sub_network.calculate_PTDF()
+
+    assert network.matrix_cache.misses["PTDF"] == 2
+    assert not np.allclose(PTDF, sub_network.PTDF)
+
+
+if __name__ == "__main__":
+    test_matrix_cache()
+    test_matrix_cache_ptdf()
@@ -0,0 +1,45 @@
+from __future__ import absolute_import
+
+import pypsa
+
+from pypower.api import case118 as case
+
+import numpy as np
+
+
+def test_partial_bodf():
+
+    network = pypsa.Network()
+    network.import_from_pypower_ppc(case())
+    network.determine_network_topology()
+
+    sub_network = network.sub_networks.obj[0]
+    sub_network.calculate_BODF()
+    branches_i = sub_network.branches_i()
+
+    #outages of branches which do not split the sub-network
+    outages = [3, 7, 100, 20]
+    monitored = [7, 1, 50, 3, 60]
+    expected = sub_network.BODF[np.ix_(monitored, outages)]
+
+    BODF = sub_network.calculate_partial_BODF(branch_outages=branches_i[outages],
+                                              monitored_branches=branches_i[monitored],
+                                              chunksize=3)
+
+    assert BODF.index.equals(branches_i[monitored])
+    assert BODF.columns.equals(branches_i[outages])
+    assert sub_network.partial_BODF is BODF
+    np.testing.assert_array_almost_equal(BODF.values, expected)
+    assert BODF.at[branches_i[7], branches_i[7]] == -1
+
+    #small factors are dropped
+    tolerance = 0.05
+    sparse = sub_network.calculate_partial_BODF(branch_outages=branches_i[outages],
+                                                tolerance=tolerance)
+    full = sub_network.BODF[:,outages]
+    np.testing.assert_array_almost_equal(sparse.sparse.to_dense().values,
+                                         np.where(abs(full) < tolerance, 0., full))
+
+
+if __name__ == "__main__":
+    test_partial_bodf()
@@ -0,0 +1,66 @@
+from __future__ import absolute_import
+
+import pypsa
+
+from pypower.api import case30 as case
+
+import pandas as pd
+import numpy as np
+
+
+def build_network(num_snapshots=6):
+
+    network = pypsa.Network()
+    network.import_from_pypower_ppc(case())
+    network.set_snapshots(pd.RangeIndex(num_snapshots))
+
+    #vary the load and the dispatch over the snapshots
+    scale = 1 + 0.1*np.sin(np.arange(num_snapshots))
+    network.loads_t.p_set = pd.DataFrame(np.outer(scale, network.loads.p_set),
+                                         network.snapshots, network.loads.index)
+    network.loads_t.q_set = pd.DataFrame(np.outer(scale, network.loads.q_set),
+                                         network.snapshots, network.loads.index)
+    network.generators_t.p_set = pd.DataFrame(np.outer(scale, network.generators.p_set),
+                                              network.snapshots, network.generators.index)
+
+    return network
+
+
+def test_pf_batch():
+
+    network = build_network()
+
+    serial = network.pf()
+    v_mag_pu = network.buses_t.v_mag_pu.copy()
+    v_ang = network.buses_t.v_ang.copy()
+    generators_q = network.generators_t.q.copy()
+    lines_p0 = network.lines_t.p0.copy()
+
+    batch = network.pf(batch=True)
+
+    assert batch.converged.all().all()
+    np.testing.assert_array_equal(serial.n_iter, batch.n_iter)
+
+    np.testing.assert_array_almost_equal(v_mag_pu, network.buses_t.v_mag_pu)
+    np.testing.assert_array_almost_equal(v_ang, network.buses_t.v_ang)
+    np.testing.assert_array_almost_equal(generators_q, network.generators_t.q)
+    np.testing.assert_array_almost_equal(lines_p0, network.lines_t.p0)
+
+
+def test_pf_batch_distributed_slack():
+
+    network = build_network()
+
+    network.pf(distribute_slack=True, slack_weights='p_nom')
+    generators_p = network.generators_t.p.copy()
+    v_ang = network.buses_t.v_ang.copy()
+
+    network.pf(batch=True, distribute_slack=True, slack_weights='p_nom')
+
+    np.testing.assert_array_almost_equal(generators_p, network.generators_t.p)
+    np.testing.assert_array_almost_equal(v_ang, network.buses_t.v_ang)
+
+
+if __name__ == "__main__":
+    test_pf_batch()
+    test_pf_batch_distributed_slack()
@@ -0,0 +1,65 @@
+from __future__ import absolute_import
+
+import pypsa
+
+from pypower.api import case30 as case
+
+import pandas as pd
+import numpy as np
+
+
+def build_network(num_snapshots=7):
+
+    network = pypsa.Network()
+    network.import_from_pypower_ppc(case())
+    network.set_snapshots(pd.RangeIndex(num_snapshots))
+
+    #vary the load and the dispatch over the snapshots
+    scale = 1 + 0.1*np.sin(np.arange(num_snapshots))
+    network.loads_t.p_set = pd.DataFrame(np.outer(scale, network.loads.p_set),
+                                         network.snapshots, network.loads.index)
+    network.generators_t.p_set = pd.DataFrame(np.outer(scale, network.generators.p_set),
+                                              network.snapshots, network.generators.index)
+
+    return network
+
+
+def test_pf_chunksize():
+
+    network = build_network()
+
+    full = network.pf()
+    v_mag_pu = network.buses_t.v_mag_pu.copy()
+    v_ang = network.buses_t.v_ang.copy()
+    lines_q0 = network.lines_t.q0.copy()
+
+    windows = []
+    def sink(network, snapshots):
+        windows.append(network.buses_t.v_ang.loc[snapshots].copy())
+
+    chunked = network.pf(chunksize=3, sink=sink)
+
+    assert [len(w) for w in windows] == [3, 3, 1]
+    pd.testing.assert_frame_equal(full.n_iter, chunked.n_iter)
+    np.testing.assert_array_almost_equal(v_ang, pd.concat(windows))
+    np.testing.assert_array_almost_equal(v_mag_pu, network.buses_t.v_mag_pu)
+    np.testing.assert_array_almost_equal(lines_q0, network.lines_t.q0)
+
+
+def test_lpf_chunksize():
+
+    network = build_network()
+
+    network.lpf()
+    lines_p0 = network.lines_t.p0.copy()
+
+    windows = []
+    network.lpf(chunksize=2, sink=lambda network, snapshots: windows.append(snapshots))
+
+    assert len(windows) == 4
+    np.testing.assert_array_almost_equal(lines_p0, network.lines_t.p0)
+
+
+if __name__ == "__main__":
+    test_pf_chunksize()
+    test_lpf_chunksize()
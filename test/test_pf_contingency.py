@@ -0,0 +1,69 @@
+from __future__ import absolute_import
+
+import pypsa
+
+from pypower.api import case30 as case
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+
+def build_network():
+
+    network = pypsa.Network()
+    network.import_from_pypower_ppc(case())
+    network.set_snapshots(pd.RangeIndex(3))
+
+    #vary the load over the snapshots
+    scale = 1 + 0.1*np.arange(3)
+    network.loads_t.p_set = pd.DataFrame(np.outer(scale, network.loads.p_set),
+                                         network.snapshots, network.loads.index)
+    network.loads_t.q_set = pd.DataFrame(np.outer(scale, network.loads.q_set),
+                                         network.snapshots, network.loads.index)
+
+    return network
+
+
+def test_pf_contingency():
+
+    network = build_network()
+    branch_outages = [("Line", name) for name in network.lines.index[:12]]
+
+    results = network.pf_contingency(branch_outages=branch_outages)
+
+    assert results.converged.shape == (len(network.snapshots), len(branch_outages))
+
+    for branch in branch_outages:
+        n = network.copy()
+        n.remove(*branch)
+        n.determine_network_topology()
+
+        assert results.islanded[branch] == (len(n.sub_networks) > 1)
+        if results.islanded[branch]:
+            continue
+
+        assert results.converged[branch].all()
+
+        #compare with the power flow of the network without the outaged branch
+        n.pf()
+        loading = pd.concat([np.maximum(abs(n.pnl(c).p0 + 1j*n.pnl(c).q0),
+                                        abs(n.pnl(c).p1 + 1j*n.pnl(c).q1))/n.df(c).s_nom
+                             for c in n.passive_branch_components], axis=1)
+        np.testing.assert_array_almost_equal(results.max_loading[branch], loading.max(axis=1))
+
+        overloaded = results.violations[(results.violations.outage == branch[1]) &
+                                        (results.violations.kind == "loading")]
+        assert len(overloaded) == (loading > 1).values.sum()
+
+    #the same results in parallel
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        parallel = network.pf_contingency(branch_outages=branch_outages, executor=executor)
+
+    pd.testing.assert_frame_equal(results.converged, parallel.converged)
+    np.testing.assert_array_almost_equal(results.max_loading, parallel.max_loading)
+
+
+if __name__ == "__main__":
+    test_pf_contingency()
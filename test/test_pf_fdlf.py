@@ -0,0 +1,77 @@
+from __future__ import absolute_import
+
+import pypsa
+
+from pypower.api import case118 as case
+
+import pandas as pd
+import numpy as np
+
+
+def build_network(num_snapshots=4):
+
+    network = pypsa.Network()
+    network.import_from_pypower_ppc(case())
+    network.set_snapshots(pd.RangeIndex(num_snapshots))
+
+    #vary the load and the dispatch over the snapshots
+    scale = 1 + 0.1*np.sin(np.arange(num_snapshots))
+    network.loads_t.p_set = pd.DataFrame(np.outer(scale, network.loads.p_set),
+                                         network.snapshots, network.loads.index)
+    network.loads_t.q_set = pd.DataFrame(np.outer(scale, network.loads.q_set),
+                                         network.snapshots, network.loads.index)
+    network.generators_t.p_set = pd.DataFrame(np.outer(scale, network.generators.p_set),
+                                              network.snapshots, network.generators.index)
+
+    return network
+
+
+def test_pf_fdlf():
+
+    network = build_network()
+
+    network.pf()
+    v_mag_pu = network.buses_t.v_mag_pu.copy()
+    v_ang = network.buses_t.v_ang.copy()
+    generators_q = network.generators_t.q.copy()
+
+    for variant in ['XB', 'BX']:
+        fdlf = network.pf(method='fdlf', fdlf_variant=variant)
+
+        assert fdlf.converged.all().all()
+
+        np.testing.assert_array_almost_equal(v_mag_pu, network.buses_t.v_mag_pu, decimal=5)
+        np.testing.assert_array_almost_equal(v_ang, network.buses_t.v_ang, decimal=5)
+        np.testing.assert_array_almost_equal(generators_q, network.generators_t.q, decimal=3)
+
+
+def test_pf_fdlf_fallback():
+
+    network = build_network()
+    network.determine_network_topology()
+
+    sub_network = network.sub_networks.obj.iloc[0]
+    sub_network.calculate_B_fdlf()
+    assert sub_network.B_p.shape == (len(sub_network.pvpqs), len(sub_network.pvpqs))
+    assert sub_network.B_pp.shape == (len(sub_network.pqs), len(sub_network.pqs))
+
+    newton = network.pf()
+    v_ang = network.buses_t.v_ang.copy()
+
+    #allow too few iterations for the fast-decoupled power flow, so
+    #that all snapshots are solved again with Newton-Raphson
+    fast_decoupled_pf = pypsa.pf.fast_decoupled_pf
+    pypsa.pf.fast_decoupled_pf = lambda *args, **kwargs: fast_decoupled_pf(*args, lim_iter=2, **kwargs)
+    try:
+        fdlf = network.pf(method='fdlf')
+    finally:
+        pypsa.pf.fast_decoupled_pf = fast_decoupled_pf
+
+    assert fdlf.converged.all().all()
+    np.testing.assert_array_equal(fdlf.n_iter, newton.n_iter + 2)
+    np.testing.assert_array_almost_equal(v_ang, network.buses_t.v_ang)
+
+
+if __name__ == "__main__":
+    test_pf_fdlf()
+    test_pf_fdlf_fallback()
@@ -0,0 +1,106 @@
+from __future__ import absolute_import
+
+import pypsa
+
+from pypower.api import case118 as case
+
+import pandas as pd
+import numpy as np
+import scipy.sparse
+
+
+def test_pf_jacobian_reuse():
+
+    network = pypsa.Network()
+    network.import_from_pypower_ppc(case())
+    network.set_snapshots(pd.RangeIndex(4))
+
+    honest = network.pf()
+    v_mag_pu = network.buses_t.v_mag_pu.copy()
+    v_ang = network.buses_t.v_ang.copy()
+
+    sub_network = network.sub_networks.obj[0]
+    jacobian_solver = sub_network._jacobian_solver
+
+    #the ordering is computed once and reused for all snapshots
+    assert jacobian_solver.n_analyses == 1
+    assert jacobian_solver.n_factorizations == honest.n_iter.values.sum()
+
+    dishonest = network.pf(skip_pre=True, reuse_jacobian=2)
+
+    assert dishonest.converged.all().all()
+    assert jacobian_solver.n_analyses == 1
+    assert jacobian_solver.n_factorizations - honest.n_iter.values.sum() < dishonest.n_iter.values.sum()
+
+    np.testing.assert_array_almost_equal(v_mag_pu, network.buses_t.v_mag_pu)
+    np.testing.assert_array_almost_equal(v_ang, network.buses_t.v_ang)
+
+
+def test_pf_jacobian_structure():
+
+    network = pypsa.Network()
+    network.import_from_pypower_ppc(case())
+    network.pf()
+
+    sub_network = network.sub_networks.obj[0]
+    Y = sub_network.Y
+    num_pvs = len(sub_network.pvs)
+    num_buses = len(sub_network.buses_o)
+
+    np.random.seed(0)
+    v_mag_pu = 1 + 0.05*np.random.randn(1, num_buses)
+    v_ang = 0.1*np.random.randn(1, num_buses)
+    s = np.random.randn(1, num_buses) + 1j*np.random.randn(1, num_buses)
+    slack_weights = np.random.rand(num_buses)
+
+    #compare the Jacobian filled into the fixed structure with central differences
+    for distribute_slack in [False, True]:
+        jacobian = pypsa.pf.PowerFlowJacobian(Y, num_pvs, distribute_slack)
+        x = np.hstack((v_ang[:,1:], v_mag_pu[:,1+num_pvs:], np.ones((1, int(distribute_slack)))))
+
+        def f(x):
+            V = pypsa.pf._pf_voltages(x, v_mag_pu, v_ang, num_pvs)
+            if distribute_slack:
+                return pypsa.pf._pf_mismatch(Y, V, s, num_pvs, slack_weights, x[:,-1])[0]
+            else:
+                return pypsa.pf._pf_mismatch(Y, V, s, num_pvs)[0]
+
+        V = pypsa.pf._pf_voltages(x, v_mag_pu, v_ang, num_pvs)
+        J = jacobian(V, slack_weights if distribute_slack else None).toarray()
+
+        eps = 1e-6
+        J_fd = np.column_stack([(f(x + eps*e) - f(x - eps*e))/(2*eps)
+                                for e in np.eye(x.shape[1])[:,np.newaxis]])
+
+        np.testing.assert_allclose(J, J_fd, rtol=1e-5, atol=1e-4)
+
+        #the structure of several snapshots is block-diagonal
+        J2 = jacobian(np.vstack((V, V)), slack_weights if distribute_slack else None)
+        assert J2.shape == (2*J.shape[0], 2*J.shape[1])
+        np.testing.assert_array_almost_equal(J2.toarray()[J.shape[0]:,J.shape[1]:], J)
+
+
+def test_jacobian_solver():
+
+    np.random.seed(0)
+    size = 30
+    pattern = (np.random.rand(size, size) < 0.1) | np.eye(size, dtype=bool)
+    jacobian_solver = pypsa.pf.JacobianSolver()
+
+    #refactorizations with the same pattern gather the entries
+    for num_blocks in [1, 1, 3, 3]:
+        blocks = [np.where(pattern, np.random.randn(size, size), 0.) + 5*np.eye(size)
+                  for k in range(num_blocks)]
+        J = scipy.sparse.block_diag(blocks, format="csr")
+        b = np.random.randn(J.shape[0])
+        jacobian_solver.factorize(J, num_blocks=num_blocks)
+        np.testing.assert_array_almost_equal(J.dot(jacobian_solver.solve(b)), b)
+
+    assert jacobian_solver.n_analyses == 1
+    assert jacobian_solver.n_factorizations == 4
+
+
+if __name__ == "__main__":
+    test_pf_jacobian_reuse()
+    test_pf_jacobian_structure()
+    test_jacobian_solver()
@@ -0,0 +1,72 @@
+from __future__ import absolute_import
+
+import pypsa
+
+from pypower.api import case30 as case
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+
+def build_network(num_snapshots=6):
+
+    network = pypsa.Network()
+    network.import_from_pypower_ppc(case())
+    network.set_snapshots(pd.RangeIndex(num_snapshots))
+
+    #vary the load and the dispatch over the snapshots
+    scale = 1 + 0.1*np.sin(np.arange(num_snapshots))
+    network.loads_t.p_set = pd.DataFrame(np.outer(scale, network.loads.p_set),
+                                         network.snapshots, network.loads.index)
+    network.loads_t.q_set = pd.DataFrame(np.outer(scale, network.loads.q_set),
+                                         network.snapshots, network.loads.index)
+    network.generators_t.p_set = pd.DataFrame(np.outer(scale, network.generators.p_set),
+                                              network.snapshots, network.generators.index)
+
+    return network
+
+
+def test_pf_parallel():
+
+    network = build_network()
+
+    for kwargs in [{}, {'distribute_slack': True}]:
+        serial = network.pf(**kwargs)
+        v_mag_pu = network.buses_t.v_mag_pu.copy()
+        v_ang = network.buses_t.v_ang.copy()
+        generators_p = network.generators_t.p.copy()
+        generators_q = network.generators_t.q.copy()
+        lines_p0 = network.lines_t.p0.copy()
+
+        parallel = network.pf(n_jobs=2, **kwargs)
+
+        assert parallel.converged.all().all()
+        np.testing.assert_array_equal(serial.n_iter, parallel.n_iter)
+
+        np.testing.assert_array_almost_equal(v_mag_pu, network.buses_t.v_mag_pu)
+        np.testing.assert_array_almost_equal(v_ang, network.buses_t.v_ang)
+        np.testing.assert_array_almost_equal(generators_p, network.generators_t.p)
+        np.testing.assert_array_almost_equal(generators_q, network.generators_t.q)
+        np.testing.assert_array_almost_equal(lines_p0, network.lines_t.p0)
+
+
+def test_lpf_parallel():
+
+    network = build_network()
+
+    network.lpf()
+    v_ang = network.buses_t.v_ang.copy()
+    lines_p0 = network.lines_t.p0.copy()
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        network.lpf(executor=executor)
+
+    np.testing.assert_array_almost_equal(v_ang, network.buses_t.v_ang)
+    np.testing.assert_array_almost_equal(lines_p0, network.lines_t.p0)
+
+
+if __name__ == "__main__":
+    test_pf_parallel()
+    test_lpf_parallel()
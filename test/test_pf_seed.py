@@ -0,0 +1,41 @@
+from __future__ import absolute_import
+
+import pypsa
+
+from pypower.api import case118 as case
+
+import pandas as pd
+import numpy as np
+
+
+def test_pf_seed_previous():
+
+    network = pypsa.Network()
+    network.import_from_pypower_ppc(case())
+    network.set_snapshots(pd.RangeIndex(12))
+
+    #slowly varying load as in a chronological time series
+    scale = 1 + 0.05*np.sin(np.arange(12)/4.)
+    network.loads_t.p_set = pd.DataFrame(np.outer(scale, network.loads.p_set),
+                                         network.snapshots, network.loads.index)
+    network.generators_t.p_set = pd.DataFrame(np.outer(scale, network.generators.p_set),
+                                              network.snapshots, network.generators.index)
+
+    flat = network.pf()
+    v_mag_pu = network.buses_t.v_mag_pu.copy()
+    v_ang = network.buses_t.v_ang.copy()
+
+    seeded = network.pf(use_seed='previous')
+
+    assert seeded.converged.all().all()
+    assert not seeded.seeded.iloc[0].any()
+    assert seeded.seeded.iloc[1:].all().all()
+    assert seeded.n_iter.values.sum() < flat.n_iter.values.sum()
+    assert (seeded.n_iter_saved > 0).all()
+
+    np.testing.assert_array_almost_equal(v_mag_pu, network.buses_t.v_mag_pu)
+    np.testing.assert_array_almost_equal(v_ang, network.buses_t.v_ang)
+
+
+if __name__ == "__main__":
+    test_pf_seed_previous()
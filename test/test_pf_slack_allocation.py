@@ -0,0 +1,87 @@
+from __future__ import absolute_import
+
+import pypsa
+from pypsa.descriptors import get_switchable_as_dense
+
+from pypower.api import case30 as case
+
+import pandas as pd
+import numpy as np
+
+
+def normed(s): return s/s.sum()
+
+
+def build_network(num_snapshots=3):
+
+    network = pypsa.Network()
+    network.import_from_pypower_ppc(case())
+    network.set_snapshots(pd.RangeIndex(num_snapshots))
+
+    scale = 1 + 0.1*np.sin(np.arange(num_snapshots))
+    network.loads_t.p_set = pd.DataFrame(np.outer(scale, network.loads.p_set),
+                                         network.snapshots, network.loads.index)
+
+    #several generators at the same buses
+    for bus in network.generators.bus.iloc[:3]:
+        network.add("Generator", "extra " + bus, bus=bus, p_nom=50., p_set=10., control="PQ")
+
+    #a single-bus sub-network
+    network.add("Bus", "island")
+    network.add("Load", "island load", bus="island", p_set=30.)
+    network.add("Generator", "island slack", bus="island", p_nom=20., p_set=10., control="Slack")
+    network.add("Generator", "island other", bus="island", p_nom=60., p_set=5.)
+
+    network.determine_network_topology()
+
+    return network
+
+
+def test_pf_slack_allocation_generator_weights():
+
+    network = build_network()
+
+    weights = pd.Series(1. + np.arange(len(network.generators)) % 3, network.generators.index)
+    sub_network = network.generators.bus.map(network.buses.sub_network)
+    slack_weights = {sn: weights[sub_network == sn].to_dict() for sn in network.sub_networks.index}
+
+    network.pf(distribute_slack=True, slack_weights=slack_weights)
+
+    p_set = get_switchable_as_dense(network, 'Generator', 'p_set')
+    slack = network.generators_t.p - p_set
+
+    #the slack is distributed to all generators in proportion to their weights
+    for sn in network.sub_networks.index:
+        gens = weights.index[sub_network == sn]
+        for snapshot in network.snapshots:
+            np.testing.assert_array_almost_equal(normed(slack.loc[snapshot, gens]), normed(weights[gens]))
+
+
+def test_pf_slack_allocation_p_nom():
+
+    network = build_network()
+
+    #a bus with generators without nominal power distributes evenly
+    bus = network.generators.bus.iloc[0]
+    gens = network.generators.index[network.generators.bus == bus]
+    network.generators.loc[gens, "p_nom"] = 0.
+
+    sn = network.buses.at[bus, "sub_network"]
+    network.pf(distribute_slack=True, slack_weights={sn: {bus: 1.}, "1": "p_nom"})
+
+    p_set = get_switchable_as_dense(network, 'Generator', 'p_set')
+    slack = network.generators_t.p - p_set
+
+    np.testing.assert_array_almost_equal(slack.loc[:, gens].values,
+                                         slack.loc[:, gens[[0]]].values.repeat(len(gens), axis=1))
+    assert (slack.loc[:, gens].abs() > 0).all().all()
+
+    island = ["island slack", "island other"]
+    for snapshot in network.snapshots:
+        np.testing.assert_array_almost_equal(normed(slack.loc[snapshot, island]),
+                                             normed(network.generators.p_nom[island]))
+
+
+if __name__ == "__main__":
+    test_pf_slack_allocation_generator_weights()
+    test_pf_slack_allocation_p_nom()
@@ -43,5 +43,67 @@ def test_sclopf():
     np.testing.assert_array_almost_equal(max_loading,np.ones((len(max_loading))))
 
 
+def test_sclopf_iterative():
+    csv_folder_name = os.path.join(os.path.dirname(__file__), "..", "examples",
+                                   "scigrid-de", "scigrid-with-load-gen-trafos")
+
+    def load_network():
+        network = pypsa.Network(csv_folder_name)
+        for line_name in ["316","527","602"]:
+            network.lines.loc[line_name,"s_nom"] = 1200
+        return network
+
+    reference = load_network()
+    branch_outages = reference.lines.index[:3]
+    reference.sclopf(reference.snapshots[0],branch_outages=branch_outages,solver_name=solver_name)
+
+    #the iterative SCLOPF prepares a freshly loaded network itself
+    network = load_network()
+    rounds = network.sclopf(network.snapshots[0],branch_outages=branch_outages,solver_name=solver_name,
+                            iterative=True)
+
+    #constraints were only added while there were violations
+    assert rounds.violations.iloc[-1] == 0
+    assert rounds.constraints.iloc[-1] == 0
+    np.testing.assert_almost_equal(network.objective, reference.objective, decimal=2)
+
+    network.generators_t.p_set = network.generators_t.p.copy()
+    network.generators.loc[:,'p_set_t'] = True
+    network.storage_units_t.p_set = network.storage_units_t.p.copy()
+    network.storage_units.loc[:,'p_set_t'] = True
+
+    p0_test = network.lpf_contingency(network.snapshots[0],branch_outages=branch_outages)
+    max_loading = abs(p0_test.divide(network.passive_branches().s_nom,axis=0)).max()
+
+    assert (max_loading <= 1 + 1e-5).all()
+
+
+def test_sclopf_linopf():
+    csv_folder_name = os.path.join(os.path.dirname(__file__), "..", "examples",
+                                   "scigrid-de", "scigrid-with-load-gen-trafos")
+
+    network = pypsa.Network(csv_folder_name)
+
+    for line_name in ["316","527","602"]:
+        network.lines.loc[line_name,"s_nom"] = 1200
+
+    branch_outages = network.lines.index[:3]
+
+    for extendable in [False, True]:
+        #the extendable case with costly extensions of the lines above
+        network.lines.loc[["316","527","602"], "s_nom_extendable"] = extendable
+        network.lines.loc[["316","527","602"], "capital_cost"] = 1e3
+
+        network.sclopf(network.snapshots[0],branch_outages=branch_outages,solver_name=solver_name)
+        objective = network.objective
+
+        network.sclopf(network.snapshots[0],branch_outages=branch_outages,solver_name=solver_name,
+                       pyomo=False)
+
+        np.testing.assert_almost_equal(network.objective, reference.objective, decimal=2)
+
+
 if __name__ == "__main__":
     test_sclopf()
+    test_sclopf_iterative()
+    test_sclopf_linopf()
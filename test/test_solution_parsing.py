@@ -0,0 +1,34 @@
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from pypsa.linopt import read_cbc_solution, read_glpk_table, glpk_to_float
+
+
+def test_read_cbc_solution():
+
+    data = (b"      0 c1                    10                 1.5\n"
+            b"      1 c3                     0                  -2\n"
+            b"      0 x1                     5                   0\n"
+            b"**    1 x2                -1e-07               0.125\n"
+            b"      2 x4                 2.5e+03                 0\n")
+    variables_sol, constraints_dual = read_cbc_solution(data, 6, 4)
+
+    assert_array_equal(variables_sol, [np.nan, 5, -1e-7, np.nan, 2500, np.nan])
+    assert_array_equal(constraints_dual, [np.nan, 1.5, np.nan, -2])
+
+
+def test_read_glpk_table():
+
+    header = ("   No.   Row name   St   Activity     Lower bound   Upper bound    Marginal\n"
+              "------ ------------ -- ------------- ------------- ------------- -------------\n")
+    lines = ["{:6d} {:<12} {} {:13.6g} {:>13} {:>13} {:>13}".format(*l).rstrip()
+             for l in [(1, "c1", "NS", 10, "10", "=", "1.5"),
+                       (2, "c2", "B ", 3, "", "5", ""),
+                       (3, "c10", "NU", 5, "", "5", "< eps")]]
+    table = read_glpk_table((header + "\n".join(lines)).encode())
+
+    assert_array_equal(np.char.lstrip(table["Row name"], b"c").astype(int),
+                       [1, 2, 10])
+    assert_array_equal(glpk_to_float(table["Activity"]), [10, 3, 5])
+    assert_array_equal(glpk_to_float(table["Marginal"]), [1.5, 0, 0])
+    assert_array_equal(glpk_to_float(table["Upper bound"]), [0, 5, 5])
@@ -0,0 +1,106 @@
+from __future__ import absolute_import
+
+import pypsa
+
+from pypower.api import case118 as case
+
+import numpy as np
+import pandas as pd
+
+
+def susceptances(sub_network):
+    return 1./np.concatenate([c.df.loc[c.ind, "x_pu_eff"].values
+                              for c in sub_network.iterate_components(sub_network.network.passive_branch_components)])
+
+
+def reference_PTDF(sub_network, b):
+    K = sub_network.K.toarray()
+    H = b[:,np.newaxis]*K.T
+    PTDF = np.zeros(H.shape)
+    PTDF[:,1:] = H[:,1:].dot(np.linalg.inv(K.dot(H)[1:,1:]))
+    return PTDF
+
+
+def test_update_ptdf():
+
+    network = pypsa.Network()
+    network.import_from_pypower_ppc(case())
+    network.determine_network_topology()
+
+    sub_network = network.sub_networks.obj[0]
+    sub_network.calculate_BODF()
+
+    #rescale x of a few lines in the network data as in ilopf
+    lines = network.lines.index[[3, 10, 42]]
+    network.lines.loc[lines, "x"] /= [1.5, 2., 3.]
+    sub_network.update_PTDF()
+
+    assert isinstance(sub_network._B_lu[2], pypsa.pf._WoodburyLU)
+
+    np.testing.assert_array_almost_equal(sub_network.PTDF, reference_PTDF(sub_network, susceptances(sub_network)))
+    BODF = sub_network.BODF
+    sub_network.calculate_BODF(skip_pre=True)
+    np.testing.assert_array_almost_equal(BODF, sub_network.BODF)
+
+    #the updated matrices are cached for the network data
+    PTDF = sub_network.PTDF
+    sub_network.calculate_PTDF()
+    assert sub_network.PTDF is PTDF
+
+    #the updated factorization solves the linear power flow
+    network.lpf()
+    p = network.buses_t.p.loc["now", sub_network.buses_o].values
+    flows = pd.Series(PTDF.dot(p), sub_network.branches_i())
+    np.testing.assert_array_almost_equal(network.lines_t.p0.loc["now"],
+                                         flows["Line"].loc[network.lines.index])
+
+    #the state of the updates is kept by the new sub-networks of lpf
+    sub_network = network.sub_networks.obj[0]
+    sub_network.calculate_PTDF()
+    assert sub_network.PTDF is PTDF
+
+    #remove a branch which does not split the sub-network and add it back
+    branch_PTDF = sub_network.PTDF.dot(sub_network.K.toarray())
+    removed = np.flatnonzero(np.diag(branch_PTDF) < 1 - 1e-6)[:2]
+    b = np.asarray(sub_network.H.multiply(sub_network.K.T).sum(axis=1)).ravel()/2.
+    b_removed = b.copy()
+    b_removed[removed] = 0.
+    sub_network.update_PTDF(branches=removed, b=0.)
+    np.testing.assert_array_almost_equal(sub_network.PTDF, reference_PTDF(sub_network, b_removed))
+    assert abs(sub_network.PTDF[removed]).max() < 1e-10
+
+    sub_network.update_PTDF()
+    np.testing.assert_array_almost_equal(sub_network.PTDF, reference_PTDF(sub_network, b))
+
+    #a full rebuild beyond max_updates
+    network.lines.loc[network.lines.index[:10], "x"] *= 1.1
+    sub_network.update_PTDF(max_updates=5)
+    assert sub_network._PTDF_update is None
+    np.testing.assert_array_almost_equal(sub_network.PTDF, reference_PTDF(sub_network, susceptances(sub_network)))
+
+
+def test_update_ptdf_after_calculate_ptdf():
+
+    network = pypsa.Network()
+    network.import_from_pypower_ppc(case())
+    network.determine_network_topology()
+    sub_network = network.sub_networks.obj[0]
+
+    #an update without PTDF, then the PTDF and BODF are calculated
+    network.lines.loc[network.lines.index[3], "x"] /= 2.
+    sub_network.update_PTDF()
+    sub_network.calculate_PTDF()
+    sub_network.calculate_BODF(skip_pre=True)
+
+    #the next update starts from the calculated PTDF
+    network.lines.loc[network.lines.index[10], "x"] /= 3.
+    sub_network.update_PTDF()
+    np.testing.assert_array_almost_equal(sub_network.PTDF, reference_PTDF(sub_network, susceptances(sub_network)))
+    BODF = sub_network.BODF
+    sub_network.calculate_BODF(skip_pre=True)
+    np.testing.assert_array_almost_equal(BODF, sub_network.BODF)
+
+
+if __name__ == "__main__":
+    test_update_ptdf()
+    test_update_ptdf_after_calculate_ptdf()